@@ -0,0 +1,19 @@
+"""
+Throughput and latency benchmarks for the simulator and the agent.
+
+Run from the Reference directory:
+
+    python -m benchmarks                 # compare with the baseline
+    python -m benchmarks --save          # record a new baseline
+    python -m benchmarks --only env      # one group
+
+Results are machine-specific: record the baseline on the machine
+that runs the nightly sweeps. Every timed metric is measured in
+``--rounds`` rounds (at least 5), interleaved across benchmarks, next
+to a calibration workload that tracks the machine's speed. A metric
+regresses when its calibrated median is worse than the baseline's by
+more than its tolerance in thresholds.json *and* a one-sided
+Mann-Whitney test on the rounds rejects noise at level ``alpha``.
+Runs shorter than the one that recorded the baseline (``--min-time``,
+``--rounds``) are not compared.
+"""
@@ -0,0 +1,79 @@
+import argparse
+import sys
+
+from .suite import (
+    BASELINE_PATH,
+    BENCHMARKS,
+    MIN_ROUNDS,
+    THRESHOLDS_PATH,
+    compare,
+    load_json,
+    run_suite,
+    save_baseline,
+    shorter_than_baseline,
+)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks",
+        description="Simulator and agent benchmarks.",
+    )
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS),
+                        help="benchmark groups to run (default: all)")
+    parser.add_argument("--min-time", type=float, default=1.0,
+                        help="seconds of measurement per benchmark")
+    parser.add_argument("--rounds", type=int, default=MIN_ROUNDS,
+                        help="measurement rounds per benchmark "
+                             f"(at least {MIN_ROUNDS})")
+    parser.add_argument("--save", action="store_true",
+                        help="record the results as the new baseline")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--thresholds", default=THRESHOLDS_PATH)
+    args = parser.parse_args(argv)
+    if args.rounds < MIN_ROUNDS:
+        parser.error(f"--rounds must be at least {MIN_ROUNDS}")
+
+    baseline = load_json(args.baseline, {"metrics": {}})
+    too_short = None
+    if not args.save:
+        too_short = shorter_than_baseline(
+            baseline, args.min_time, args.rounds
+        )
+    results = run_suite(args.only, args.min_time, args.rounds)
+
+    print(f"{'metric':48s} | {'value':>12s} | {'baseline':>12s} | unit")
+    for name, metric in sorted(results.items()):
+        reference = baseline["metrics"].get(name)
+        ref_value = (
+            f"{reference['value']:12.1f}" if reference else f"{'-':>12s}"
+        )
+        print(
+            f"{name:48s} | {metric['value']:12.1f} | {ref_value} | "
+            f"{metric['unit']}"
+        )
+
+    if args.save:
+        save_baseline(results, args.baseline, args.min_time, args.rounds)
+        print(f"\nBaseline written to {args.baseline}")
+        return 0
+
+    if too_short is not None:
+        print(f"\nNot compared: {too_short}.")
+        return 2
+
+    regressions = compare(
+        results, baseline, load_json(args.thresholds, {})
+    )
+    if regressions:
+        print("\nRegressions (change adjusted for machine speed):")
+        for name, value, reference, change in regressions:
+            print(f"  {name}: {value:.1f} vs {reference:.1f} ({change:+.1%})")
+        return 1
+
+    print("\nNo regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,536 @@
+"""
+Benchmark definitions, baselines and regression checks.
+
+Each benchmark group returns a dict of Benchmarks, which
+``run_suite`` measures round by round into metrics:
+
+    name -> {"value": float, "unit": str, "higher_is_better": bool,
+             "samples": [float, ...]}
+
+``value`` is the median of the per-round ``samples`` (at least
+MIN_ROUNDS rounds for timed metrics). Metric names are dotted paths,
+e.g. ``env.tick.m16.q1000.steps_per_s``.
+"""
+
+import heapq
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import platform
+import resource
+import time
+from collections import namedtuple
+
+import numpy as np
+
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "baselines.json")
+THRESHOLDS_PATH = os.path.join(HERE, "thresholds.json")
+
+BASE_CONFIG = dict(
+    num_machines=2,
+    arrival_rate=0.2,
+    stat_fraction=0.2,
+    stat_deadline=15,
+    routine_deadline=40,
+    stat_priority_weight=5.0,
+    routine_priority_weight=1.0,
+    service_time_mean=10,
+    episode_length=500,
+)
+
+MACHINE_COUNTS = (2, 16, 128)
+QUEUE_DEPTHS = (0, 100, 10_000)
+
+# Fewest measurement rounds per timed metric; the noise test needs
+# this many samples on both sides
+MIN_ROUNDS = 5
+
+# One benchmark: ``measure(window)`` runs one round of about
+# ``window`` seconds and returns its sample. Untimed benchmarks
+# (``repeat=False``) are measured once.
+Benchmark = namedtuple(
+    "Benchmark",
+    ["measure", "unit", "higher_is_better", "repeat"],
+    defaults=[True, True],
+)
+
+
+def _metric(samples, unit, higher_is_better=True):
+    samples = [float(sample) for sample in samples]
+    return {
+        "value": float(np.median(samples)),
+        "unit": unit,
+        "higher_is_better": higher_is_better,
+        "samples": samples,
+    }
+
+
+def _lab_config(num_machines, **overrides):
+    """
+    Config whose capacity (machines / mean service time) equals the
+    arrival rate, so a prefilled queue keeps roughly its depth.
+    """
+    from env.config import EnvConfig
+
+    base = EnvConfig(**BASE_CONFIG)
+    return base.replace(
+        num_machines=num_machines,
+        service_time_mean=num_machines / base.arrival_rate,
+        **overrides,
+    )
+
+
+def _reset_with_backlog(env, depth, seed=0):
+    env.reset(seed=seed)
+    for _ in range(depth):
+        env.queue.append(env._create_job())
+
+
+def _rate(run_once):
+    """
+    Measure the throughput of ``run_once`` over one window.
+
+    ``run_once`` returns (units of work, seconds measured); it is
+    repeated until the window has passed.
+    """
+    def measure(window):
+        work, elapsed = 0, 0.0
+        deadline = time.perf_counter() + window
+        while elapsed == 0.0 or time.perf_counter() < deadline:
+            units, seconds = run_once()
+            work += units
+            elapsed += seconds
+        return work / elapsed
+    return measure
+
+
+def _latency_us(call):
+    def measure(window):
+        calls, start = 0, time.perf_counter()
+        while time.perf_counter() - start < window:
+            call()
+            calls += 1
+        return (time.perf_counter() - start) / calls * 1e6
+    return measure
+
+
+# --------------------------------------------------
+# Calibration
+# --------------------------------------------------
+
+# Reference workload measured in every round of every run. It uses
+# none of the code under test, so its speed tracks the machine alone
+CALIBRATION = "machine.calibration.ops_per_s"
+
+
+def _calibration_run(size=2000):
+    start = time.perf_counter()
+    heap = []
+    for i in range(size):
+        heapq.heappush(heap, (i * 7919) % 2003)
+    total = 0
+    while heap:
+        total += heapq.heappop(heap)
+    return size, time.perf_counter() - start
+
+
+def bench_calibration():
+    return {CALIBRATION: Benchmark(_rate(_calibration_run), "ops/s")}
+
+
+# --------------------------------------------------
+# Simulator
+# --------------------------------------------------
+
+def _episode_runner(env, backlog, policy):
+    def run_episode():
+        env.restore(backlog)
+        done, steps = False, 0
+        start = time.perf_counter()
+        while not done:
+            _, _, done, _, _ = env.step(policy.select_action(env))
+            steps += 1
+        return steps, time.perf_counter() - start
+    return run_episode
+
+
+def bench_env():
+    """
+    Env steps/sec under FIFO dispatch across machine counts and
+    queue depths, for the tick engine and the event engine.
+    """
+    from env.lab_env import LabSchedulingEnv
+    from policies.fifo import FIFOPolicy
+
+    policy = FIFOPolicy()
+    benchmarks = {}
+    for engine in ("tick", "event"):
+        for num_machines in MACHINE_COUNTS:
+            for depth in QUEUE_DEPTHS:
+                env = LabSchedulingEnv(_lab_config(
+                    num_machines, event_driven=engine == "event"
+                ))
+                # Build the backlog once; every run replays the same
+                # episode from a snapshot
+                _reset_with_backlog(env, depth)
+                backlog = env.snapshot()
+
+                name = f"env.{engine}.m{num_machines}.q{depth}.steps_per_s"
+                benchmarks[name] = Benchmark(
+                    _rate(_episode_runner(env, backlog, policy)), "steps/s"
+                )
+    return benchmarks
+
+
+# --------------------------------------------------
+# Policies
+# --------------------------------------------------
+
+def _policies():
+    from policies.fifo import FIFOPolicy
+    from policies.lookahead import LookaheadPolicy
+    from policies.priority_index import (
+        ATCPolicy,
+        EDDPolicy,
+        SPTPolicy,
+        WeightedSlackPolicy,
+    )
+    from policies.random_policy import RandomPolicy
+    from policies.stat_first import StatFirstPolicy
+
+    return {
+        "FIFO": FIFOPolicy(),
+        "STAT-first": StatFirstPolicy(),
+        "Random": RandomPolicy(),
+        "EDD": EDDPolicy(),
+        "SPT": SPTPolicy(),
+        "W-slack": WeightedSlackPolicy(),
+        "ATC": ATCPolicy(),
+        "Lookahead": LookaheadPolicy(),
+    }
+
+
+def _decision_runner(env, backlog, policy, window):
+    def run_window():
+        env.restore(backlog)
+        decisions, elapsed, done = 0, 0.0, False
+        deadline = time.perf_counter() + window
+        while not done and time.perf_counter() < deadline:
+            start = time.perf_counter()
+            action = policy.select_action(env)
+            elapsed += time.perf_counter() - start
+            decisions += 1
+            _, _, done, _, _ = env.step(action)
+        return decisions, elapsed
+    return run_window
+
+
+def bench_policies(depth=1000, num_machines=8, window=0.05):
+    """
+    Decisions/sec of every policy on a lab with a deep backlog.
+    Only the time spent inside ``select_action`` is counted; each
+    run replays at most ``window`` seconds from the backlog.
+    """
+    from env.lab_env import LabSchedulingEnv
+
+    benchmarks = {}
+    for name, policy in _policies().items():
+        env = LabSchedulingEnv(_lab_config(num_machines))
+        _reset_with_backlog(env, depth)
+        # Let index policies build their index before the snapshot
+        policy.select_action(env)
+        backlog = env.snapshot()
+
+        benchmarks[f"policy.{name}.decisions_per_s"] = Benchmark(
+            _rate(_decision_runner(env, backlog, policy, window)),
+            "decisions/s",
+        )
+    return benchmarks
+
+
+# --------------------------------------------------
+# Agent
+# --------------------------------------------------
+
+def _filled_storage(num_steps=500, num_envs=16, obs_dim=3, action_dim=3):
+    import torch
+
+    from rl.rollout_buffer import RolloutStorage
+
+    storage = RolloutStorage(num_steps, num_envs, obs_dim, action_dim)
+    rng = np.random.default_rng(0)
+    for _ in range(num_steps):
+        storage.add(
+            rng.random((num_envs, obs_dim), dtype=np.float32) * 100,
+            rng.integers(action_dim, size=num_envs),
+            -rng.random(num_envs, dtype=np.float32),
+            np.full(num_envs, -np.log(action_dim), dtype=np.float32),
+            np.zeros(num_envs, dtype=np.float32),
+            np.zeros(num_envs, dtype=np.float32),
+        )
+    storage.compute_returns_and_advantages(torch.zeros(num_envs), 0.99, 0.95)
+    return storage
+
+
+def _time_update(num_epochs=4, minibatch_size=256):
+    from rl.ppo_agent import PPOAgent
+
+    agent = PPOAgent(obs_dim=3, action_dim=3)
+    storage = _filled_storage()
+    start = time.perf_counter()
+    agent.update(storage, num_epochs=num_epochs,
+                 minibatch_size=minibatch_size)
+    elapsed = time.perf_counter() - start
+    samples = storage.num_steps * storage.num_envs * num_epochs
+    return samples / elapsed
+
+
+def _update_peak_rss(queue):
+    _time_update()
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    scale = 1024 ** 2 if platform.system() == "Darwin" else 1024
+    queue.put(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale)
+
+
+def _peak_rss_mb(target):
+    """
+    Peak resident memory of ``target`` run in a fresh process.
+    """
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=target, args=(queue,))
+    process.start()
+    peak = queue.get()
+    process.join()
+    return peak
+
+
+def bench_agent(batch_size=256):
+    """
+    PPOAgent inference latency (single and batched), update
+    throughput and the peak memory of an update.
+    """
+    import torch
+
+    from rl.ppo_agent import PPOAgent
+
+    torch.set_num_threads(1)
+    agent = PPOAgent(obs_dim=3, action_dim=3)
+    rng = np.random.default_rng(0)
+    obs = rng.random(3, dtype=np.float32)
+    batch = rng.random((batch_size, 3), dtype=np.float32)
+    masks = np.ones((batch_size, 3), dtype=bool)
+
+    return {
+        "agent.select_action.latency_us": Benchmark(
+            _latency_us(lambda: agent.select_action(obs)), "us",
+            higher_is_better=False,
+        ),
+        f"agent.act_batch{batch_size}.latency_us": Benchmark(
+            _latency_us(lambda: agent.act_batch(batch, masks)), "us",
+            higher_is_better=False,
+        ),
+        # One update per round, however long it takes
+        "agent.update.samples_per_s": Benchmark(
+            lambda window: _time_update(), "samples/s"
+        ),
+        "agent.update.peak_rss_mb": Benchmark(
+            lambda window: _peak_rss_mb(_update_peak_rss), "MB",
+            higher_is_better=False, repeat=False,
+        ),
+    }
+
+
+BENCHMARKS = {
+    "env": bench_env,
+    "policies": bench_policies,
+    "agent": bench_agent,
+}
+
+
+# --------------------------------------------------
+# Baselines and thresholds
+# --------------------------------------------------
+
+def run_suite(only=None, min_time=1.0, rounds=MIN_ROUNDS):
+    """
+    Measure the selected groups in ``rounds`` rounds of about
+    ``min_time / rounds`` seconds per benchmark.
+
+    Rounds are interleaved across benchmarks, so a burst of
+    interference from other processes slows one round of many
+    metrics instead of every round of one; the median of each metric
+    then ignores it. The calibration workload runs in every round.
+    """
+    if rounds < MIN_ROUNDS:
+        raise ValueError(f"rounds must be >= {MIN_ROUNDS}")
+    # Always measured: compare divides the other rates by it
+    benchmarks = bench_calibration()
+    for name, bench in BENCHMARKS.items():
+        if only is None or name in only:
+            benchmarks.update(bench())
+
+    samples = {name: [] for name in benchmarks}
+    for round_index in range(rounds):
+        for name, benchmark in benchmarks.items():
+            if benchmark.repeat or round_index == 0:
+                samples[name].append(benchmark.measure(min_time / rounds))
+
+    return {
+        name: _metric(
+            samples[name], benchmark.unit, benchmark.higher_is_better
+        )
+        for name, benchmark in benchmarks.items()
+    }
+
+
+def environment_info():
+    import torch
+
+    return {
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "torch": torch.__version__,
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_baseline(results, path=BASELINE_PATH, min_time=1.0,
+                  rounds=MIN_ROUNDS):
+    """
+    Merge ``results`` into the baseline file (so one group can be
+    re-recorded on its own), with the run length that produced them.
+    """
+    baseline = load_json(path, {"metrics": {}})
+    baseline["environment"] = environment_info()
+    baseline["settings"] = {"min_time": min_time, "rounds": rounds}
+    baseline["metrics"].update(results)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_json(path, default=None):
+    if not os.path.exists(path):
+        return default
+    with open(path) as f:
+        return json.load(f)
+
+
+def shorter_than_baseline(baseline, min_time, rounds):
+    """
+    Why a run of ``min_time`` seconds and ``rounds`` rounds is too
+    short to compare with ``baseline``, or None if it is not.
+    """
+    settings = baseline.get("settings")
+    if settings is None:
+        return None
+    if min_time < settings["min_time"] or rounds < settings["rounds"]:
+        return (
+            f"the baseline was recorded with --min-time "
+            f"{settings['min_time']} --rounds {settings['rounds']}; "
+            f"shorter runs are noisier and cannot be compared"
+        )
+    return None
+
+
+def _worse_p_value(samples, reference):
+    """
+    One-sided Mann-Whitney U test: probability of at least as many
+    (sample, reference) pairs with the sample below the reference if
+    both came from the same distribution. Exact for small samples,
+    normal approximation otherwise.
+    """
+    def below(group, others):
+        return sum(
+            (a < b) + 0.5 * (a == b) for a in group for b in others
+        )
+
+    n, m = len(samples), len(reference)
+    observed = below(samples, reference)
+    if math.comb(n + m, n) <= 20_000:
+        pooled = list(samples) + list(reference)
+        at_least = total = 0
+        for chosen in itertools.combinations(range(n + m), n):
+            rest = set(range(n + m)).difference(chosen)
+            u = below([pooled[i] for i in chosen], [pooled[i] for i in rest])
+            at_least += u >= observed
+            total += 1
+        return at_least / total
+
+    mean = n * m / 2
+    std = math.sqrt(n * m * (n + m + 1) / 12)
+    return 0.5 * math.erfc((observed - 0.5 - mean) / (std * math.sqrt(2)))
+
+
+def _adjusted(metric, calibration):
+    """
+    Per-round samples of ``metric`` in units of the calibration
+    workload of the same round (rates divided by its rate, latencies
+    multiplied), so a machine-wide slowdown cancels out.
+    """
+    samples = np.asarray(
+        metric.get("samples") or [metric["value"]], dtype=np.float64
+    )
+    if calibration is None or len(calibration["samples"]) != len(samples):
+        return samples
+    speed = np.asarray(calibration["samples"], dtype=np.float64)
+    return samples / speed if metric["higher_is_better"] else samples * speed
+
+
+def compare(results, baseline, thresholds):
+    """
+    Check results against the baseline.
+
+    Timed metrics are compared per round relative to the calibration
+    workload when both runs measured it. A metric regresses when its
+    median got worse by more than its tolerance and, where both sides
+    have at least MIN_ROUNDS samples, a one-sided Mann-Whitney test
+    at level ``alpha`` says the rounds are worse than the baseline's
+    rather than noise.
+
+    Returns a list of (name, value, baseline value, change) for
+    every regression, with the raw medians and the adjusted change.
+    The change is signed so that negative always means
+    slower/larger.
+    """
+    default = thresholds.get("default_tolerance", 0.25)
+    tolerances = thresholds.get("tolerances", {})
+    alpha = thresholds.get("alpha", 0.05)
+
+    metrics = baseline.get("metrics", {})
+    calibration, reference_calibration = None, None
+    if CALIBRATION in results and CALIBRATION in metrics:
+        calibration = results[CALIBRATION]
+        reference_calibration = metrics[CALIBRATION]
+
+    regressions = []
+    for name, metric in sorted(results.items()):
+        reference = metrics.get(name)
+        if name == CALIBRATION or reference is None:
+            continue
+        samples = _adjusted(metric, calibration)
+        reference_samples = _adjusted(reference, reference_calibration)
+        if np.median(reference_samples) == 0:
+            continue
+        change = np.median(samples) / np.median(reference_samples) - 1.0
+        if not metric["higher_is_better"]:
+            change = -change
+            samples, reference_samples = -samples, -reference_samples
+        tolerance = tolerances.get(name, default)
+        if change >= -tolerance:
+            continue
+
+        if min(len(samples), len(reference_samples)) >= MIN_ROUNDS:
+            if _worse_p_value(samples, reference_samples) >= alpha:
+                continue
+        regressions.append(
+            (name, metric["value"], reference["value"], float(change))
+        )
+    return regressions
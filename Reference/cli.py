@@ -0,0 +1,346 @@
+"""
+Command-line entry point.
+
+    python cli.py evaluate [--policies FIFO ATC] [--episodes 25] [--regret]
+    python cli.py train    [--timesteps 200000] [--actors 4]
+    python cli.py sweep    [--load 0.7 0.9] [--capacity 2 4]
+    python cli.py tune     [--learning-rate 1e-4 3e-4] [--hidden 32,32 64,64]
+    python cli.py bench    [benchmark options]
+
+Only argparse is imported up front. Each subcommand imports what it
+needs when it runs: ``evaluate`` (without ``--agent``) and ``sweep``
+never load PyTorch or pandas, ``bench`` loads PyTorch only for the
+agent group, and ``--help`` parses no YAML at all. This keeps start-up
+cheap for the many short baseline jobs a sweep submits to a batch
+scheduler.
+"""
+
+import argparse
+import sys
+
+
+DEFAULT_CONFIG = "configs/base.yaml"
+
+
+# --------------------------------------------------
+# Subcommands
+# --------------------------------------------------
+
+def _load(args):
+    from config import load_config
+
+    cfg = load_config(args.config)
+    if args.seed is not None:
+        import dataclasses
+
+        cfg = dataclasses.replace(
+            cfg,
+            experiment=dataclasses.replace(cfg.experiment, seed=args.seed),
+        )
+    return cfg
+
+
+def _select_policies(cfg, names):
+    from run import make_baselines
+
+    baselines = make_baselines(cfg.experiment.seed)
+    if not names:
+        return baselines
+    unknown = sorted(set(names) - set(baselines))
+    if unknown:
+        raise SystemExit(
+            f"unknown policies: {', '.join(unknown)} "
+            f"(available: {', '.join(baselines)})"
+        )
+    return {name: baselines[name] for name in names}
+
+
+def cmd_evaluate(args):
+    """
+    Heuristic baselines on the reference scenario and the grid, and
+    optionally a trained agent from its checkpoints.
+    """
+    from run import evaluate_baselines, make_store, print_regret
+
+    cfg = _load(args)
+    scenarios = cfg.scenarios()
+    policies = _select_policies(cfg, args.policies)
+    if args.agent is not None:
+        from evaluation.parallel import AgentPolicy
+        from rl.checkpoint import load_policy
+
+        policies["PPO"] = AgentPolicy(load_policy(args.agent))
+
+    results = evaluate_baselines(
+        cfg,
+        scenarios,
+        policies,
+        store=None if args.no_cache else make_store(cfg),
+        num_episodes=args.episodes,
+        num_workers=args.workers,
+    )
+    if args.regret:
+        print_regret(cfg, scenarios, results, args.episodes, args.workers)
+    return 0
+
+
+def cmd_train(args):
+    """
+    Train the PPO agent, then evaluate it.
+    """
+    import dataclasses
+
+    from run import evaluate_agent, train_agent
+
+    cfg = _load(args)
+    changes = {}
+    if args.timesteps is not None:
+        changes["total_timesteps"] = args.timesteps
+    if args.actors is not None:
+        changes["num_actors"] = args.actors
+    if args.checkpoint_dir is not None:
+        changes["checkpoint_dir"] = args.checkpoint_dir
+    if changes:
+        cfg = dataclasses.replace(
+            cfg, rl=dataclasses.replace(cfg.rl, **changes)
+        )
+
+    agent = train_agent(cfg, resume=args.resume)
+    print("\nEvaluating PPO agent...")
+    evaluate_agent(cfg, agent, cfg.scenarios(), num_workers=args.workers)
+    return 0
+
+
+def cmd_sweep(args):
+    """
+    Baselines on every point of a load / capacity / STAT-fraction
+    grid (command-line values override ``evaluation.grid``).
+    """
+    from config import expand_grid
+    from evaluation.parallel import evaluate_parallel, summarize
+    from run import make_store, print_regret
+
+    cfg = _load(args)
+    grid = dict(cfg.evaluation.grid)
+    for key, values in (
+        ("load", args.load),
+        ("capacity", args.capacity),
+        ("stat_fraction", args.stat_fraction),
+    ):
+        if values:
+            grid.pop("num_machines" if key == "capacity" else key, None)
+            grid[key] = values
+    if not grid:
+        raise SystemExit("empty grid: pass --load, --capacity or "
+                         "--stat-fraction, or set evaluation.grid")
+
+    scenarios = expand_grid(cfg.environment, grid)
+    results = evaluate_parallel(
+        _select_policies(cfg, args.policies),
+        scenarios,
+        args.episodes or cfg.experiment.num_episodes_eval,
+        base_seed=cfg.experiment.seed,
+        num_workers=args.workers,
+        store=None if args.no_cache else make_store(cfg),
+    )
+
+    print(
+        f"{'scenario':12s} | {'machines':>8s} | {'load':>5s} | "
+        f"{'STAT':>5s} | {'policy':12s} | {'mean reward':>11s} | "
+        f"{'std':>8s}"
+    )
+    for (name, policy), (mean_r, std_r) in summarize(results).items():
+        scenario = scenarios[name]
+        print(
+            f"{name:12s} | {scenario.num_machines:8d} | "
+            f"{scenario.load:5.2f} | {scenario.stat_fraction:5.2f} | "
+            f"{policy:12s} | {mean_r:11.2f} | {std_r:8.2f}"
+        )
+    if args.regret:
+        print_regret(cfg, scenarios, results, args.episodes, args.workers)
+    return 0
+
+
+def cmd_tune(args):
+    """
+    ASHA search over PPO hyperparameters (rl/tuning.py); values not
+    given on the command line stay at the config's.
+    """
+    import os
+
+    from rl.tuning import run_asha
+
+    cfg = _load(args)
+    space = {}
+    for key, values in (
+        ("learning_rate", args.learning_rate),
+        ("gamma", args.gamma),
+        ("clip_range", args.clip_range),
+        ("gae_lambda", args.gae_lambda),
+        ("hidden_layers", args.hidden),
+    ):
+        if values:
+            space[key] = values
+    if not space:
+        raise SystemExit("empty search space: pass at least one of "
+                         "--learning-rate, --gamma, --clip-range, "
+                         "--gae-lambda, --hidden")
+    if args.timesteps is not None:
+        import dataclasses
+
+        cfg = dataclasses.replace(
+            cfg, rl=dataclasses.replace(cfg.rl, total_timesteps=args.timesteps)
+        )
+
+    out_dir = args.out or os.path.join(
+        cfg.experiment.results_dir or ".", "tuning", cfg.experiment.name
+    )
+    leaderboard = run_asha(
+        cfg,
+        space,
+        out_dir,
+        min_timesteps=args.min_timesteps,
+        eta=args.eta,
+        eval_episodes=args.eval_episodes,
+        num_workers=args.workers,
+    )
+
+    print(f"\n{'trial':10s} | {'timesteps':>9s} | {'eval reward':>11s} | "
+          f"parameters")
+    for row in leaderboard:
+        params = ", ".join(f"{k}={v}" for k, v in row["params"].items())
+        print(f"{row['trial']:10s} | {row['timesteps']:9d} | "
+              f"{row['eval_reward']:11.2f} | {params}")
+    print(f"\nLearning curves: {os.path.join(out_dir, 'trials')}")
+    return 0
+
+
+def _layer_sizes(text):
+    try:
+        return tuple(int(size) for size in text.split(","))
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"expected comma-separated layer sizes, got '{text}'"
+        )
+
+
+def cmd_bench(args):
+    from benchmarks.__main__ import main as bench_main
+
+    return bench_main(args.bench_args)
+
+
+# --------------------------------------------------
+# Parser
+# --------------------------------------------------
+
+def _add_common(parser):
+    parser.add_argument("--config", default=DEFAULT_CONFIG,
+                        help=f"experiment config (default: {DEFAULT_CONFIG})")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="override experiment.seed")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="evaluation processes (default: all cores, "
+                             "1 = in-process)")
+
+
+def _add_evaluation(parser):
+    parser.add_argument("--policies", nargs="+", default=None,
+                        help="baselines to run (default: all)")
+    parser.add_argument("--episodes", type=int, default=None,
+                        help="override experiment.num_episodes_eval")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore experiment.results_dir")
+    parser.add_argument("--regret", action="store_true",
+                        help="also report regret against the hindsight "
+                             "oracle (evaluation/oracle.py)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python cli.py",
+        description="Priority-aware lab scheduling experiments.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    evaluate = commands.add_parser(
+        "evaluate", help="evaluate heuristic baselines (no PyTorch)"
+    )
+    _add_common(evaluate)
+    _add_evaluation(evaluate)
+    evaluate.add_argument("--agent", default=None,
+                          help="also evaluate a trained PPO policy "
+                               "(checkpoint directory or file)")
+    evaluate.set_defaults(handler=cmd_evaluate)
+
+    train = commands.add_parser("train", help="train and evaluate PPO")
+    _add_common(train)
+    train.add_argument("--timesteps", type=int, default=None,
+                       help="override rl_agent.training.total_timesteps")
+    train.add_argument("--actors", type=int, default=None,
+                       help="override rl_agent.training.num_actors")
+    train.add_argument("--checkpoint-dir", default=None,
+                       help="override rl_agent.training.checkpoint_dir")
+    train.add_argument("--resume", action="store_true",
+                       help="continue from the newest checkpoint")
+    train.set_defaults(handler=cmd_train)
+
+    sweep = commands.add_parser(
+        "sweep", help="evaluate baselines over a scenario grid"
+    )
+    _add_common(sweep)
+    _add_evaluation(sweep)
+    sweep.add_argument("--load", nargs="+", type=float,
+                       help="offered loads")
+    sweep.add_argument("--capacity", nargs="+", type=int,
+                       help="machine counts")
+    sweep.add_argument("--stat-fraction", nargs="+", type=float,
+                       help="STAT fractions")
+    sweep.set_defaults(handler=cmd_sweep)
+
+    tune = commands.add_parser(
+        "tune", help="ASHA search over PPO hyperparameters"
+    )
+    _add_common(tune)
+    tune.add_argument("--learning-rate", nargs="+", type=float)
+    tune.add_argument("--gamma", nargs="+", type=float)
+    tune.add_argument("--clip-range", nargs="+", type=float)
+    tune.add_argument("--gae-lambda", nargs="+", type=float)
+    tune.add_argument("--hidden", nargs="+", type=_layer_sizes,
+                      help="hidden layer sizes, e.g. 32,32 64,64")
+    tune.add_argument("--timesteps", type=int, default=None,
+                      help="budget of the last rung (default: "
+                           "rl_agent.training.total_timesteps)")
+    tune.add_argument("--min-timesteps", type=int, default=None,
+                      help="budget of the first rung (default: "
+                           "last / eta^3)")
+    tune.add_argument("--eta", type=int, default=3,
+                      help="keep the top 1/eta of each rung (default: 3)")
+    tune.add_argument("--eval-episodes", type=int, default=8,
+                      help="validation episodes per rung (default: 8)")
+    tune.add_argument("--out", default=None,
+                      help="output directory (default: "
+                           "<results_dir>/tuning/<experiment name>)")
+    tune.set_defaults(handler=cmd_tune)
+
+    # Options are passed through to python -m benchmarks
+    bench = commands.add_parser(
+        "bench", help="run the benchmark suite (see python -m benchmarks)",
+        add_help=False,
+    )
+    bench.set_defaults(handler=cmd_bench)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args, extra = parser.parse_known_args(argv)
+    if args.command == "bench":
+        args.bench_args = extra
+    elif extra:
+        parser.error(f"unrecognized arguments: {' '.join(extra)}")
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,301 @@
+"""
+Experiment configuration: load, validate and compile once.
+
+``load_config`` parses the nested YAML schema of configs/base.yaml
+into an immutable Config of typed sections. The environment section
+becomes an env.config.EnvConfig, the flat compiled form the
+simulators read in their hot loops. Compiled configs are cached per
+file and modification time, so sweeps that load the same file again
+never re-parse it. PyYAML is imported on the first load.
+
+``expand_grid`` turns a base EnvConfig and a parameter grid into a
+dict of scenarios keyed by content hash:
+
+    evaluation:
+      grid:
+        load: [0.7, 0.9, 1.1]      # offered load, sets arrival_rate
+        capacity: [2, 4]           # num_machines
+        stat_fraction: [0.1, 0.3]
+"""
+
+import dataclasses
+import itertools
+import os
+
+from env.config import ConfigError, EnvConfig
+
+
+# --------------------------------------------------
+# Sections
+# --------------------------------------------------
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class ExperimentConfig:
+    name: str
+    seed: int
+    num_episodes_eval: int
+    profile: bool = False
+    profile_trace: str = None
+    results_dir: str = None
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RLConfig:
+    algorithm: str
+    hidden_layers: tuple
+    activation: str
+    total_timesteps: int
+    gamma: float
+    learning_rate: float
+    clip_range: float
+    gae_lambda: float = 1.0
+    num_envs: int = 16
+    num_actors: int = 0
+    num_epochs: int = 4
+    minibatch_size: int = 256
+    checkpoint_dir: str = None
+    checkpoint_every: int = 10
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class EvalConfig:
+    comparison_metric: str = "average_episode_reward"
+    sequential: bool = False
+    max_episodes: int = 256
+    alpha: float = 0.05
+    # Parameter grid as a tuple of (key, values) pairs
+    grid: tuple = ()
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class Config:
+    experiment: ExperimentConfig
+    environment: EnvConfig
+    rl: RLConfig
+    evaluation: EvalConfig
+
+    def scenarios(self):
+        """
+        Evaluation scenarios: the reference environment plus every
+        point of the evaluation grid, keyed by content hash.
+        """
+        scenarios = {"reference": self.environment}
+        if self.evaluation.grid:
+            scenarios.update(
+                expand_grid(self.environment, dict(self.evaluation.grid))
+            )
+        return scenarios
+
+
+# --------------------------------------------------
+# Compilation
+# --------------------------------------------------
+
+def _section(raw, key, required=True):
+    value = raw.get(key)
+    if value is None:
+        if required:
+            raise ConfigError(f"missing section '{key}'")
+        return {}
+    if not isinstance(value, dict):
+        raise ConfigError(f"section '{key}' must be a mapping")
+    return value
+
+
+def _require(section, key, path):
+    if key not in section:
+        raise ConfigError(f"missing key '{path}.{key}'")
+    return section[key]
+
+
+def _compile_environment(raw, episode_length):
+    spec = _section(raw, "environment")
+    arrivals = _section(spec, "arrival_process")
+    if arrivals.get("type", "poisson") != "poisson":
+        raise ConfigError(
+            f"unsupported arrival process '{arrivals['type']}'"
+        )
+
+    job_types = _section(spec, "job_types")
+    stat = _section(job_types, "stat")
+    routine = _section(job_types, "routine")
+
+    stat_fraction = float(_require(stat, "fraction", "job_types.stat"))
+    routine_fraction = routine.get("fraction", 1.0 - stat_fraction)
+    if abs(stat_fraction + routine_fraction - 1.0) > 1e-9:
+        raise ConfigError("job type fractions must sum to 1")
+
+    # The environment draws every service time from one distribution
+    stat_mean = _require(stat, "service_time_mean", "job_types.stat")
+    routine_mean = _require(routine, "service_time_mean", "job_types.routine")
+    if stat_mean != routine_mean:
+        raise ConfigError(
+            "per-class service_time_mean values must be equal"
+        )
+
+    return EnvConfig(
+        num_machines=_require(spec, "num_machines", "environment"),
+        arrival_rate=_require(arrivals, "rate", "arrival_process"),
+        stat_fraction=stat_fraction,
+        stat_deadline=_require(stat, "deadline", "job_types.stat"),
+        routine_deadline=_require(routine, "deadline", "job_types.routine"),
+        stat_priority_weight=_require(
+            stat, "priority_weight", "job_types.stat"
+        ),
+        routine_priority_weight=_require(
+            routine, "priority_weight", "job_types.routine"
+        ),
+        service_time_mean=stat_mean,
+        episode_length=episode_length,
+        event_driven=spec.get("event_driven", False),
+        auto_advance=spec.get("auto_advance", False),
+        demand=spec.get("demand"),
+    )
+
+
+def _compile_rl(raw):
+    spec = _section(raw, "rl_agent")
+    network = _section(spec, "network", required=False)
+    training = _section(spec, "training")
+    return RLConfig(
+        algorithm=spec.get("algorithm", "PPO"),
+        hidden_layers=tuple(
+            int(size) for size in network.get("hidden_layers", (64, 64))
+        ),
+        activation=network.get("activation", "relu"),
+        total_timesteps=int(
+            _require(training, "total_timesteps", "rl_agent.training")
+        ),
+        gamma=float(_require(training, "gamma", "rl_agent.training")),
+        learning_rate=float(
+            _require(training, "learning_rate", "rl_agent.training")
+        ),
+        clip_range=float(
+            _require(training, "clip_range", "rl_agent.training")
+        ),
+        gae_lambda=float(training.get("gae_lambda", 1.0)),
+        num_envs=int(training.get("num_envs", 16)),
+        num_actors=int(training.get("num_actors", 0)),
+        num_epochs=int(training.get("num_epochs", 4)),
+        minibatch_size=int(training.get("minibatch_size", 256)),
+        checkpoint_dir=training.get("checkpoint_dir"),
+        checkpoint_every=int(training.get("checkpoint_every", 10)),
+    )
+
+
+def _compile_evaluation(raw):
+    spec = _section(raw, "evaluation", required=False)
+    grid = _section(spec, "grid", required=False)
+    _check_grid_keys(grid)
+    return EvalConfig(
+        comparison_metric=spec.get(
+            "comparison_metric", "average_episode_reward"
+        ),
+        sequential=bool(spec.get("sequential", False)),
+        max_episodes=int(spec.get("max_episodes", 256)),
+        alpha=float(spec.get("alpha", 0.05)),
+        grid=tuple((key, tuple(values)) for key, values in grid.items()),
+    )
+
+
+def compile_config(raw: dict):
+    """
+    Validate a parsed YAML document and compile it into a Config.
+    """
+    spec = _section(raw, "experiment")
+    experiment = ExperimentConfig(
+        name=str(spec.get("name", "experiment")),
+        seed=int(_require(spec, "seed", "experiment")),
+        num_episodes_eval=int(spec.get("num_episodes_eval", 25)),
+        profile=bool(spec.get("profile", False)),
+        profile_trace=spec.get("profile_trace"),
+        results_dir=spec.get("results_dir"),
+    )
+    try:
+        environment = _compile_environment(
+            raw, _require(spec, "episode_length", "experiment")
+        )
+    except (TypeError, ValueError) as exc:
+        raise ConfigError(str(exc)) from exc
+
+    return Config(
+        experiment=experiment,
+        environment=environment,
+        rl=_compile_rl(raw),
+        evaluation=_compile_evaluation(raw),
+    )
+
+
+_cache = {}
+
+
+def load_config(path: str = "configs/base.yaml"):
+    """
+    Load and compile a YAML config. Repeated loads of an unchanged
+    file return the same Config object.
+    """
+    path = os.path.abspath(path)
+    key = (path, os.stat(path).st_mtime_ns)
+    config = _cache.get(key)
+    if config is None:
+        import yaml
+
+        with open(path, "r") as f:
+            config = compile_config(yaml.safe_load(f))
+        _cache[key] = config
+    return config
+
+
+# --------------------------------------------------
+# Scenario grids
+# --------------------------------------------------
+
+# Grid key -> EnvConfig field (``load`` is derived)
+GRID_KEYS = {
+    "load": None,
+    "capacity": "num_machines",
+    "num_machines": "num_machines",
+    "stat_fraction": "stat_fraction",
+}
+
+
+def _check_grid_keys(grid):
+    for key in grid:
+        if key not in GRID_KEYS:
+            raise ConfigError(
+                f"unknown grid key '{key}' "
+                f"(expected one of {', '.join(GRID_KEYS)})"
+            )
+
+
+def expand_grid(base: EnvConfig, grid: dict):
+    """
+    Every combination of the grid values applied to ``base``.
+
+    ``load`` is offered load (arrival rate x mean service time /
+    machines) and is applied after the capacity, so a load level
+    means the same utilisation on every machine count. Returns
+    {content hash: EnvConfig} in grid order; duplicate points
+    collapse into one scenario.
+    """
+    _check_grid_keys(grid)
+    keys = list(grid)
+    scenarios = {}
+    for values in itertools.product(*(grid[key] for key in keys)):
+        point = dict(zip(keys, values))
+        changes = {
+            GRID_KEYS[key]: value
+            for key, value in point.items()
+            if GRID_KEYS.get(key) is not None
+        }
+        try:
+            scenario = base.replace(**changes)
+            if "load" in point:
+                scenario = scenario.replace(
+                    arrival_rate=point["load"] * scenario.num_machines
+                    / scenario.service_time_mean
+                )
+        except (TypeError, ValueError) as exc:
+            raise ConfigError(f"grid point {point}: {exc}") from exc
+        scenarios[scenario.content_hash()] = scenario
+    return scenarios
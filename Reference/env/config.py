@@ -0,0 +1,292 @@
+"""
+Compiled environment configuration.
+
+The environments read their parameters from an immutable EnvConfig
+instead of a dict: fields are typed and validated once, and reading
+one in the simulation loop is a slot access rather than a hash
+lookup. Build one from the nested YAML schema with
+``config.load_config``, or from a flat dict of field values with
+``as_env_config`` (accepted wherever an environment takes a config).
+
+MultiStationLabEnv reads a MultiStationConfig in the same way: the
+class settings of EnvConfig, plus its stations and routes compiled
+into StationConfig and RouteConfig tuples (``as_multi_station_config``
+accepts the nested dict of env.multi_station).
+
+Values must already have their field's type: integral numbers for
+int fields, real numbers for float fields and real booleans for bool
+fields. Anything else raises ConfigError rather than being coerced.
+"""
+
+import dataclasses
+import hashlib
+import json
+import numbers
+
+import numpy as np
+
+from .demand import DemandProfile
+
+
+class ConfigError(ValueError):
+    pass
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class EnvConfig:
+    num_machines: int
+    arrival_rate: float
+    stat_fraction: float
+    stat_deadline: int
+    routine_deadline: int
+    stat_priority_weight: float
+    routine_priority_weight: float
+    service_time_mean: float
+    episode_length: int
+    event_driven: bool = False
+    auto_advance: bool = False
+    # Compiled demand profile (compares and hashes by its settings)
+    demand: DemandProfile = None
+
+    def __post_init__(self):
+        _check_types(self)
+
+        if isinstance(self.demand, dict):
+            object.__setattr__(
+                self, "demand", DemandProfile.from_config(self.demand)
+            )
+        _check(
+            self.demand is None or isinstance(self.demand, DemandProfile),
+            "demand must be a mapping or a DemandProfile",
+        )
+
+        _check(self.num_machines >= 1, "num_machines must be >= 1")
+        _check(self.episode_length >= 1, "episode_length must be >= 1")
+        _check(self.arrival_rate >= 0.0, "arrival_rate must be >= 0")
+        _check(
+            self.demand is not None or self.arrival_rate <= 1.0,
+            "arrival_rate is a per-tick probability and must be <= 1 "
+            "(use a demand profile for higher rates)",
+        )
+        _check(0.0 <= self.stat_fraction <= 1.0,
+               "stat_fraction must be in [0, 1]")
+        _check(self.stat_deadline >= 0 and self.routine_deadline >= 0,
+               "deadlines must be >= 0")
+        _check(
+            self.stat_priority_weight > 0
+            and self.routine_priority_weight > 0,
+            "priority weights must be > 0",
+        )
+        _check(self.service_time_mean > 0, "service_time_mean must be > 0")
+
+    @property
+    def load(self):
+        """
+        Offered load: arrival rate over service capacity.
+        """
+        return self.arrival_rate * self.service_time_mean / self.num_machines
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+    def to_dict(self):
+        """
+        Flat dict of plain values (round-trips through as_env_config).
+        """
+        out = {
+            field.name: getattr(self, field.name)
+            for field in dataclasses.fields(self)
+        }
+        if self.demand is not None:
+            out["demand"] = self.demand.to_config()
+        return out
+
+    def content_hash(self):
+        """
+        Short stable hash of every field value.
+        """
+        canonical = json.dumps(self.to_dict(), sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+
+def _check(condition, message):
+    if not condition:
+        raise ConfigError(f"invalid environment config: {message}")
+
+
+def _is_integral(value):
+    if isinstance(value, (bool, np.bool_)):
+        return False
+    if isinstance(value, numbers.Integral):
+        return True
+    return isinstance(value, numbers.Real) and float(value).is_integer()
+
+
+def _as_type(name, value, kind):
+    """
+    ``value`` converted to ``kind`` without loss, or ConfigError.
+    """
+    if kind is int:
+        valid = _is_integral(value)
+        expected = "an integer"
+    elif kind is float:
+        valid = isinstance(value, numbers.Real) and not isinstance(
+            value, (bool, np.bool_)
+        )
+        expected = "a number"
+    elif kind is bool:
+        valid = isinstance(value, (bool, np.bool_))
+        expected = "true or false"
+    else:
+        valid = isinstance(value, kind)
+        expected = f"a {kind.__name__}"
+    _check(valid, f"{name} must be {expected}, got {value!r}")
+    return kind(value)
+
+
+def _check_types(config):
+    """
+    Check and normalize every int, float, bool and str field.
+    """
+    for field in dataclasses.fields(config):
+        if field.type in (int, float, bool, str):
+            value = getattr(config, field.name)
+            object.__setattr__(
+                config, field.name, _as_type(field.name, value, field.type)
+            )
+
+
+def as_env_config(config):
+    """
+    Return ``config`` as an EnvConfig (flat dicts are compiled).
+    """
+    if isinstance(config, EnvConfig):
+        return config
+    return EnvConfig(**config)
+
+
+# --------------------------------------------------
+# Multi-station labs
+# --------------------------------------------------
+
+JOB_CLASSES = ("stat", "routine")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class StationConfig:
+    name: str
+    num_machines: int
+    service_time_mean: float
+    # (job class, machine ids) pairs; classes not listed may use
+    # every machine
+    eligible: tuple = ()
+
+    def __post_init__(self):
+        _check_types(self)
+        eligible = self.eligible
+        if isinstance(eligible, dict):
+            eligible = eligible.items()
+        object.__setattr__(self, "eligible", tuple(
+            (
+                _as_type("eligible class", cls, str),
+                tuple(sorted(
+                    _as_type("eligible machine", i, int) for i in ids
+                )),
+            )
+            for cls, ids in eligible
+        ))
+
+        _check(self.num_machines >= 1,
+               f"station '{self.name}': num_machines must be >= 1")
+        _check(self.service_time_mean > 0,
+               f"station '{self.name}': service_time_mean must be > 0")
+        for cls, ids in self.eligible:
+            _check(cls in JOB_CLASSES,
+                   f"station '{self.name}': unknown job class '{cls}'")
+            _check(
+                all(0 <= i < self.num_machines for i in ids),
+                f"station '{self.name}': eligible machine out of range",
+            )
+
+    def machines_for(self, cls):
+        """
+        Ids of the machines that may run jobs of class ``cls``.
+        """
+        return dict(self.eligible).get(cls, tuple(range(self.num_machines)))
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class RouteConfig:
+    stations: tuple
+    fraction: float
+
+    def __post_init__(self):
+        _check_types(self)
+        object.__setattr__(self, "stations", tuple(
+            _as_type("route station", name, str) for name in self.stations
+        ))
+        _check(len(self.stations) >= 1, "a route needs at least one station")
+        _check(self.fraction >= 0.0, "route fractions must be >= 0")
+
+
+@dataclasses.dataclass(frozen=True, slots=True)
+class MultiStationConfig:
+    arrival_rate: float
+    stat_fraction: float
+    stat_deadline: int
+    routine_deadline: int
+    stat_priority_weight: float
+    routine_priority_weight: float
+    episode_length: int
+    stations: tuple
+    routes: tuple
+    transfer_time: int = 0
+
+    def __post_init__(self):
+        _check_types(self)
+        object.__setattr__(self, "stations", tuple(
+            item if isinstance(item, StationConfig) else StationConfig(**item)
+            for item in self.stations
+        ))
+        object.__setattr__(self, "routes", tuple(
+            item if isinstance(item, RouteConfig) else RouteConfig(**item)
+            for item in self.routes
+        ))
+
+        _check(self.episode_length >= 1, "episode_length must be >= 1")
+        # Poisson rate in samples per tick, so it may exceed 1
+        _check(self.arrival_rate >= 0.0, "arrival_rate must be >= 0")
+        _check(0.0 <= self.stat_fraction <= 1.0,
+               "stat_fraction must be in [0, 1]")
+        _check(self.stat_deadline >= 0 and self.routine_deadline >= 0,
+               "deadlines must be >= 0")
+        _check(
+            self.stat_priority_weight > 0
+            and self.routine_priority_weight > 0,
+            "priority weights must be > 0",
+        )
+        _check(self.transfer_time >= 0, "transfer_time must be >= 0")
+        _check(len(self.stations) >= 1, "at least one station is required")
+
+        names = [station.name for station in self.stations]
+        _check(len(set(names)) == len(names), "station names must be unique")
+        _check(len(self.routes) >= 1, "at least one route is required")
+        for route in self.routes:
+            unknown = sorted(set(route.stations) - set(names))
+            _check(not unknown,
+                   f"route through unknown station(s) {', '.join(unknown)}")
+        _check(sum(route.fraction for route in self.routes) > 0,
+               "route fractions must not all be 0")
+
+    def replace(self, **changes):
+        return dataclasses.replace(self, **changes)
+
+
+def as_multi_station_config(config):
+    """
+    Return ``config`` as a MultiStationConfig (nested dicts are
+    compiled).
+    """
+    if isinstance(config, MultiStationConfig):
+        return config
+    return MultiStationConfig(**config)
@@ -0,0 +1,171 @@
+"""
+Time-varying demand profiles.
+
+Real sample arrivals are far from a constant-rate process: volume
+follows the working day, morning phlebotomy draws produce a sharp
+peak, incidents cause surges, and ward rounds deliver dozens of
+samples at once. A DemandProfile describes such a pattern as an
+arrival rate lambda(t) (samples per tick, may exceed 1) plus batch
+arrivals, and samples a whole episode of arrival times at once:
+
+- the continuous part is a non-homogeneous Poisson process, drawn by
+  thinning: candidate times from a homogeneous process at the
+  profile's maximum rate are kept with probability lambda(t)/max
+- batches arrive at scheduled times every period, with a Poisson
+  number of samples spread over a few ticks
+
+Everything is vectorized over the episode, so generating thousands
+of stress-test episodes (see traces.write_traces) costs a handful of
+NumPy calls each.
+
+Profiles are given in the config under ``demand``::
+
+    demand:
+      base_rate: 0.3             # samples per tick
+      period: 1440               # ticks per day
+      diurnal_amplitude: 0.5     # relative swing of the daily curve
+      diurnal_peak: 660          # tick of the daily maximum
+      peaks:                     # e.g. morning draw
+        - {center: 420, width: 45, height: 1.2}
+      surges:                    # absolute windows, rate multiplier
+        - {start: 3000, end: 3240, multiplier: 2.0}
+      batches:                   # e.g. phlebotomy rounds
+        - {times: [360, 840], size: 25, spread: 10}
+"""
+
+import json
+
+import numpy as np
+
+
+class DemandProfile:
+    """
+    Arrival-rate curve plus scheduled batch arrivals.
+
+    lambda(t) = (base_rate * (1 + a * cos(2 pi (t - peak) / period))
+                 + sum of Gaussian peaks, repeated every period)
+                * multiplier of any surge window containing t
+    """
+
+    def __init__(self, base_rate: float, period: int = 1440,
+                 diurnal_amplitude: float = 0.0, diurnal_peak: int = 0,
+                 peaks=(), surges=(), batches=()):
+        if not 0.0 <= diurnal_amplitude <= 1.0:
+            raise ValueError("diurnal_amplitude must be in [0, 1]")
+
+        self.base_rate = base_rate
+        self.period = period
+        self.diurnal_amplitude = diurnal_amplitude
+        self.diurnal_peak = diurnal_peak
+        self.peaks = [dict(peak) for peak in peaks]
+        self.surges = [dict(surge) for surge in surges]
+        self.batches = [dict(batch) for batch in batches]
+
+    @classmethod
+    def from_config(cls, spec: dict):
+        return cls(**spec)
+
+    def to_config(self):
+        return {
+            "base_rate": self.base_rate,
+            "period": self.period,
+            "diurnal_amplitude": self.diurnal_amplitude,
+            "diurnal_peak": self.diurnal_peak,
+            "peaks": [dict(peak) for peak in self.peaks],
+            "surges": [dict(surge) for surge in self.surges],
+            "batches": [dict(batch) for batch in self.batches],
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, DemandProfile):
+            return NotImplemented
+        return self.to_config() == other.to_config()
+
+    def __hash__(self):
+        return hash(json.dumps(self.to_config(), sort_keys=True))
+
+    # --------------------------------------------------
+    # Rate curve
+    # --------------------------------------------------
+
+    def rate(self, t):
+        """
+        Arrival rate at (continuous) times ``t``, vectorized.
+        """
+        t = np.asarray(t, dtype=np.float64)
+        phase = 2.0 * np.pi * (t - self.diurnal_peak) / self.period
+        rate = self.base_rate * (1.0 + self.diurnal_amplitude * np.cos(phase))
+
+        day_time = np.mod(t, self.period)
+        for peak in self.peaks:
+            # Distance to the peak centre on the daily circle
+            distance = np.abs(day_time - peak["center"])
+            distance = np.minimum(distance, self.period - distance)
+            rate = rate + peak["height"] * np.exp(
+                -0.5 * (distance / peak["width"]) ** 2
+            )
+
+        for surge in self.surges:
+            inside = (t >= surge["start"]) & (t < surge["end"])
+            rate = np.where(inside, rate * surge["multiplier"], rate)
+        return rate
+
+    def max_rate(self):
+        """
+        Upper bound on ``rate`` over all times (for thinning).
+        """
+        bound = self.base_rate * (1.0 + self.diurnal_amplitude)
+        bound += sum(peak["height"] for peak in self.peaks)
+        multiplier = max(
+            [1.0] + [surge["multiplier"] for surge in self.surges]
+        )
+        return bound * multiplier
+
+    # --------------------------------------------------
+    # Sampling
+    # --------------------------------------------------
+
+    def sample_times(self, rng, horizon: int, start: int = 0):
+        """
+        Sorted arrival ticks in start+1..horizon (one episode by
+        default). Several arrivals may share a tick.
+        """
+        lam_max = self.max_rate()
+        span = max(horizon - start, 0)
+        n = rng.poisson(lam_max * span) if lam_max > 0 else 0
+        candidates = rng.uniform(float(start), horizon, n)
+        keep = rng.random(n) * lam_max < self.rate(candidates)
+        times = np.floor(candidates[keep]).astype(np.int64) + 1
+
+        batch_times = self._sample_batches(rng, horizon, start)
+        if batch_times.size:
+            times = np.concatenate([times, batch_times])
+
+        times.sort(kind="stable")
+        return times
+
+    def _sample_batches(self, rng, horizon: int, start: int = 0):
+        starts, sizes, spreads = [], [], []
+        num_periods = -(-horizon // self.period)
+        for batch in self.batches:
+            offsets = np.asarray(batch["times"], dtype=np.int64)
+            days = np.arange(num_periods, dtype=np.int64) * self.period
+            batch_starts = (days[:, None] + offsets[None, :]).ravel()
+            # Batches that began before ``start`` may still be arriving
+            batch_starts = batch_starts[
+                (batch_starts < horizon)
+                & (batch_starts + batch.get("spread", 0) >= start)
+            ]
+            starts.append(batch_starts)
+            sizes.append(rng.poisson(batch["size"], batch_starts.size))
+            spreads.append(np.full(batch_starts.size, batch.get("spread", 0)))
+
+        if not starts:
+            return np.empty(0, dtype=np.int64)
+
+        sizes = np.concatenate(sizes)
+        starts = np.repeat(np.concatenate(starts), sizes)
+        spreads = np.repeat(np.concatenate(spreads), sizes)
+        jitter = np.floor(rng.random(starts.size) * (spreads + 1))
+        times = starts + jitter.astype(np.int64) + 1
+        return times[(times > start) & (times <= horizon)]
@@ -1,100 +1,121 @@
-# ==========================================================
-# Reference Configuration: Priority-Aware Lab Scheduling
-# ==========================================================
-# This configuration defines a single controlled experiment
-# used to study scheduling behavior under capacity pressure.
-# ==========================================================
-
-experiment:
-  name: "tight_capacity_priority_reference"
-  seed: 42
-  episode_length: 500
-  num_episodes_eval: 25
-
-# ----------------------------------------------------------
-# Environment Definition
-# ----------------------------------------------------------
-environment:
-  description: >
-    Single-stage laboratory scheduling environment with
-    explicit STAT vs non-STAT priorities and limited capacity.
-    Designed to induce congestion and deadline pressure.
-
-  num_machines: 2            # intentionally tight capacity
-  arrival_process:
-    type: "poisson"
-    rate: 0.9                # high load to induce pressure
-
-  job_types:
-    stat:
-      fraction: 0.2
-      service_time_mean: 10
-      deadline: 15
-      priority_weight: 5.0
-    routine:
-      fraction: 0.8
-      service_time_mean: 10
-      deadline: 40
-      priority_weight: 1.0
-
-# ----------------------------------------------------------
-# State Representation (Explicitly Scoped)
-# ----------------------------------------------------------
-state_representation:
-  features:
-    - queue_length
-    - stat_fraction_in_queue
-    - free_machine_count
-  notes: >
-    Reduced state chosen to isolate the effect of
-    priority encoding rather than state complexity.
-
-# ----------------------------------------------------------
-# Reward Definition
-# ----------------------------------------------------------
-reward:
-  type: "tardiness_penalty"
-  formulation: >
-    Negative reward proportional to job tardiness.
-    STAT jobs incur a higher penalty multiplier.
-  normalize: false
-
-# ----------------------------------------------------------
-# Baseline Policies
-# ----------------------------------------------------------
-baselines:
-  - name: "FIFO"
-    description: "First-in-first-out scheduling"
-
-# ----------------------------------------------------------
-# RL Agent Configuration
-# ----------------------------------------------------------
-rl_agent:
-  algorithm: "PPO"
-  network:
-    type: "MLP"
-    hidden_layers: [64, 64]
-    activation: "relu"
-
-  training:
-    total_timesteps: 200000
-    gamma: 0.99
-    learning_rate: 3.0e-4
-    clip_range: 0.2
-
-  notes: >
-    Hyperparameters chosen for stability rather than
-    optimality. No extensive tuning performed.
-
-# ----------------------------------------------------------
-# Evaluation Protocol
-# ----------------------------------------------------------
-evaluation:
-  comparison_metric: "average_episode_reward"
-  report:
-    include_variance: true
-    include_failure_cases: true
-
-  notes: >
-    Evaluation focuses on behavior under sustained
-    congestion rather than peak performance alone.
+import numpy as np
+
+
+class Job:
+    """
+    A laboratory sample waiting for, or undergoing, processing.
+
+    Jobs use ``__slots__``: long simulations create millions of them,
+    and a per-instance ``__dict__`` would dominate their footprint.
+    """
+
+    __slots__ = (
+        "job_id",
+        "arrival_time",
+        "service_time",
+        "remaining_time",
+        "deadline",
+        "is_stat",
+        "priority_weight",
+        "start_time",
+        "completion_time",
+    )
+
+    def __init__(
+        self,
+        job_id: int,
+        arrival_time: int,
+        service_time: int,
+        deadline: int,
+        is_stat: bool,
+        priority_weight: float = 1.0,
+    ):
+        self.job_id = job_id
+        self.arrival_time = arrival_time
+        self.service_time = service_time
+        self.remaining_time = service_time
+        self.deadline = deadline
+        self.is_stat = is_stat
+        self.priority_weight = priority_weight
+        self.start_time = None
+        self.completion_time = None
+
+    @property
+    def tardiness(self) -> int:
+        return max(0, self.completion_time - self.deadline)
+
+    def __repr__(self):
+        kind = "STAT" if self.is_stat else "routine"
+        return f"Job({self.job_id}, {kind}, arrival={self.arrival_time})"
+
+
+# --------------------------------------------------
+# Completed-job streaming
+# --------------------------------------------------
+
+COMPLETED_DTYPE = np.dtype([
+    ("job_id", np.int64),
+    ("is_stat", np.bool_),
+    ("arrival_time", np.int64),
+    ("start_time", np.int64),
+    ("completion_time", np.int64),
+    ("deadline", np.int64),
+    ("priority_weight", np.float64),
+])
+
+
+class CompletedJobWriter:
+    """
+    Completion sink that streams finished jobs to a binary file.
+
+    Completed jobs are copied into a fixed-size record buffer, which
+    is appended to ``path`` whenever it fills up, so the job objects
+    themselves can be released immediately. Attach it with
+    ``LabSchedulingEnv.add_completion_sink`` and read the file back
+    with ``read_completed_jobs``.
+    """
+
+    def __init__(self, path: str, buffer_size: int = 65536):
+        self.path = path
+        self._file = open(path, "ab")
+        self._buffer = np.empty(buffer_size, dtype=COMPLETED_DTYPE)
+        self._size = 0
+        self.count = 0
+
+    def add(self, job):
+        self._buffer[self._size] = (
+            job.job_id,
+            job.is_stat,
+            job.arrival_time,
+            job.start_time,
+            job.completion_time,
+            job.deadline,
+            job.priority_weight,
+        )
+        self._size += 1
+        self.count += 1
+        if self._size == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        self._buffer[:self._size].tofile(self._file)
+        self._file.flush()
+        self._size = 0
+
+    def close(self):
+        if not self._file.closed:
+            self.flush()
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_completed_jobs(path: str):
+    """
+    Memory-map a file written by CompletedJobWriter.
+    """
+    return np.memmap(path, dtype=COMPLETED_DTYPE, mode="r")
@@ -0,0 +1,429 @@
+import heapq
+import math
+from collections import deque
+
+
+class JobQueue:
+    """
+    Job queue with incrementally maintained orderings.
+
+    The same set of queued jobs is indexed several ways:
+    - FIFO order, with O(1) move-to-front for priority promotion
+    - STAT jobs and routine jobs, each in arrival order
+    - any priority index registered with ``add_index`` (the
+      earliest-deadline heap is registered on first use)
+
+    Per-class counts are updated on every insert and removal, so
+    observations never scan the queue. Removed jobs are dropped
+    lazily from each index once they reach its head, which keeps
+    every operation O(1) or O(log n) amortized regardless of how
+    deep the backlog grows. Entries that never reach a head (e.g.
+    under FIFO dispatch nothing reads the class deques) are purged in
+    one pass once they outnumber the queued jobs, so memory stays
+    proportional to the queue, not to the jobs ever seen.
+    """
+
+    def __init__(self):
+        self._fifo = deque()      # (token, job)
+        self._stat = deque()      # STAT jobs in arrival order
+        self._routine = deque()   # routine jobs in arrival order
+        self._indexes = {}
+
+        # job_id -> token of the job's live FIFO entry.
+        # A job is queued iff its id is present here.
+        self._tokens = {}
+        self._next_token = 0
+
+        self.stat_count = 0
+
+        # Upper bound on the stale entries of any one container
+        self._stale = 0
+
+    # --------------------------------------------------
+    # Size and membership
+    # --------------------------------------------------
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def __bool__(self):
+        return bool(self._tokens)
+
+    def __contains__(self, job):
+        return job.job_id in self._tokens
+
+    def __iter__(self):
+        """
+        Iterate over queued jobs in FIFO order (O(n), for inspection).
+        """
+        tokens = self._tokens
+        for token, job in self._fifo:
+            if tokens.get(job.job_id) == token:
+                yield job
+
+    @property
+    def routine_count(self):
+        return len(self._tokens) - self.stat_count
+
+    # --------------------------------------------------
+    # Mutation
+    # --------------------------------------------------
+
+    def append(self, job):
+        self._fifo.append((self._new_token(job), job))
+        if job.is_stat:
+            self._stat.append(job)
+            self.stat_count += 1
+        else:
+            self._routine.append(job)
+        for index in self._indexes.values():
+            index.push(job)
+
+    def popleft(self):
+        """
+        Remove and return the job at the front of the FIFO order.
+        """
+        self._clean_fifo()
+        _, job = self._fifo.popleft()
+        self._discard(job)
+        return job
+
+    def remove(self, job):
+        """
+        Remove an arbitrary queued job in O(1).
+        """
+        self._discard(job)
+
+    def move_to_front(self, job):
+        """
+        Promote a queued job to the front of the FIFO order.
+
+        The job's previous FIFO entry goes stale and is skipped later.
+        """
+        if self.peek() is job:
+            return
+        self._fifo.appendleft((self._new_token(job), job))
+        self._add_stale()
+
+    # --------------------------------------------------
+    # Ordered views
+    # --------------------------------------------------
+
+    def peek(self):
+        """
+        Front of the FIFO order, or None if the queue is empty.
+        """
+        self._clean_fifo()
+        return self._fifo[0][1] if self._fifo else None
+
+    def peek_stat(self):
+        """
+        Earliest-arriving queued STAT job, or None.
+        """
+        return self._peek_class(self._stat)
+
+    def peek_routine(self):
+        """
+        Earliest-arriving queued routine job, or None.
+        """
+        return self._peek_class(self._routine)
+
+    def peek_deadline(self):
+        """
+        Queued job with the earliest deadline (ties by job id), or None.
+        """
+        index = self._indexes.get("deadline")
+        if index is None:
+            index = self.add_index(
+                "deadline", PriorityIndex(lambda job: job.deadline)
+            )
+        return index.best()
+
+    def add_index(self, name, index):
+        """
+        Register a priority index, seeding it with the queued jobs.
+        From then on it is updated on every append.
+        """
+        index.attach(self)
+        for job in self:
+            index.push(job)
+        self._indexes[name] = index
+        return index
+
+    def index(self, name):
+        """
+        Registered index by name, or None.
+        """
+        return self._indexes.get(name)
+
+    # --------------------------------------------------
+    # Snapshot / restore
+    # --------------------------------------------------
+
+    def snapshot(self):
+        """
+        Capture the queue and its indexes. Only containers are
+        copied; the jobs themselves are shared.
+        """
+        return (
+            self._fifo.copy(),
+            self._stat.copy(),
+            self._routine.copy(),
+            self._tokens.copy(),
+            self._next_token,
+            self.stat_count,
+            self._stale,
+            {name: (index, index.snapshot())
+             for name, index in self._indexes.items()},
+        )
+
+    def restore(self, state):
+        """
+        Roll the queue back to ``state``. Indexes registered since
+        the snapshot are dropped.
+        """
+        (fifo, stat, routine, tokens, self._next_token, self.stat_count,
+         self._stale, indexes) = state
+        self._fifo = fifo.copy()
+        self._stat = stat.copy()
+        self._routine = routine.copy()
+        self._tokens = tokens.copy()
+        self._indexes = {}
+        for name, (index, index_state) in indexes.items():
+            index.restore(index_state)
+            self._indexes[name] = index
+
+    # --------------------------------------------------
+    # Internals
+    # --------------------------------------------------
+
+    def _new_token(self, job):
+        token = self._next_token
+        self._next_token += 1
+        self._tokens[job.job_id] = token
+        return token
+
+    def _clean_fifo(self):
+        fifo, tokens = self._fifo, self._tokens
+        while fifo and tokens.get(fifo[0][1].job_id) != fifo[0][0]:
+            fifo.popleft()
+
+    def _peek_class(self, jobs):
+        tokens = self._tokens
+        while jobs and jobs[0].job_id not in tokens:
+            jobs.popleft()
+        return jobs[0] if jobs else None
+
+    def _discard(self, job):
+        del self._tokens[job.job_id]
+        if job.is_stat:
+            self.stat_count -= 1
+        self._add_stale()
+
+    # Queues shorter than this are never compacted
+    _MIN_COMPACT = 64
+
+    def _add_stale(self):
+        self._stale += 1
+        if self._stale > max(len(self._tokens), self._MIN_COMPACT):
+            self._compact()
+
+    def _compact(self):
+        """
+        Drop every stale entry. Costs O(live + stale) and runs only
+        after as many stale entries have built up, so it adds O(1)
+        amortized to each removal.
+        """
+        tokens = self._tokens
+        self._fifo = deque(
+            entry for entry in self._fifo
+            if tokens.get(entry[1].job_id) == entry[0]
+        )
+        self._stat = deque(job for job in self._stat if job.job_id in tokens)
+        self._routine = deque(
+            job for job in self._routine if job.job_id in tokens
+        )
+        for index in self._indexes.values():
+            index.compact()
+        self._stale = 0
+
+
+# ==================================================
+# Priority indexes
+# ==================================================
+
+class PriorityIndex:
+    """
+    Min-heap of queued jobs under a static key (e.g. deadline,
+    service time). Ties break by job id, i.e. by arrival order.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self._heap = []
+        self._queue = None
+
+    def attach(self, queue):
+        self._queue = queue
+
+    def push(self, job):
+        heapq.heappush(self._heap, (self.key(job), job.job_id, job))
+
+    def snapshot(self):
+        return self._heap[:]
+
+    def restore(self, state):
+        self._heap = state[:]
+
+    def compact(self):
+        queue = self._queue
+        self._heap = [entry for entry in self._heap if entry[2] in queue]
+        heapq.heapify(self._heap)
+
+    def best(self, time=None):
+        heap, queue = self._heap, self._queue
+        while heap and heap[0][2] not in queue:
+            heapq.heappop(heap)
+        return heap[0][2] if heap else None
+
+
+class WeightedSlackIndex:
+    """
+    Minimum weighted slack, where slack = deadline - service_time - t.
+
+    Positive slack is divided by the job weight and negative slack
+    multiplied by it, so heavier jobs look more urgent either way.
+    That transform is monotone in slack, so within one weight class
+    the order is fixed by ``deadline - service_time``. One heap per
+    weight class is kept and only the class heads are compared at
+    decision time.
+    """
+
+    def __init__(self):
+        self._heaps = {}
+        self._queue = None
+
+    def attach(self, queue):
+        self._queue = queue
+
+    def push(self, job):
+        heap = self._heaps.setdefault(job.priority_weight, [])
+        heapq.heappush(
+            heap, (job.deadline - job.service_time, job.job_id, job)
+        )
+
+    def snapshot(self):
+        return {weight: heap[:] for weight, heap in self._heaps.items()}
+
+    def restore(self, state):
+        self._heaps = {weight: heap[:] for weight, heap in state.items()}
+
+    def compact(self):
+        queue = self._queue
+        for weight, heap in self._heaps.items():
+            heap[:] = [entry for entry in heap if entry[2] in queue]
+            heapq.heapify(heap)
+
+    @staticmethod
+    def weighted_slack(slack, weight):
+        return slack / weight if slack > 0 else slack * weight
+
+    def best(self, time):
+        queue = self._queue
+        best_key, best_job = None, None
+        for weight, heap in self._heaps.items():
+            while heap and heap[0][2] not in queue:
+                heapq.heappop(heap)
+            if not heap:
+                continue
+            latest_start, job_id, job = heap[0]
+            key = (self.weighted_slack(latest_start - time, weight), job_id)
+            if best_key is None or key < best_key:
+                best_key, best_job = key, job
+        return best_job
+
+
+class ATCIndex:
+    """
+    Apparent Tardiness Cost:
+
+        I_j(t) = (w_j / p_j) * exp(-max(0, d_j - p_j - t) / (k * p_bar))
+
+    ``p_bar`` is fixed (the configured mean service time), which makes
+    the ranking exact with heaps:
+
+    - while slack is positive, log I_j(t) = log(w_j/p_j)
+      - (d_j - p_j)/(k p_bar) + t/(k p_bar), so jobs rank by a
+      time-invariant key
+    - once slack runs out, jobs rank by log(w_j/p_j) alone
+
+    Jobs migrate from the first heap to the second as time passes
+    their latest start ``d_j - p_j``, tracked by a third heap.
+    """
+
+    def __init__(self, k: float, p_bar: float):
+        self.scale = k * p_bar
+        self._early = []     # (-early key, job_id, job)
+        self._late = []      # (-log(w/p), job_id, job)
+        self._pending = []   # (d - p, job_id, job) for jobs in _early
+        self._late_ids = set()
+        self._queue = None
+
+    def attach(self, queue):
+        self._queue = queue
+
+    def push(self, job):
+        log_ratio = math.log(job.priority_weight / job.service_time)
+        latest_start = job.deadline - job.service_time
+        early_key = log_ratio - latest_start / self.scale
+        heapq.heappush(self._early, (-early_key, job.job_id, job))
+        heapq.heappush(self._pending, (latest_start, job.job_id, job))
+
+    def snapshot(self):
+        return (
+            self._early[:], self._late[:], self._pending[:],
+            self._late_ids.copy(),
+        )
+
+    def restore(self, state):
+        early, late, pending, late_ids = state
+        self._early, self._late = early[:], late[:]
+        self._pending, self._late_ids = pending[:], late_ids.copy()
+
+    def compact(self):
+        queue = self._queue
+        for heap in (self._early, self._late, self._pending):
+            heap[:] = [entry for entry in heap if entry[2] in queue]
+            heapq.heapify(heap)
+        self._late_ids = {entry[1] for entry in self._late}
+
+    def best(self, time):
+        queue = self._queue
+
+        # Jobs whose slack has run out move to the late heap
+        pending = self._pending
+        while pending and pending[0][0] <= time:
+            _, job_id, job = heapq.heappop(pending)
+            if job in queue:
+                self._late_ids.add(job_id)
+                heapq.heappush(
+                    self._late,
+                    (-math.log(job.priority_weight / job.service_time),
+                     job_id, job)
+                )
+
+        early, late = self._early, self._late
+        while early and (
+            early[0][2] not in queue or early[0][1] in self._late_ids
+        ):
+            heapq.heappop(early)
+        while late and late[0][2] not in queue:
+            self._late_ids.discard(heapq.heappop(late)[1])
+
+        candidates = []
+        if early:
+            neg_key, job_id, job = early[0]
+            candidates.append((neg_key - time / self.scale, job_id, job))
+        if late:
+            candidates.append(late[0])
+        return min(candidates)[2] if candidates else None
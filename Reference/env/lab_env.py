@@ -1,9 +1,15 @@
+import heapq
+
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 
+from .config import as_env_config
+from .event import Event, EventType
 from .job import Job
-from .machine import Machine
+from .job_queue import JobQueue
+from .machine import IdleMachineList, Machine
+from .traces import ArrivalReplay, generate_episode
 
 
 class LabSchedulingEnv(gym.Env):
@@ -16,24 +22,59 @@ class LabSchedulingEnv(gym.Env):
     - The agent may assign a job to an idle machine
     - Machines process jobs
     - Completed jobs generate reward penalties
+
+    With ``event_driven: true`` in the config, the environment runs
+    as a discrete-event simulation instead: arrivals and completions
+    are kept on a heap of events, and ``step`` jumps straight to the
+    next decision point (a queued job and an idle machine), returning
+    the penalties accumulated along the way. Ticks on which every
+    action is a no-op are never exposed to the policy.
+
+    ``auto_advance: true`` gives the tick engine the same behaviour:
+    after each action it keeps ticking until a real choice exists.
+    In every mode ``info["action_mask"]`` marks the actions that can
+    take effect (idle machines while jobs are queued; the no-op is
+    always valid) and ``info["elapsed"]`` is the number of ticks the
+    step covered.
+
+    Arrivals are sampled from ``np_random`` by default, at the
+    constant ``arrival_rate``; a ``demand`` profile in the config
+    (see env.demand) instead draws a time-varying episode of
+    arrivals at reset. Passing a TraceSet as ``traces`` (or arrival
+    records via ``reset(options={"arrivals": ...})``) replays
+    pre-generated arrivals instead; select the episode with
+    ``reset(options={"episode": i})``.
+
+    ``snapshot()`` captures the complete simulator state (clock,
+    queue and indexes, machines, pending events, replay cursor and
+    RNG) and ``restore(snapshot)`` rolls back to it, any number of
+    times. Both copy containers only, never the queued jobs, which
+    makes forking the simulation cheap enough to do at every
+    decision (see policies.lookahead).
     """
 
     metadata = {"render_modes": []}
 
-    def __init__(self, config: dict):
+    def __init__(self, config, traces=None):
         super().__init__()
 
-        self.cfg = config
+        self.cfg = as_env_config(config)
+        self.traces = traces
+        self._replay = None
+
+        # Objects with an ``add(job)`` method, called on every completion
+        self.completion_sinks = []
         self.current_time = 0
         self.job_counter = 0
 
-        # Machines
+        # Machines and idle-machine free list
         self.machines = [
-            Machine(i) for i in range(self.cfg["num_machines"])
+            Machine(i) for i in range(self.cfg.num_machines)
         ]
+        self.idle_machines = IdleMachineList(len(self.machines))
 
-        # Job queue
-        self.queue = []
+        # Job queue (FIFO, STAT and deadline orderings)
+        self.queue = JobQueue()
 
         # Observation:
         # [queue_length, fraction_STAT_in_queue, free_machine_count]
@@ -48,11 +89,17 @@ class LabSchedulingEnv(gym.Env):
         # 0..(num_machines-1) → assign next job to that machine
         # num_machines        → do nothing
         self.action_space = spaces.Discrete(
-            self.cfg["num_machines"] + 1
+            self.cfg.num_machines + 1
         )
 
         self.np_random = None
-        self.max_time = self.cfg["episode_length"]
+        self.max_time = self.cfg.episode_length
+
+        # Discrete-event mode: heap of (time, seq, Event)
+        self.event_driven = self.cfg.event_driven
+        self.auto_advance = self.cfg.auto_advance
+        self._events = []
+        self._event_seq = 0
 
     # --------------------------------------------------
     # Environment core
@@ -63,14 +110,41 @@ class LabSchedulingEnv(gym.Env):
 
         self.current_time = 0
         self.job_counter = 0
-        self.queue = []
+        self.queue = JobQueue()
 
         self.machines = [
-            Machine(i) for i in range(self.cfg["num_machines"])
+            Machine(i) for i in range(self.cfg.num_machines)
         ]
+        self.idle_machines = IdleMachineList(len(self.machines))
 
         self.np_random = np.random.default_rng(seed)
-        return self._get_obs(), {}
+
+        options = options or {}
+        if "arrivals" in options:
+            arrivals = options["arrivals"]
+            if isinstance(arrivals, np.ndarray):
+                arrivals = [arrivals]
+            self._replay = ArrivalReplay(arrivals)
+        elif self.traces is not None:
+            episode = options.get("episode", 0)
+            self._replay = ArrivalReplay([self.traces.episode(episode)])
+        elif self.cfg.demand is not None:
+            # Time-varying demand: draw the whole episode up front
+            self._replay = ArrivalReplay(
+                [generate_episode(self.cfg, self.np_random, self.max_time)]
+            )
+        else:
+            self._replay = None
+
+        if self.event_driven:
+            self._events = []
+            self._event_seq = 0
+            self._schedule_next_arrival()
+            self._run_until_decision(self.current_time)
+        elif self.auto_advance:
+            self._tick_until_decision()
+
+        return self._get_obs(), {"action_mask": self.action_mask()}
 
     # --------------------------------------------------
     # Arrival process
@@ -78,56 +152,98 @@ class LabSchedulingEnv(gym.Env):
 
     def _generate_arrivals(self):
         """
-        Generate new jobs according to a Poisson process.
+        Generate new jobs according to a Poisson process, or release
+        the replayed arrivals that are due.
+        """
+        replay = self._replay
+        if replay is not None:
+            time = replay.peek_time()
+            while time is not None and time <= self.current_time:
+                self.queue.append(self._job_from_record(replay.pop()))
+                time = replay.peek_time()
+            return
+
+        if self.np_random.random() < self.cfg.arrival_rate:
+            self.queue.append(self._create_job())
+
+    def _create_job(self):
         """
-        if self.np_random.random() < self.cfg["arrival_rate"]:
-            is_stat = self.np_random.random() < self.cfg["stat_fraction"]
+        Sample the class and service time of a job arriving now.
+        """
+        is_stat = self.np_random.random() < self.cfg.stat_fraction
 
-            if is_stat:
-                deadline_offset = self.cfg["stat_deadline"]
-                priority_weight = self.cfg["stat_priority_weight"]
-            else:
-                deadline_offset = self.cfg["routine_deadline"]
-                priority_weight = self.cfg["routine_priority_weight"]
-
-            service_time = max(
-                1,
-                int(
-                    self.np_random.exponential(
-                        self.cfg["service_time_mean"]
-                    )
+        if is_stat:
+            deadline_offset = self.cfg.stat_deadline
+            priority_weight = self.cfg.stat_priority_weight
+        else:
+            deadline_offset = self.cfg.routine_deadline
+            priority_weight = self.cfg.routine_priority_weight
+
+        service_time = max(
+            1,
+            int(
+                self.np_random.exponential(
+                    self.cfg.service_time_mean
                 )
             )
+        )
 
-            job = Job(
-                job_id=self.job_counter,
-                arrival_time=self.current_time,
-                service_time=service_time,
-                deadline=self.current_time + deadline_offset,
-                is_stat=is_stat
-            )
+        job = Job(
+            job_id=self.job_counter,
+            arrival_time=self.current_time,
+            service_time=service_time,
+            deadline=self.current_time + deadline_offset,
+            is_stat=is_stat,
+            priority_weight=priority_weight
+        )
 
-            job.priority_weight = priority_weight
-            self.queue.append(job)
-            self.job_counter += 1
+        self.job_counter += 1
+        return job
+
+    def _job_from_record(self, record):
+        """
+        Build a job from a replayed arrival record.
+        """
+        _, is_stat, service_time, deadline, priority_weight = record
+
+        job = Job(
+            job_id=self.job_counter,
+            arrival_time=self.current_time,
+            service_time=service_time,
+            deadline=deadline,
+            is_stat=is_stat,
+            priority_weight=priority_weight
+        )
+
+        self.job_counter += 1
+        return job
 
     # --------------------------------------------------
     # Observation
     # --------------------------------------------------
 
+    def action_mask(self):
+        """
+        Boolean mask over actions that can take effect now.
+        """
+        mask = np.zeros(self.action_space.n, dtype=bool)
+        mask[-1] = True
+        if len(self.queue) > 0:
+            mask[:-1] = self.idle_machines.as_mask()
+        return mask
+
     def _get_obs(self):
-        if len(self.queue) == 0:
+        queue_length = len(self.queue)
+        if queue_length == 0:
             stat_fraction = 0.0
         else:
-            stat_fraction = np.mean([j.is_stat for j in self.queue])
-
-        free_machines = sum(m.is_idle() for m in self.machines)
+            stat_fraction = self.queue.stat_count / queue_length
 
         return np.array(
             [
-                len(self.queue),
+                queue_length,
                 stat_fraction,
-                free_machines
+                len(self.idle_machines)
             ],
             dtype=np.float32
         )
@@ -137,31 +253,331 @@ class LabSchedulingEnv(gym.Env):
     # --------------------------------------------------
 
     def step(self, action):
-        reward = 0.0
+        if self.event_driven:
+            return self._step_events(action)
+
+        start_time = self.current_time
 
         # 1. Agent assignment decision
+        self._dispatch(action)
+
+        # 2.-4. Advance time, arrivals, machine processing
+        reward = self._tick()
+
+        # Optionally skip ticks on which no action could take effect
+        if self.auto_advance:
+            reward += self._tick_until_decision()
+
+        # 5. Termination
+        terminated = self.current_time >= self.max_time
+        truncated = False
+
+        return self._get_obs(), reward, terminated, truncated, \
+            self._step_info(start_time)
+
+    def _tick(self):
+        self.current_time += 1
+        self._generate_arrivals()
+        return self._process_machines()
+
+    def _tick_until_decision(self):
+        reward = 0.0
+        while self.current_time < self.max_time and not self._has_decision():
+            reward += self._tick()
+        return reward
+
+    def _step_info(self, start_time):
+        return {
+            "action_mask": self.action_mask(),
+            "elapsed": self.current_time - start_time,
+        }
+
+    def _dispatch(self, action):
+        """
+        Assign the job at the head of the queue to the chosen machine.
+
+        Returns the job if the assignment took place, else None.
+        """
         if action < len(self.machines):
             machine = self.machines[action]
             if machine.is_idle() and len(self.queue) > 0:
-                job = self.queue.pop(0)
+                job = self.queue.popleft()
                 machine.assign(job, self.current_time)
+                self.idle_machines.acquire(action)
+                return job
+        return None
 
-        # 2. Advance time
-        self.current_time += 1
-
-        # 3. New arrivals
-        self._generate_arrivals()
-
-        # 4. Machine processing
+    def _process_machines(self):
+        """
+        Advance every machine by one tick and collect penalties.
+        """
+        reward = 0.0
         for machine in self.machines:
             finished_job = machine.step(self.current_time)
             if finished_job is not None:
-                tardiness = finished_job.tardiness
-                penalty = tardiness * finished_job.priority_weight
-                reward -= penalty
+                reward -= self._on_completion(machine, finished_job)
+        return reward
+
+    def add_completion_sink(self, sink):
+        """
+        Stream every completed job to ``sink.add(job)``
+        (e.g. a CompletedJobWriter).
+        """
+        self.completion_sinks.append(sink)
+
+    def accrued_tardiness(self):
+        """
+        Weighted tardiness already accrued by unfinished jobs (queued
+        or running) at the current time. Rewards only count jobs once
+        they complete, so this is the penalty still outstanding, e.g.
+        when the episode ends.
+        """
+        now = self.current_time
+        accrued = 0.0
+        for job in self.queue:
+            if job.deadline < now:
+                accrued += (now - job.deadline) * job.priority_weight
+        for machine in self.machines:
+            job = machine.current_job
+            if job is not None and job.deadline < now:
+                accrued += (now - job.deadline) * job.priority_weight
+        return accrued
+
+    def _on_completion(self, machine, job):
+        """
+        Return a machine to the free list, hand the finished job to
+        the completion sinks and compute its penalty.
+        """
+        self.idle_machines.release(machine.machine_id)
+        for sink in self.completion_sinks:
+            sink.add(job)
+        return job.tardiness * job.priority_weight
+
+    # --------------------------------------------------
+    # Snapshot / restore
+    # --------------------------------------------------
+
+    def fork_arrivals(self, rng, horizon: int):
+        """
+        Replace the arrivals after the current time with a fresh draw
+        from the configured arrival model (demand profile or constant
+        rate), using ``rng`` for up to ``horizon`` ticks.
+
+        For rollouts that must not see the real future, e.g. from a
+        trace; ``restore`` brings the real stream and generator back.
+        """
+        self.np_random = rng
+        self._replay = None
+        if self.cfg.demand is not None:
+            end = min(self.current_time + horizon, self.max_time)
+            self._replay = ArrivalReplay(
+                [generate_episode(self.cfg, rng, end, self.current_time)]
+            )
+
+        if self.event_driven:
+            # The pending arrival was drawn from the real stream
+            self._events = [
+                entry for entry in self._events
+                if entry[2].type is not EventType.ARRIVAL
+            ]
+            heapq.heapify(self._events)
+            self._schedule_next_arrival()
+
+    def snapshot(self):
+        """
+        Capture the full simulator state for ``restore``.
+
+        Completion sinks are not part of the state: detach them while
+        exploring branches that should not be recorded. Snapshots nest
+        freely and each can be restored any number of times.
+        """
+        running = []
+        for machine in self.machines:
+            job = machine.current_job
+            if job is not None:
+                running.append((machine, job, job.remaining_time))
+
+        replay = self._replay
+        return EnvSnapshot(
+            self.current_time,
+            self.job_counter,
+            self.np_random,
+            self.np_random.bit_generator.state,
+            self.queue.snapshot(),
+            self.idle_machines.snapshot(),
+            running,
+            self._events[:],
+            self._event_seq,
+            replay,
+            replay.snapshot() if replay is not None else None,
+        )
+
+    def restore(self, snapshot):
+        """
+        Roll the environment back to ``snapshot``.
+        """
+        self.current_time = snapshot.current_time
+        self.job_counter = snapshot.job_counter
+        # fork_arrivals may have swapped the generator itself
+        self.np_random = snapshot.rng
+        self.np_random.bit_generator.state = snapshot.rng_state
+        self.queue.restore(snapshot.queue)
+        self.idle_machines.restore(snapshot.idle_machines)
+
+        # Queued jobs dispatched after the snapshot go back to
+        # waiting; the restore already costs O(queue) for the copy
+        for job in self.queue:
+            if job.start_time is not None:
+                job.remaining_time = job.service_time
+                job.start_time = None
+                job.completion_time = None
+
+        for machine in self.machines:
+            machine.current_job = None
+        for machine, job, remaining_time in snapshot.running:
+            machine.current_job = job
+            job.remaining_time = remaining_time
+            job.completion_time = None
+
+        self._events = snapshot.events[:]
+        self._event_seq = snapshot.event_seq
+        self._replay = snapshot.replay
+        if snapshot.replay is not None:
+            snapshot.replay.restore(snapshot.replay_state)
+
+    # --------------------------------------------------
+    # Discrete-event engine
+    # --------------------------------------------------
+
+    def _step_events(self, action):
+        start_time = self.current_time
+        job = self._dispatch(action)
+        if job is not None:
+            self._push_event(
+                self.current_time + job.remaining_time,
+                EventType.COMPLETION,
+                self.machines[action],
+            )
+
+        # Time always moves at least one tick after a decision, which
+        # keeps the one-assignment-per-tick semantics of tick mode.
+        reward = 0.0
+        if self.current_time < self.max_time:
+            reward = self._run_until_decision(self.current_time + 1)
 
-        # 5. Termination
         terminated = self.current_time >= self.max_time
         truncated = False
 
-        return self._get_obs(), reward, terminated, truncated, {}
+        return self._get_obs(), reward, terminated, truncated, \
+            self._step_info(start_time)
+
+    def _push_event(self, time, event_type, payload=None):
+        heapq.heappush(
+            self._events,
+            (time, self._event_seq, Event(time, event_type, payload))
+        )
+        self._event_seq += 1
+
+    def _schedule_next_arrival(self):
+        """
+        Schedule the next arrival after the current time.
+
+        Per-tick Bernoulli arrivals are equivalent to geometric
+        inter-arrival gaps, so idle stretches cost a single draw.
+        Replayed arrivals are scheduled at their recorded time.
+        """
+        if self._replay is not None:
+            time = self._replay.peek_time()
+            if time is not None and time <= self.max_time:
+                self._push_event(
+                    max(time, self.current_time), EventType.ARRIVAL
+                )
+            return
+
+        rate = self.cfg.arrival_rate
+        if rate <= 0.0:
+            return
+        gap = int(self.np_random.geometric(min(rate, 1.0)))
+        time = self.current_time + gap
+        if time <= self.max_time:
+            self._push_event(time, EventType.ARRIVAL)
+
+    def _has_decision(self):
+        return len(self.queue) > 0 and len(self.idle_machines) > 0
+
+    def _run_until_decision(self, target):
+        """
+        Process events up to ``target``, then keep jumping to the
+        next event time until a decision exists or the episode ends.
+
+        Returns the accumulated reward.
+        """
+        reward = 0.0
+        while True:
+            reward += self._advance_events(target)
+            if self.current_time >= self.max_time or self._has_decision():
+                return reward
+            if self._events:
+                target = min(self._events[0][0], self.max_time)
+            else:
+                target = self.max_time
+
+    def _advance_events(self, until):
+        """
+        Process every event with ``time <= until`` in time order.
+        """
+        reward = 0.0
+        events = self._events
+        while events and events[0][0] <= until:
+            time, _, event = heapq.heappop(events)
+            self.current_time = time
+
+            if event.type is EventType.ARRIVAL:
+                if self._replay is not None:
+                    job = self._job_from_record(self._replay.pop())
+                else:
+                    job = self._create_job()
+                self.queue.append(job)
+                self._schedule_next_arrival()
+            else:
+                machine = event.payload
+                finished_job = machine.complete(time)
+                reward -= self._on_completion(machine, finished_job)
+
+        self.current_time = until
+        return reward
+
+
+class EnvSnapshot:
+    """
+    Opaque simulator state returned by LabSchedulingEnv.snapshot.
+    """
+
+    __slots__ = (
+        "current_time",
+        "job_counter",
+        "rng",
+        "rng_state",
+        "queue",
+        "idle_machines",
+        "running",
+        "events",
+        "event_seq",
+        "replay",
+        "replay_state",
+    )
+
+    def __init__(self, current_time, job_counter, rng, rng_state, queue,
+                 idle_machines, running, events, event_seq, replay,
+                 replay_state):
+        self.current_time = current_time
+        self.job_counter = job_counter
+        self.rng = rng
+        self.rng_state = rng_state
+        self.queue = queue
+        self.idle_machines = idle_machines
+        self.running = running
+        self.events = events
+        self.event_seq = event_seq
+        self.replay = replay
+        self.replay_state = replay_state
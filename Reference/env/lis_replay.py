@@ -0,0 +1,201 @@
+"""
+Shadow-mode replay of historical LIS sample logs.
+
+A laboratory information system export has one row per sample with
+(at least) when it was received, its priority, how long the analyzer
+actually took, and when processing actually started. This module
+streams such exports chunk by chunk, turns each chunk into arrival
+records for LabSchedulingEnv, and runs any policy against them while
+comparing its dispatch decisions with what the lab actually did.
+
+Only one chunk of the file, plus the jobs currently queued in the
+simulation, is held in memory at a time: recorded start ticks are
+dropped as jobs are dispatched, and JobQueue compacts its orderings
+once departed jobs outnumber queued ones. Exports with tens of
+millions of rows therefore replay in memory bounded by the chunk size
+and the queue length.
+
+pandas (CSV) and pyarrow (Parquet) are imported only when a file of
+that format is read.
+"""
+
+import numpy as np
+
+from .config import EnvConfig
+from .traces import TRACE_DTYPE
+
+
+DEFAULT_COLUMNS = {
+    "arrival": "received_at",
+    "priority": "priority",
+    "service": "service_minutes",
+    "start": "started_at",
+}
+
+
+# --------------------------------------------------
+# Chunked readers
+# --------------------------------------------------
+
+def _read_frames(path, columns, chunksize):
+    if str(path).endswith((".parquet", ".pq")):
+        import pyarrow.parquet as pq
+
+        source = pq.ParquetFile(path)
+        for batch in source.iter_batches(batch_size=chunksize,
+                                         columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def iter_lis_chunks(path, cfg: EnvConfig, columns=None,
+                    chunksize=100_000, tick="1min", origin=None,
+                    stat_labels=("STAT",)):
+    """
+    Stream an LIS export as (records, actual_start) chunks.
+
+    ``records`` is a TRACE_DTYPE array ready for ArrivalReplay, with
+    deadlines and weights taken from the class settings in ``cfg``;
+    ``actual_start`` holds the tick at which the lab really started
+    each sample. Times are converted to integer ticks counted from
+    ``origin`` (default: the first arrival in the file). Rows must be
+    sorted by arrival time.
+    """
+    import pandas as pd
+
+    columns = {**DEFAULT_COLUMNS, **(columns or {})}
+    tick = pd.Timedelta(tick)
+    tick_minutes = tick / pd.Timedelta("1min")
+    stat_labels = {str(label).upper() for label in stat_labels}
+
+    for frame in _read_frames(path, list(columns.values()), chunksize):
+        arrival = pd.to_datetime(frame[columns["arrival"]])
+        start = pd.to_datetime(frame[columns["start"]])
+        if origin is None:
+            origin = arrival.iloc[0]
+
+        times = ((arrival - origin) // tick).to_numpy(np.int64) + 1
+        is_stat = (
+            frame[columns["priority"]].astype(str).str.upper()
+            .isin(stat_labels).to_numpy()
+        )
+        service = np.maximum(
+            1,
+            np.ceil(
+                frame[columns["service"]].to_numpy(np.float64) / tick_minutes
+            ).astype(np.int64),
+        )
+
+        records = np.empty(len(frame), dtype=TRACE_DTYPE)
+        records["time"] = times
+        records["is_stat"] = is_stat
+        records["service_time"] = service
+        records["deadline"] = times + np.where(
+            is_stat, cfg.stat_deadline, cfg.routine_deadline
+        )
+        records["priority_weight"] = np.where(
+            is_stat,
+            cfg.stat_priority_weight,
+            cfg.routine_priority_weight,
+        )
+
+        actual_start = ((start - origin) // tick).to_numpy(np.int64) + 1
+        yield records, actual_start
+
+
+# --------------------------------------------------
+# Shadow comparison
+# --------------------------------------------------
+
+class ShadowComparison:
+    """
+    Streaming comparison of a policy against historical decisions.
+
+    At every dispatch the policy makes, the job it picked is compared
+    with the queued job the lab actually started first. Waiting times
+    are accumulated as running sums, so nothing grows with the length
+    of the log.
+    """
+
+    def __init__(self):
+        self.decisions = 0
+        self.agreements = 0
+        self.simulated_wait = 0.0
+        self.actual_wait = 0.0
+
+    @property
+    def agreement_rate(self):
+        return self.agreements / self.decisions if self.decisions else 0.0
+
+    def summary(self):
+        n = max(self.decisions, 1)
+        return {
+            "decisions": self.decisions,
+            "agreement_rate": self.agreement_rate,
+            "mean_simulated_wait": self.simulated_wait / n,
+            "mean_actual_wait": self.actual_wait / n,
+        }
+
+
+def shadow_replay(env, policy, path, columns=None, chunksize=100_000,
+                  tick="1min", stat_labels=("STAT",)):
+    """
+    Drive ``env`` from an LIS export and shadow ``policy`` against it.
+
+    Returns (total_reward, ShadowComparison). The episode ends at
+    ``episode_length`` ticks or when the log is exhausted.
+    """
+    from .job_queue import PriorityIndex
+
+    # job_id -> recorded start tick, for jobs that are queued or about
+    # to arrive. Replayed jobs get consecutive ids in record order, so
+    # ids can be assigned as each chunk is read.
+    actual_start = {}
+    next_job_id = 0
+
+    def records():
+        nonlocal next_job_id
+        for chunk, starts in iter_lis_chunks(
+            path, env.cfg, columns, chunksize, tick,
+            stat_labels=stat_labels,
+        ):
+            ids = range(next_job_id, next_job_id + len(chunk))
+            actual_start.update(zip(ids, starts.tolist()))
+            next_job_id += len(chunk)
+            yield chunk
+
+    env.reset(options={"arrivals": records()})
+    lab_order = env.queue.add_index(
+        "actual_start", PriorityIndex(lambda job: actual_start[job.job_id])
+    )
+
+    comparison = ShadowComparison()
+    total_reward = 0.0
+    done = False
+
+    while not done:
+        action = policy.select_action(env)
+        chosen = env.queue.peek()
+        lab_choice = lab_order.best()
+        time = env.current_time
+
+        _, reward, done, _, _ = env.step(action)
+        total_reward += reward
+
+        if chosen is not None and chosen.start_time == time:
+            comparison.decisions += 1
+            comparison.agreements += chosen is lab_choice
+            comparison.simulated_wait += time - chosen.arrival_time
+            comparison.actual_wait += (
+                actual_start.pop(chosen.job_id) - chosen.arrival_time
+            )
+
+        log_exhausted = env._replay.peek_time() is None
+        lab_idle = len(env.idle_machines) == len(env.machines)
+        if log_exhausted and len(env.queue) == 0 and lab_idle:
+            break
+
+    return total_reward, comparison
@@ -1,3 +1,8 @@
+import heapq
+
+import numpy as np
+
+
 class Machine:
     """
     Represents a single laboratory machine/server.
@@ -29,3 +34,87 @@ class Machine:
             return finished_job
 
         return None
+
+    def complete(self, current_time: int):
+        """
+        Finish the current job at ``current_time``.
+
+        Used by the discrete-event engine, which schedules the
+        completion up front instead of counting down tick by tick.
+        """
+        finished_job = self.current_job
+        finished_job.remaining_time = 0
+        finished_job.completion_time = current_time
+        self.current_job = None
+        return finished_job
+
+
+class IdleMachineList:
+    """
+    Free list of idle machines, ordered by machine id.
+
+    A min-heap of machine ids with lazy deletion: acquiring a machine
+    only flips its flag, and stale heap entries are discarded when
+    they surface. ``first`` returns the lowest-numbered idle machine
+    in O(log M) amortized, and the idle count is always O(1).
+    """
+
+    def __init__(self, num_machines: int, idle=None):
+        """
+        ``idle`` lists the machine ids that start out idle (default:
+        all). Machines left out are treated as busy until released.
+        """
+        heap = sorted(range(num_machines) if idle is None else idle)
+        self._idle = [False] * num_machines
+        for machine_id in heap:
+            self._idle[machine_id] = True
+        self._in_heap = self._idle[:]
+        self._heap = heap
+        self._count = len(heap)
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, machine_id: int):
+        return self._idle[machine_id]
+
+    def as_mask(self):
+        """
+        Boolean array of idle flags indexed by machine id.
+        """
+        return np.array(self._idle, dtype=bool)
+
+    def snapshot(self):
+        return (self._idle[:], self._in_heap[:], self._heap[:], self._count)
+
+    def restore(self, state):
+        idle, in_heap, heap, self._count = state
+        self._idle, self._in_heap, self._heap = idle[:], in_heap[:], heap[:]
+
+    def acquire(self, machine_id: int):
+        """
+        Mark a machine busy.
+        """
+        if self._idle[machine_id]:
+            self._idle[machine_id] = False
+            self._count -= 1
+
+    def release(self, machine_id: int):
+        """
+        Mark a machine idle again.
+        """
+        if not self._idle[machine_id]:
+            self._idle[machine_id] = True
+            self._count += 1
+            if not self._in_heap[machine_id]:
+                self._in_heap[machine_id] = True
+                heapq.heappush(self._heap, machine_id)
+
+    def first(self):
+        """
+        Lowest-numbered idle machine id, or None if all are busy.
+        """
+        heap = self._heap
+        while heap and not self._idle[heap[0]]:
+            self._in_heap[heapq.heappop(heap)] = False
+        return heap[0] if heap else None
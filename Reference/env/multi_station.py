@@ -0,0 +1,451 @@
+"""
+Multi-station laboratory with routing between stations.
+
+Samples follow a route through several stations (e.g. chemistry,
+then immunoassay). Each station has its own pool of machines, its
+own JobQueue and one idle-machine free list per job class, built
+from an eligibility map (which machines may run STAT or routine
+work). The simulation is event-driven, so the cost of a step grows
+with the number of arrivals and completions it processes, not with
+the number of machines or stations.
+
+Actions and observations are factored by station:
+
+    action[s]       0 = start the FIFO head, 1 = start the earliest
+                    STAT job, 2 = start the earliest routine job,
+                    3 = hold
+    observation[s]  [queue_length, stat_fraction, idle_machines]
+
+The machine is always the lowest-numbered idle machine eligible for
+the chosen job, so the action space does not grow with the number
+of machines. Control returns to the policy only when some station
+has a dispatch action that can take effect. Both class heads can be
+started directly, so a machine reserved for one class is reachable
+even while a job of the other class heads the FIFO order.
+
+The config is a MultiStationConfig (see env.config); a nested dict
+is compiled on construction. Example, with ``stat_fraction``,
+deadlines, priority weights and ``episode_length`` as for
+LabSchedulingEnv::
+
+    arrival_rate: 3.0            # samples per tick (Poisson)
+    transfer_time: 2             # ticks between stations
+    stations:
+      - name: chemistry
+        num_machines: 120
+        service_time_mean: 6
+        eligible:
+          routine: [8, 9, ..., 119]   # 0-7 reserved for STAT
+      - name: immunoassay
+        num_machines: 60
+        service_time_mean: 15
+    routes:
+      - stations: [chemistry]
+        fraction: 0.7
+      - stations: [chemistry, immunoassay]
+        fraction: 0.3
+"""
+
+import bisect
+import heapq
+
+import gymnasium as gym
+from gymnasium import spaces
+import numpy as np
+
+from .config import JOB_CLASSES, StationConfig, as_multi_station_config
+from .event import Event, EventType
+from .job import Job
+from .job_queue import JobQueue
+from .machine import IdleMachineList, Machine
+from .station_actions import (
+    DISPATCH_FIFO,
+    DISPATCH_ROUTINE,
+    DISPATCH_STAT,
+    HOLD,
+    NUM_STATION_ACTIONS,
+)
+
+
+class RoutedJob(Job):
+    """
+    Job with a route: the station indices it visits, in order, and
+    the position of the current one. ``service_time`` and
+    ``remaining_time`` refer to the current stage; the deadline and
+    arrival time are end-to-end.
+    """
+
+    __slots__ = ("route", "stage")
+
+    def __init__(self, job_id, arrival_time, service_time, deadline,
+                 is_stat, priority_weight=1.0, route=(0,)):
+        super().__init__(job_id, arrival_time, service_time, deadline,
+                         is_stat, priority_weight)
+        self.route = route
+        self.stage = 0
+
+
+class Station:
+    """
+    Machines, queue and per-class idle lists of one station.
+    """
+
+    def __init__(self, index: int, cfg: StationConfig):
+        self.index = index
+        self.name = cfg.name
+        self.service_time_mean = cfg.service_time_mean
+        self.machines = [Machine(i) for i in range(cfg.num_machines)]
+        self.queue = JobQueue()
+
+        n = len(self.machines)
+        self.eligible = {
+            name: list(cfg.machines_for(name)) for name in JOB_CLASSES
+        }
+        self.idle = {
+            name: IdleMachineList(n, ids)
+            for name, ids in self.eligible.items()
+        }
+
+        # machine id -> free lists it belongs to
+        self.pools = [[] for _ in range(n)]
+        for name, ids in self.eligible.items():
+            for machine_id in ids:
+                self.pools[machine_id].append(self.idle[name])
+        self.idle_count = n
+
+    def free_machines(self, is_stat: bool):
+        return self.idle["stat" if is_stat else "routine"]
+
+    def can_start(self, job):
+        return job is not None and len(self.free_machines(job.is_stat)) > 0
+
+    def has_decision(self):
+        """
+        Whether a dispatch action can take effect, i.e. any of the
+        first three entries of ``action_mask`` holds. The FIFO head
+        is the earliest job of its class, so checking both class
+        heads covers it.
+        """
+        queue = self.queue
+        return (
+            self.can_start(queue.peek_stat())
+            or self.can_start(queue.peek_routine())
+        )
+
+    def acquire(self, machine_id: int):
+        self.idle_count -= 1
+        for pool in self.pools[machine_id]:
+            pool.acquire(machine_id)
+
+    def release(self, machine_id: int):
+        self.idle_count += 1
+        for pool in self.pools[machine_id]:
+            pool.release(machine_id)
+
+    def action_mask(self):
+        queue = self.queue
+        return (
+            self.can_start(queue.peek()),
+            self.can_start(queue.peek_stat()),
+            self.can_start(queue.peek_routine()),
+            True,
+        )
+
+    def head(self, station_action):
+        """
+        Job that ``station_action`` would start, or None.
+        """
+        if station_action == DISPATCH_FIFO:
+            return self.queue.peek()
+        if station_action == DISPATCH_STAT:
+            return self.queue.peek_stat()
+        if station_action == DISPATCH_ROUTINE:
+            return self.queue.peek_routine()
+        return None
+
+
+class MultiStationLabEnv(gym.Env):
+    """
+    Event-driven lab with several stations and routed samples.
+
+    A step applies one action per station, then advances the clock
+    to the next decision. While some station can still start a job
+    and did not hold, the clock does not move, so any number of jobs
+    can start at the same instant. Rewards are the weighted
+    tardiness penalties of samples that finish their whole route.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self, config):
+        super().__init__()
+
+        self.cfg = as_multi_station_config(config)
+        self.max_time = self.cfg.episode_length
+        self.transfer_time = self.cfg.transfer_time
+
+        self.stations = [
+            Station(i, station_cfg)
+            for i, station_cfg in enumerate(self.cfg.stations)
+        ]
+        index = {station.name: station.index for station in self.stations}
+        self.routes = [
+            tuple(index[name] for name in route.stations)
+            for route in self.cfg.routes
+        ]
+        fractions = np.array(
+            [route.fraction for route in self.cfg.routes], dtype=float
+        )
+        self._route_cdf = (np.cumsum(fractions) / fractions.sum()).tolist()
+
+        # Read once so job creation does no config lookups
+        self.arrival_rate = self.cfg.arrival_rate
+        self.stat_fraction = self.cfg.stat_fraction
+        self._class_params = {
+            True: (self.cfg.stat_deadline, self.cfg.stat_priority_weight),
+            False: (self.cfg.routine_deadline,
+                    self.cfg.routine_priority_weight),
+        }
+
+        num_stations = len(self.stations)
+        self.observation_space = spaces.Box(
+            low=0.0,
+            high=np.inf,
+            shape=(num_stations, 3),
+            dtype=np.float32
+        )
+        self.action_space = spaces.MultiDiscrete(
+            np.full(num_stations, NUM_STATION_ACTIONS)
+        )
+
+        self.completion_sinks = []
+        self.np_random = None
+        self.current_time = 0
+        self.job_counter = 0
+        self._events = []
+        self._event_seq = 0
+        self._holding = set()
+        self._next_arrival = 0.0
+
+    # --------------------------------------------------
+    # Environment core
+    # --------------------------------------------------
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+
+        self.np_random = np.random.default_rng(seed)
+        self.current_time = 0
+        self.job_counter = 0
+        self.stations = [
+            Station(i, station_cfg)
+            for i, station_cfg in enumerate(self.cfg.stations)
+        ]
+
+        self._events = []
+        self._event_seq = 0
+        self._holding = set()
+        self._next_arrival = 0.0
+        self._schedule_next_arrival()
+        self._run_until_decision(self.current_time)
+
+        return self._get_obs(), {"action_mask": self.action_mask()}
+
+    def step(self, action):
+        start_time = self.current_time
+
+        for station, station_action in zip(self.stations, action):
+            if station_action == HOLD:
+                self._holding.add(station.index)
+            else:
+                self._dispatch(station, station_action)
+
+        # Stay at the current instant while any station that did not
+        # hold can still start a job
+        reward = 0.0
+        if not self._pending_decision():
+            reward = self._run_until_decision(self.current_time + 1)
+
+        terminated = self.current_time >= self.max_time
+        truncated = False
+
+        info = {
+            "action_mask": self.action_mask(),
+            "elapsed": self.current_time - start_time,
+        }
+        return self._get_obs(), reward, terminated, truncated, info
+
+    def add_completion_sink(self, sink):
+        """
+        Stream every sample that completes its route to
+        ``sink.add(job)``.
+        """
+        self.completion_sinks.append(sink)
+
+    # --------------------------------------------------
+    # Observation and action mask
+    # --------------------------------------------------
+
+    def _get_obs(self):
+        obs = np.zeros((len(self.stations), 3), dtype=np.float32)
+        for i, station in enumerate(self.stations):
+            queue_length = len(station.queue)
+            obs[i, 0] = queue_length
+            if queue_length:
+                obs[i, 1] = station.queue.stat_count / queue_length
+            obs[i, 2] = station.idle_count
+        return obs
+
+    def action_mask(self):
+        """
+        Boolean mask of shape (num_stations, 4).
+        """
+        return np.array(
+            [station.action_mask() for station in self.stations], dtype=bool
+        )
+
+    # --------------------------------------------------
+    # Dispatch and routing
+    # --------------------------------------------------
+
+    def _dispatch(self, station, station_action):
+        job = station.head(station_action)
+        if not station.can_start(job):
+            return None
+
+        machine_id = station.free_machines(job.is_stat).first()
+        station.queue.remove(job)
+        station.acquire(machine_id)
+
+        machine = station.machines[machine_id]
+        machine.assign(job, self.current_time)
+        self._push_event(
+            self.current_time + job.remaining_time,
+            EventType.COMPLETION,
+            (station, machine),
+        )
+        return job
+
+    def _enter_stage(self, job):
+        """
+        Queue ``job`` at the station of its current route stage.
+        """
+        station = self.stations[job.route[job.stage]]
+        job.service_time = self._sample_service_time(station)
+        job.remaining_time = job.service_time
+        station.queue.append(job)
+
+    def _on_completion(self, station, machine):
+        job = machine.complete(self.current_time)
+        station.release(machine.machine_id)
+
+        job.stage += 1
+        if job.stage < len(job.route):
+            if self.transfer_time > 0:
+                self._push_event(
+                    self.current_time + self.transfer_time,
+                    EventType.ARRIVAL,
+                    job,
+                )
+            else:
+                self._enter_stage(job)
+            return 0.0
+
+        for sink in self.completion_sinks:
+            sink.add(job)
+        return job.tardiness * job.priority_weight
+
+    # --------------------------------------------------
+    # Arrival process
+    # --------------------------------------------------
+
+    def _sample_service_time(self, station):
+        return max(
+            1, int(self.np_random.exponential(station.service_time_mean))
+        )
+
+    def _create_job(self):
+        is_stat = self.np_random.random() < self.stat_fraction
+        deadline_offset, priority_weight = self._class_params[is_stat]
+
+        route_index = bisect.bisect_right(
+            self._route_cdf, self.np_random.random()
+        )
+        route = self.routes[min(route_index, len(self.routes) - 1)]
+        job = RoutedJob(
+            job_id=self.job_counter,
+            arrival_time=self.current_time,
+            service_time=0,
+            deadline=self.current_time + deadline_offset,
+            is_stat=is_stat,
+            priority_weight=priority_weight,
+            route=route,
+        )
+        self.job_counter += 1
+        return job
+
+    def _schedule_next_arrival(self):
+        """
+        Poisson arrivals at ``arrival_rate`` samples per tick; several
+        samples may arrive at the same tick.
+        """
+        rate = self.arrival_rate
+        if rate <= 0.0:
+            return
+        self._next_arrival += self.np_random.exponential(1.0 / rate)
+        time = max(int(np.ceil(self._next_arrival)), self.current_time)
+        if time <= self.max_time:
+            self._push_event(time, EventType.ARRIVAL)
+
+    # --------------------------------------------------
+    # Discrete-event engine
+    # --------------------------------------------------
+
+    def _push_event(self, time, event_type, payload=None):
+        heapq.heappush(
+            self._events,
+            (time, self._event_seq, Event(time, event_type, payload))
+        )
+        self._event_seq += 1
+
+    def _pending_decision(self):
+        return any(
+            station.has_decision()
+            for station in self.stations
+            if station.index not in self._holding
+        )
+
+    def _run_until_decision(self, target):
+        # Holds only last for the instant they were made
+        self._holding.clear()
+        reward = 0.0
+        while True:
+            reward += self._advance_events(target)
+            if self.current_time >= self.max_time or any(
+                station.has_decision() for station in self.stations
+            ):
+                return reward
+            if self._events:
+                target = min(self._events[0][0], self.max_time)
+            else:
+                target = self.max_time
+
+    def _advance_events(self, until):
+        reward = 0.0
+        events = self._events
+        while events and events[0][0] <= until:
+            time, _, event = heapq.heappop(events)
+            self.current_time = time
+
+            if event.type is EventType.ARRIVAL:
+                if event.payload is None:
+                    self._enter_stage(self._create_job())
+                    self._schedule_next_arrival()
+                else:
+                    self._enter_stage(event.payload)
+            else:
+                station, machine = event.payload
+                reward -= self._on_completion(station, machine)
+
+        self.current_time = until
+        return reward
@@ -0,0 +1,13 @@
+"""
+Per-station actions of MultiStationLabEnv.
+
+Kept apart from the environment so policies can name the actions
+without importing the simulation.
+"""
+
+DISPATCH_FIFO = 0      # start the FIFO head
+DISPATCH_STAT = 1      # start the earliest STAT job
+DISPATCH_ROUTINE = 2   # start the earliest routine job
+HOLD = 3               # leave the station as it is
+
+NUM_STATION_ACTIONS = 4
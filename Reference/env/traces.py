@@ -0,0 +1,212 @@
+"""
+Pre-generated arrival traces.
+
+A trace is the complete arrival sequence of an episode: one record
+per job with its arrival time, class, service time, deadline and
+priority weight. Generating whole episodes up front takes the RNG
+out of the simulation loop, and replaying the same file for every
+policy gives common random numbers across a comparison.
+
+On-disk layout (a directory):
+
+    arrivals.bin   raw TRACE_DTYPE records, episode-major, time-sorted
+    offsets.npy    int64[num_episodes + 1] record offsets per episode
+    meta.json      generator config, seed and record dtype
+
+``arrivals.bin`` is opened as a read-only memory map, so a trace set
+larger than RAM can be replayed by many worker processes at once.
+"""
+
+import json
+import os
+
+import numpy as np
+
+from .config import as_env_config
+
+TRACE_DTYPE = np.dtype([
+    ("time", np.int64),
+    ("is_stat", np.bool_),
+    ("service_time", np.int64),
+    ("deadline", np.int64),
+    ("priority_weight", np.float64),
+])
+
+
+# --------------------------------------------------
+# Generation
+# --------------------------------------------------
+
+def generate_episode(cfg, rng, horizon=None, start=0):
+    """
+    Sample all arrivals of one episode in a single vectorized pass.
+
+    Without a ``demand`` profile in ``cfg`` this uses the same
+    per-tick Bernoulli arrival model as LabSchedulingEnv: at most one
+    arrival at each tick 1..horizon. With one, arrival times come from
+    the profile (see env.demand) and several may share a tick.
+    ``start`` restricts the draw to ticks start+1..horizon.
+    """
+    cfg = as_env_config(cfg)
+    if horizon is None:
+        horizon = cfg.episode_length
+
+    if cfg.demand is not None:
+        times = cfg.demand.sample_times(rng, horizon, start)
+    else:
+        times = start + 1 + np.flatnonzero(
+            rng.random(max(horizon - start, 0)) < cfg.arrival_rate
+        )
+    n = times.size
+
+    is_stat = rng.random(n) < cfg.stat_fraction
+    service_time = np.maximum(
+        1, rng.exponential(cfg.service_time_mean, n).astype(np.int64)
+    )
+
+    records = np.empty(n, dtype=TRACE_DTYPE)
+    records["time"] = times
+    records["is_stat"] = is_stat
+    records["service_time"] = service_time
+    records["deadline"] = times + np.where(
+        is_stat, cfg.stat_deadline, cfg.routine_deadline
+    )
+    records["priority_weight"] = np.where(
+        is_stat, cfg.stat_priority_weight, cfg.routine_priority_weight
+    )
+    return records
+
+
+def write_traces(path: str, cfg, num_episodes: int, seed: int = 0):
+    """
+    Generate ``num_episodes`` episodes and write them to ``path``.
+
+    Episode ``i`` is drawn from the i-th child of
+    ``SeedSequence(seed)``, so it does not depend on how many
+    episodes are generated alongside it.
+    """
+    cfg = as_env_config(cfg)
+    os.makedirs(path, exist_ok=True)
+    offsets = np.zeros(num_episodes + 1, dtype=np.int64)
+
+    children = np.random.SeedSequence(seed).spawn(num_episodes)
+    with open(os.path.join(path, "arrivals.bin"), "wb") as f:
+        for i, child in enumerate(children):
+            records = generate_episode(cfg, np.random.default_rng(child))
+            records.tofile(f)
+            offsets[i + 1] = offsets[i] + records.size
+
+    np.save(os.path.join(path, "offsets.npy"), offsets)
+    with open(os.path.join(path, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "num_episodes": num_episodes,
+                "seed": seed,
+                "config": cfg.to_dict(),
+                "dtype": TRACE_DTYPE.descr,
+            },
+            f,
+            indent=2,
+        )
+    return TraceSet(path)
+
+
+# --------------------------------------------------
+# Replay
+# --------------------------------------------------
+
+class TraceSet:
+    """
+    Read-only, memory-mapped view of a trace directory.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(path, "offsets.npy"))
+
+        if self.offsets[-1] > 0:
+            self.records = np.memmap(
+                os.path.join(path, "arrivals.bin"),
+                dtype=TRACE_DTYPE,
+                mode="r",
+            )
+        else:
+            self.records = np.empty(0, dtype=TRACE_DTYPE)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def episode(self, index: int):
+        """
+        Records of one episode (a view into the memory map).
+        """
+        return self.records[self.offsets[index]:self.offsets[index + 1]]
+
+
+class ArrivalReplay:
+    """
+    Cursor over time-sorted arrival records delivered in chunks.
+
+    Each chunk (a TRACE_DTYPE array) is converted to plain tuples
+    once, so popping a record in the simulation loop is a list
+    access rather than a NumPy scalar lookup. Only one chunk is
+    held at a time.
+
+    ``snapshot``/``restore`` rewind the cursor. When the chunks are
+    given as a list they can be revisited, so any snapshot can be
+    restored; a streaming iterator can only be rewound within the
+    chunk that was current at snapshot time.
+    """
+
+    def __init__(self, chunks):
+        self._sequence = chunks if isinstance(chunks, (list, tuple)) else None
+        self._chunks = iter(chunks)
+        self._chunk_no = -1
+        self._records = []
+        self._pos = 0
+        self._fill()
+
+    def _fill(self):
+        while self._pos >= len(self._records):
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                self._records, self._pos = [], 0
+                return
+            self._records = chunk.tolist()
+            self._pos = 0
+            self._chunk_no += 1
+
+    def snapshot(self):
+        return (self._chunk_no, self._records, self._pos)
+
+    def restore(self, state):
+        chunk_no, records, pos = state
+        if chunk_no != self._chunk_no:
+            if self._sequence is None:
+                raise RuntimeError(
+                    "cannot rewind a streaming replay past a chunk boundary"
+                )
+            self._chunks = iter(self._sequence[chunk_no + 1:])
+            self._chunk_no = chunk_no
+        self._records, self._pos = records, pos
+
+    def peek_time(self):
+        """
+        Arrival time of the next record, or None when exhausted.
+        """
+        if self._pos < len(self._records):
+            return self._records[self._pos][0]
+        return None
+
+    def pop(self):
+        """
+        Next record as (time, is_stat, service_time, deadline,
+        priority_weight).
+        """
+        record = self._records[self._pos]
+        self._pos += 1
+        if self._pos >= len(self._records):
+            self._fill()
+        return record
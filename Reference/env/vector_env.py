@@ -0,0 +1,372 @@
+import numpy as np
+from gymnasium import spaces
+
+from .config import as_env_config
+from .traces import generate_episode
+
+
+class VectorLabSchedulingEnv:
+    """
+    Batch of independent lab simulations stepped as NumPy arrays.
+
+    Mirrors the tick-based dynamics of LabSchedulingEnv, but keeps
+    the state of all ``num_envs`` labs in struct-of-arrays form:
+
+    - remaining service time, deadline and class per machine
+    - one ring buffer per lab holding the FIFO job queue
+    - per-class queue counters for the observation
+
+    ``step`` takes one action per lab and returns batched
+    observations, rewards and termination flags. All labs share
+    the same episode clock, so they terminate together; call
+    ``reset`` to start the next batch of episodes.
+
+    Arrivals follow the same models as LabSchedulingEnv: per-tick
+    Bernoulli draws at ``arrival_rate``, or, with a ``demand``
+    profile, a whole episode per lab drawn at reset with
+    traces.generate_episode and released tick by tick (several
+    samples may then arrive in one tick). Every tick is exposed;
+    ``event_driven`` and ``auto_advance`` only choose how
+    LabSchedulingEnv skips ticks without a decision, and the
+    trainer skips those rows itself (see rl.trainer).
+    """
+
+    def __init__(self, config, num_envs: int, queue_capacity: int = 256):
+        self.cfg = as_env_config(config)
+        self.num_envs = num_envs
+        self.num_machines = self.cfg.num_machines
+        self.max_time = self.cfg.episode_length
+
+        self.single_observation_space = spaces.Box(
+            low=0.0,
+            high=np.inf,
+            shape=(3,),
+            dtype=np.float32
+        )
+        self.single_action_space = spaces.Discrete(self.num_machines + 1)
+        self.observation_space = spaces.Box(
+            low=0.0,
+            high=np.inf,
+            shape=(num_envs, 3),
+            dtype=np.float32
+        )
+        self.action_space = spaces.MultiDiscrete(
+            np.full(num_envs, self.num_machines + 1)
+        )
+        self.noop_action = self.num_machines
+
+        self._rows = np.arange(num_envs)
+        self._capacity = queue_capacity
+        self.np_random = None
+        self._allocate()
+
+    def _allocate(self):
+        n, m, c = self.num_envs, self.num_machines, self._capacity
+
+        self.current_time = 0
+
+        # Machines
+        self.remaining = np.zeros((n, m), dtype=np.int64)
+        self.machine_deadline = np.zeros((n, m), dtype=np.int64)
+        self.machine_stat = np.zeros((n, m), dtype=bool)
+
+        # Queue ring buffers
+        self.queue_service = np.zeros((n, c), dtype=np.int64)
+        self.queue_deadline = np.zeros((n, c), dtype=np.int64)
+        self.queue_stat = np.zeros((n, c), dtype=bool)
+        self.queue_head = np.zeros(n, dtype=np.int64)
+        self.queue_size = np.zeros(n, dtype=np.int64)
+        self.queue_stat_count = np.zeros(n, dtype=np.int64)
+
+        # Pre-drawn demand arrivals of all labs, sorted by time
+        self.arrival_time = np.zeros(0, dtype=np.int64)
+        self.arrival_row = np.zeros(0, dtype=np.int64)
+        self.arrival_service = np.zeros(0, dtype=np.int64)
+        self.arrival_deadline = np.zeros(0, dtype=np.int64)
+        self.arrival_stat = np.zeros(0, dtype=bool)
+        self.arrival_cursor = 0
+
+    # --------------------------------------------------
+    # Environment core
+    # --------------------------------------------------
+
+    def reset(self, seed=None, options=None):
+        """
+        Start a new batch of episodes. The RNG is reseeded only when
+        a seed is given, so consecutive resets continue one stream.
+        """
+        self._allocate()
+        if seed is not None or self.np_random is None:
+            self.np_random = np.random.default_rng(seed)
+        if self.cfg.demand is not None:
+            self._draw_demand()
+        return self._get_obs(), {"action_mask": self.action_mask()}
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64)
+
+        # 1. Agent assignment decisions
+        self._dispatch(actions)
+
+        # 2. Advance time
+        self.current_time += 1
+
+        # 3. New arrivals
+        self._generate_arrivals()
+
+        # 4. Machine processing
+        rewards = self._process_machines()
+
+        # 5. Termination
+        done = self.current_time >= self.max_time
+        terminated = np.full(self.num_envs, done)
+        truncated = np.zeros(self.num_envs, dtype=bool)
+
+        return self._get_obs(), rewards, terminated, truncated, \
+            {"action_mask": self.action_mask()}
+
+    # --------------------------------------------------
+    # Batched phases
+    # --------------------------------------------------
+
+    def _dispatch(self, actions):
+        """
+        Pop the queue head of every lab whose action targets an
+        idle machine.
+        """
+        machine = np.minimum(actions, self.num_machines - 1)
+        valid = (
+            (actions < self.num_machines)
+            & (self.queue_size > 0)
+            & (self.remaining[self._rows, machine] == 0)
+        )
+        rows = self._rows[valid]
+        if rows.size == 0:
+            return
+
+        machine = machine[valid]
+        slot = self.queue_head[rows]
+
+        self.remaining[rows, machine] = self.queue_service[rows, slot]
+        self.machine_deadline[rows, machine] = self.queue_deadline[rows, slot]
+        self.machine_stat[rows, machine] = self.queue_stat[rows, slot]
+
+        self.queue_stat_count[rows] -= self.queue_stat[rows, slot]
+        self.queue_head[rows] = (slot + 1) % self._capacity
+        self.queue_size[rows] -= 1
+
+    def _draw_demand(self):
+        """
+        One episode of demand arrivals per lab, drawn in lab order
+        from the batch RNG and merged into a single time-sorted
+        stream.
+        """
+        episodes = [
+            generate_episode(self.cfg, self.np_random, self.max_time)
+            for _ in range(self.num_envs)
+        ]
+        records = np.concatenate(episodes)
+        rows = np.repeat(self._rows, [len(ep) for ep in episodes])
+        # Stable on time, so each lab keeps its own arrival order
+        order = np.argsort(records["time"], kind="stable")
+        records, rows = records[order], rows[order]
+
+        self.arrival_time = records["time"].astype(np.int64)
+        self.arrival_row = rows
+        self.arrival_service = records["service_time"].astype(np.int64)
+        self.arrival_deadline = records["deadline"].astype(np.int64)
+        self.arrival_stat = records["is_stat"].astype(bool)
+        self.arrival_cursor = 0
+
+    def _generate_arrivals(self):
+        """
+        Bernoulli arrivals for every lab, drawn in one call per field,
+        or the demand arrivals due at the current tick.
+        """
+        if self.cfg.demand is not None:
+            self._release_demand()
+            return
+
+        rng = self.np_random
+        arrive = rng.random(self.num_envs) < self.cfg.arrival_rate
+        is_stat = rng.random(self.num_envs) < self.cfg.stat_fraction
+        service = np.maximum(
+            1,
+            rng.exponential(
+                self.cfg.service_time_mean, self.num_envs
+            ).astype(np.int64)
+        )
+
+        rows = self._rows[arrive]
+        if rows.size == 0:
+            return
+        if self.queue_size.max() == self._capacity:
+            self._grow_queues()
+
+        is_stat = is_stat[arrive]
+        deadline = self.current_time + np.where(
+            is_stat, self.cfg.stat_deadline, self.cfg.routine_deadline
+        )
+        slot = (self.queue_head[rows] + self.queue_size[rows]) % self._capacity
+
+        self.queue_service[rows, slot] = service[arrive]
+        self.queue_deadline[rows, slot] = deadline
+        self.queue_stat[rows, slot] = is_stat
+        self.queue_size[rows] += 1
+        self.queue_stat_count[rows] += is_stat
+
+    def _release_demand(self):
+        """
+        Enqueue the pre-drawn arrivals due by the current tick. A lab
+        may receive several; they take consecutive ring slots in
+        arrival order.
+        """
+        start = self.arrival_cursor
+        end = int(np.searchsorted(
+            self.arrival_time, self.current_time, side="right"
+        ))
+        if end == start:
+            return
+        self.arrival_cursor = end
+
+        due = slice(start, end)
+        rows = self.arrival_row[due]
+        # Rank of each arrival among those of its lab in this tick
+        order = np.argsort(rows, kind="stable")
+        sorted_rows = rows[order]
+        first = np.flatnonzero(
+            np.r_[True, sorted_rows[1:] != sorted_rows[:-1]]
+        )
+        counts = np.diff(np.r_[first, sorted_rows.size])
+        rank = np.empty_like(order)
+        rank[order] = np.arange(order.size) - np.repeat(first, counts)
+
+        arrivals = np.bincount(rows, minlength=self.num_envs)
+        while (self.queue_size + arrivals).max() > self._capacity:
+            self._grow_queues()
+
+        is_stat = self.arrival_stat[due]
+        slot = (
+            self.queue_head[rows] + self.queue_size[rows] + rank
+        ) % self._capacity
+        self.queue_service[rows, slot] = self.arrival_service[due]
+        self.queue_deadline[rows, slot] = self.arrival_deadline[due]
+        self.queue_stat[rows, slot] = is_stat
+        self.queue_size += arrivals
+        self.queue_stat_count += np.bincount(
+            rows, weights=is_stat, minlength=self.num_envs
+        ).astype(np.int64)
+
+    def _grow_queues(self):
+        """
+        Double the ring-buffer capacity, unrolling each ring so that
+        its head moves to slot 0.
+        """
+        old = self._capacity
+        order = (self.queue_head[:, None] + np.arange(old)) % old
+        for name in ("queue_service", "queue_deadline", "queue_stat"):
+            ring = getattr(self, name)
+            grown = np.zeros((self.num_envs, 2 * old), dtype=ring.dtype)
+            grown[:, :old] = np.take_along_axis(ring, order, axis=1)
+            setattr(self, name, grown)
+        self.queue_head[:] = 0
+        self._capacity = 2 * old
+
+    def _process_machines(self):
+        """
+        Advance every busy machine by one tick and collect penalties.
+        """
+        busy = self.remaining > 0
+        self.remaining -= busy
+        finished = busy & (self.remaining == 0)
+
+        tardiness = np.maximum(0, self.current_time - self.machine_deadline)
+        weight = np.where(
+            self.machine_stat,
+            self.cfg.stat_priority_weight,
+            self.cfg.routine_priority_weight
+        )
+        return -(tardiness * weight * finished).sum(axis=1)
+
+    # --------------------------------------------------
+    # Checkpointing
+    # --------------------------------------------------
+
+    _STATE_ARRAYS = (
+        "remaining",
+        "machine_deadline",
+        "machine_stat",
+        "queue_service",
+        "queue_deadline",
+        "queue_stat",
+        "queue_head",
+        "queue_size",
+        "queue_stat_count",
+        "arrival_time",
+        "arrival_row",
+        "arrival_service",
+        "arrival_deadline",
+        "arrival_stat",
+    )
+
+    def state_dict(self):
+        """
+        Copy of the full simulation state, including the RNG stream,
+        so a restored batch continues exactly where this one was.
+        """
+        state = {name: getattr(self, name).copy()
+                 for name in self._STATE_ARRAYS}
+        state["current_time"] = self.current_time
+        state["arrival_cursor"] = self.arrival_cursor
+        state["rng"] = (
+            self.np_random.bit_generator.state
+            if self.np_random is not None else None
+        )
+        return state
+
+    def load_state_dict(self, state):
+        for name in self._STATE_ARRAYS:
+            setattr(
+                self, name,
+                np.array(state[name], dtype=getattr(self, name).dtype),
+            )
+        self._capacity = self.queue_service.shape[1]
+        self.current_time = int(state["current_time"])
+        self.arrival_cursor = int(state["arrival_cursor"])
+        self.np_random = None
+        if state["rng"] is not None:
+            self.np_random = np.random.default_rng()
+            self.np_random.bit_generator.state = state["rng"]
+
+    # --------------------------------------------------
+    # Observation
+    # --------------------------------------------------
+
+    @property
+    def idle_machines(self):
+        """
+        Boolean (num_envs, num_machines) mask of idle machines.
+        """
+        return self.remaining == 0
+
+    def action_mask(self):
+        """
+        Boolean (num_envs, num_machines + 1) mask of actions that can
+        take effect; the no-op column is always valid.
+        """
+        mask = np.ones((self.num_envs, self.num_machines + 1), dtype=bool)
+        mask[:, :-1] = self.idle_machines & (self.queue_size > 0)[:, None]
+        return mask
+
+    def _get_obs(self):
+        obs = np.empty((self.num_envs, 3), dtype=np.float32)
+        obs[:, 0] = self.queue_size
+        np.divide(
+            self.queue_stat_count,
+            self.queue_size,
+            out=obs[:, 1],
+            where=self.queue_size > 0
+        )
+        obs[self.queue_size == 0, 1] = 0.0
+        obs[:, 2] = self.idle_machines.sum(axis=1)
+        return obs
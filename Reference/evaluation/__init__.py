@@ -0,0 +1,8 @@
+"""
+Evaluation tooling for the reference experiment.
+
+These modules run policies against the environment under
+controlled, reproducible conditions: every episode is tied to
+an explicit seed so that comparisons between heuristics and
+learned policies are paired and repeatable.
+"""
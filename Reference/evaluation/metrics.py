@@ -0,0 +1,178 @@
+"""
+Streaming SLA and tardiness metrics.
+
+Metrics are fed one completed job at a time (they implement the
+``add(job)`` completion-sink interface of LabSchedulingEnv) and keep
+fixed-size state: counters plus quantile sketches for turnaround and
+tardiness, per priority class. Sketches from different episodes or
+worker processes merge exactly, so tail percentiles over millions of
+jobs never require storing the jobs themselves.
+"""
+
+import math
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantees
+    (DDSketch-style logarithmic buckets).
+
+    A non-negative value v > 0 falls into bucket ceil(log_gamma(v)),
+    with gamma = (1 + a) / (1 - a); every quantile estimate is then
+    within relative error ``a`` of an exact sample quantile. Zeros
+    (e.g. on-time jobs' tardiness) are counted separately. Memory is
+    one counter per occupied bucket, i.e. logarithmic in the value
+    range rather than linear in the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+
+        self.bins = {}
+        self.zero_count = 0
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.bins[key] = self.bins.get(key, 0) + 1
+        else:
+            self.zero_count += 1
+
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracy")
+        for key, count in other.bins.items():
+            self.bins[key] = self.bins.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def mean(self):
+        return self.sum / self.count if self.count else math.nan
+
+    def quantile(self, q: float):
+        """
+        Estimate the q-quantile (0 <= q <= 1).
+        """
+        if self.count == 0:
+            return math.nan
+
+        rank = q * (self.count - 1)
+        if rank < self.zero_count:
+            return 0.0
+
+        cumulative = self.zero_count
+        for key in sorted(self.bins):
+            cumulative += self.bins[key]
+            if cumulative > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+
+class ClassMetrics:
+    """
+    Counters and distributions for one priority class.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.completed = 0
+        self.on_time = 0
+        self.weighted_tardiness = 0.0
+        self.turnaround = QuantileSketch(relative_accuracy)
+        self.tardiness = QuantileSketch(relative_accuracy)
+
+    def add(self, job):
+        tardiness = job.tardiness
+        self.completed += 1
+        self.on_time += tardiness == 0
+        self.weighted_tardiness += tardiness * job.priority_weight
+        self.turnaround.add(job.completion_time - job.arrival_time)
+        self.tardiness.add(tardiness)
+
+    def merge(self, other: "ClassMetrics"):
+        self.completed += other.completed
+        self.on_time += other.on_time
+        self.weighted_tardiness += other.weighted_tardiness
+        self.turnaround.merge(other.turnaround)
+        self.tardiness.merge(other.tardiness)
+        return self
+
+    @property
+    def sla_compliance(self):
+        return self.on_time / self.completed if self.completed else math.nan
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99)):
+        out = {
+            "completed": self.completed,
+            "sla_compliance": self.sla_compliance,
+            "weighted_tardiness": self.weighted_tardiness,
+            "turnaround_mean": self.turnaround.mean,
+            "tardiness_mean": self.tardiness.mean,
+        }
+        for q in quantiles:
+            pct = f"p{round(q * 100):d}"
+            out[f"turnaround_{pct}"] = self.turnaround.quantile(q)
+            out[f"tardiness_{pct}"] = self.tardiness.quantile(q)
+        return out
+
+
+class SLAMetrics:
+    """
+    Per-class SLA metrics fed by completion events.
+
+    Attach to an environment with
+    ``env.add_completion_sink(SLAMetrics())``.
+    """
+
+    CLASSES = ("stat", "routine")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.classes = {
+            name: ClassMetrics(relative_accuracy) for name in self.CLASSES
+        }
+
+    def add(self, job):
+        self.classes["stat" if job.is_stat else "routine"].add(job)
+
+    def merge(self, other: "SLAMetrics"):
+        for name, metrics in other.classes.items():
+            self.classes[name].merge(metrics)
+        return self
+
+    def summary(self, quantiles=(0.5, 0.95, 0.99)):
+        return {
+            name: metrics.summary(quantiles)
+            for name, metrics in self.classes.items()
+        }
+
+
+def merge_metrics(metrics):
+    """
+    Merge an iterable of SLAMetrics into a new one.
+    """
+    merged = None
+    for m in metrics:
+        if merged is None:
+            merged = SLAMetrics(
+                m.classes["stat"].turnaround.relative_accuracy
+            )
+        merged.merge(m)
+    return merged
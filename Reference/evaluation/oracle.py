@@ -0,0 +1,483 @@
+"""
+Hindsight oracle: bounds on the best possible schedule of an episode.
+
+Given the full arrival trace of an episode, the oracle bounds the
+minimum weighted tardiness any dispatcher could have reached on the
+environment's machines. Both environment engines share the same
+scheduling model:
+
+- a job arriving at tick r can start at any decision time s >= r
+- at most one job starts per decision time, on an idle machine
+- a job started at s occupies its machine until s + p, when it
+  completes and the machine can take the next job
+- the episode ends at T = episode_length; decision times are 0..T-1
+
+Rewards only count jobs that complete by T, so an oracle for the raw
+reward could score zero by never dispatching. The oracle therefore
+scores the weighted tardiness accrued by T,
+
+    sum_j w_j * max(0, min(C_j, T) - d_j)
+
+counting unfinished jobs up to the horizon. A policy's cost on this
+objective is its negated episode reward plus
+LabSchedulingEnv.accrued_tardiness() at the end of the episode (see
+EpisodeResult.accrued).
+
+Lower bound: Lagrangian relaxation of a time-indexed formulation.
+Both the machine capacity (at most m jobs running at each time) and
+the single-start-per-tick constraint are relaxed. Each job then
+independently picks its cheapest start, or stays unstarted, under
+time prices. Subgradient steps raise those prices. Every iterate is
+a valid lower bound, and the best one is kept.
+
+Upper bound: priority schedules. Each priority order is scheduled
+both non-delay (whenever a machine is idle the best pending job
+starts, as a dispatcher would) and serially (jobs in priority order
+take their earliest feasible start, which may hold a machine idle for
+an urgent arrival). The orders tried are EDD, weighted slack, WSPT,
+STAT-first, FIFO and the start times of the Lagrangian solutions. The
+best schedule is then improved by moving tardy jobs earlier in its
+serial order, within the time budget.
+
+A 500-tick episode with a few hundred jobs takes around a second.
+Memory is O(jobs x ticks).
+"""
+
+import heapq
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from env.config import as_env_config
+from env.lab_env import LabSchedulingEnv
+from env.traces import TRACE_DTYPE, TraceSet
+
+
+OracleResult = namedtuple(
+    "OracleResult",
+    ["lower_bound", "upper_bound", "start_times", "optimal",
+     "iterations", "elapsed"],
+)
+
+
+# --------------------------------------------------
+# Arrivals
+# --------------------------------------------------
+
+def episode_arrivals(env_config, seed=None, traces=None, episode=0):
+    """
+    Arrival records (TRACE_DTYPE) of one seeded episode.
+
+    Arrivals never depend on the actions, so an episode of no-ops
+    sees exactly the jobs any policy would see with the same seed;
+    they are read from the queue once it ends.
+    """
+    env = LabSchedulingEnv(env_config, traces=traces)
+    env.reset(seed=seed, options={"episode": episode})
+    noop = env.action_space.n - 1
+    done = False
+    while not done:
+        _, _, done, _, _ = env.step(noop)
+
+    return np.array(
+        [
+            (job.arrival_time, job.is_stat, job.service_time,
+             job.deadline, job.priority_weight)
+            for job in env.queue
+        ],
+        dtype=TRACE_DTYPE,
+    )
+
+
+def schedule_cost(arrivals, start_times, horizon):
+    """
+    Weighted tardiness accrued by ``horizon`` for the given start
+    times (``horizon`` or later = never started).
+    """
+    completion = np.minimum(
+        start_times + arrivals["service_time"], horizon
+    )
+    completion = np.where(start_times >= horizon, horizon, completion)
+    tardiness = np.maximum(completion - arrivals["deadline"], 0)
+    return float(np.sum(tardiness * arrivals["priority_weight"]))
+
+
+# --------------------------------------------------
+# Upper bound: priority schedules
+# --------------------------------------------------
+
+def list_schedule(arrivals, keys, num_machines, horizon):
+    """
+    Start times of the non-delay schedule that, at each decision
+    time, starts the pending job with the smallest key (ties by
+    arrival order) if a machine is idle.
+    """
+    release = arrivals["time"].tolist()
+    service = arrivals["service_time"].tolist()
+    keys = keys.tolist()
+    n = len(release)
+    order = sorted(range(n), key=release.__getitem__)
+
+    starts = [horizon] * n
+    free = [0] * num_machines
+    ready = []
+    i, t = 0, 0
+    while t < horizon:
+        while i < n and release[order[i]] <= t:
+            j = order[i]
+            heapq.heappush(ready, (keys[j], j))
+            i += 1
+        if not ready:
+            if i == n:
+                break
+            t = release[order[i]]
+            continue
+        if free[0] > t:
+            t = free[0]
+            continue
+        _, j = heapq.heappop(ready)
+        starts[j] = t
+        heapq.heapreplace(free, t + service[j])
+        t += 1
+    return np.array(starts, dtype=np.int64)
+
+
+def serial_schedule(arrivals, keys, num_machines, horizon):
+    """
+    Start times of the serial schedule: jobs in order of ``keys``
+    (ties by arrival order) each take the earliest decision time at
+    which they are released, no other job starts, and a machine is
+    free for their whole service. Unlike list scheduling this can
+    leave a machine idle for a more urgent later arrival; every
+    active schedule, hence an optimal one, is generated by some
+    order.
+    """
+    release = arrivals["time"].tolist()
+    service = arrivals["service_time"].tolist()
+    keys = keys.tolist()
+    n = len(release)
+    order = sorted(range(n), key=lambda j: (keys[j], j))
+
+    usage = [0] * horizon
+    taken = [False] * horizon
+    # skip[t] chains full ticks to the next one with a free machine
+    skip = list(range(horizon + 1))
+
+    def next_free(t):
+        while skip[t] != t:
+            skip[t] = skip[skip[t]]
+            t = skip[t]
+        return t
+
+    starts = [horizon] * n
+    for j in order:
+        t, p = release[j], service[j]
+        while True:
+            t = next_free(t)
+            if t >= horizon:
+                break
+            if taken[t]:
+                t += 1
+                continue
+            for tick in range(t, min(t + p, horizon)):
+                if usage[tick] >= num_machines:
+                    t = tick + 1
+                    break
+            else:
+                break
+        if t >= horizon:
+            continue
+
+        starts[j] = t
+        taken[t] = True
+        for tick in range(t, min(t + p, horizon)):
+            usage[tick] += 1
+            if usage[tick] == num_machines:
+                skip[tick] = tick + 1
+    return np.array(starts, dtype=np.int64)
+
+
+def _rule_keys(arrivals):
+    """
+    Static priorities of the baseline dispatch rules.
+    """
+    release = arrivals["time"].astype(np.float64)
+    service = arrivals["service_time"].astype(np.float64)
+    deadline = arrivals["deadline"].astype(np.float64)
+    weight = arrivals["priority_weight"]
+    index = np.arange(len(arrivals), dtype=np.float64)
+    return {
+        "fifo": index,
+        "edd": deadline,
+        "slack": (deadline - service) / weight,
+        "wspt": service / weight,
+        "stat_first": np.where(arrivals["is_stat"], 0.0, 1e9) + release,
+    }
+
+
+def _best_schedule(arrivals, keys, num_machines, horizon):
+    best_starts, best_cost = None, np.inf
+    for build in (list_schedule, serial_schedule):
+        starts = build(arrivals, keys, num_machines, horizon)
+        cost = schedule_cost(arrivals, starts, horizon)
+        if cost < best_cost:
+            best_starts, best_cost = starts, cost
+    return best_starts, best_cost
+
+
+def _improve(arrivals, starts, cost, num_machines, horizon, deadline):
+    """
+    Local search over serial-schedule orders, starting from the
+    start order of ``starts``: move each tardy job up to eight
+    places earlier and keep the first improvement.
+    """
+    order = list(np.lexsort((np.arange(len(starts)), starts)))
+    keys = np.empty(len(order))
+    due = arrivals["deadline"]
+    service = arrivals["service_time"]
+
+    position = 1
+    while position < len(order) and time.perf_counter() < deadline:
+        job = order[position]
+        if min(starts[job] + service[job], horizon) <= due[job]:
+            position += 1
+            continue
+
+        moved = False
+        for jump in (1, 2, 3, 5, 8):
+            target = position - jump
+            if target < 0:
+                break
+            candidate_order = order[:target] + [job] + \
+                order[target:position] + order[position + 1:]
+            keys[candidate_order] = np.arange(len(order))
+            candidate = serial_schedule(
+                arrivals, keys, num_machines, horizon
+            )
+            candidate_cost = schedule_cost(arrivals, candidate, horizon)
+            if candidate_cost < cost - 1e-9:
+                order, starts, cost = candidate_order, candidate, \
+                    candidate_cost
+                moved = True
+                break
+        # Recheck the jobs the move may have delayed
+        position = max(position - 8, 1) if moved else position + 1
+    return starts, cost
+
+
+# --------------------------------------------------
+# Lower bound: Lagrangian relaxation
+# --------------------------------------------------
+
+class _Relaxation:
+    """
+    Time-indexed costs of one episode, with capacity (``lam``) and
+    one-start-per-tick (``mu``) prices on decision times 0..T-1.
+    """
+
+    def __init__(self, arrivals, num_machines, horizon):
+        self.num_machines = num_machines
+        self.horizon = horizon
+        starts = np.arange(horizon)
+        self.ends = np.minimum(
+            starts[None, :] + arrivals["service_time"][:, None], horizon
+        )
+        tardiness = np.maximum(
+            self.ends - arrivals["deadline"][:, None], 0
+        ).astype(np.float64)
+        self.costs = tardiness * arrivals["priority_weight"][:, None]
+        self.costs[starts[None, :] < arrivals["time"][:, None]] = np.inf
+        self.unstarted = arrivals["priority_weight"] * np.maximum(
+            horizon - arrivals["deadline"], 0
+        )
+        self.rows = np.arange(len(arrivals))
+
+    def solve(self, lam, mu):
+        """
+        Lagrangian value, chosen starts (T = unstarted) and the
+        subgradients of both price vectors.
+        """
+        horizon = self.horizon
+        prefix = np.concatenate(([0.0], np.cumsum(lam)))
+        priced = self.costs + prefix[self.ends] - prefix[:horizon] + mu
+        best = priced.argmin(axis=1)
+        best_cost = priced[self.rows, best]
+        started = best_cost < self.unstarted
+        starts = np.where(started, best, horizon)
+
+        value = (
+            np.where(started, best_cost, self.unstarted).sum()
+            - self.num_machines * lam.sum() - mu.sum()
+        )
+
+        running = np.zeros(horizon + 1)
+        np.add.at(running, starts[started], 1.0)
+        np.add.at(running, self.ends[self.rows[started], best[started]], -1.0)
+        capacity_gradient = np.cumsum(running)[:horizon] - self.num_machines
+        start_gradient = (
+            np.bincount(starts[started], minlength=horizon)[:horizon] - 1.0
+        )
+        return value, starts, capacity_gradient, start_gradient
+
+
+def solve_hindsight(arrivals, num_machines, horizon, time_limit=2.0,
+                    max_iterations=300, heuristic_every=10):
+    """
+    Bound the minimum weighted tardiness accrued by ``horizon`` for
+    the arrival records ``arrivals`` (TRACE_DTYPE) on
+    ``num_machines`` machines.
+
+    Returns an OracleResult; ``start_times`` is the best schedule
+    found (its cost is ``upper_bound``), and ``optimal`` is set when
+    the bounds meet.
+    """
+    start_clock = time.perf_counter()
+    deadline = start_clock + time_limit
+    arrivals = arrivals[arrivals["time"] < horizon]
+    n = len(arrivals)
+    if n == 0:
+        return OracleResult(0.0, 0.0, np.empty(0, np.int64), True, 0, 0.0)
+
+    # Upper bound from the dispatch rules
+    best_starts, upper = None, np.inf
+    for keys in _rule_keys(arrivals).values():
+        starts, cost = _best_schedule(arrivals, keys, num_machines, horizon)
+        if cost < upper:
+            best_starts, upper = starts, cost
+
+    # Costs are sums of weight x whole ticks: with integer weights
+    # any bound can be rounded up
+    weights = arrivals["priority_weight"]
+    integral = bool(np.all(weights == np.round(weights)))
+
+    relaxation = _Relaxation(arrivals, num_machines, horizon)
+    lam = np.zeros(horizon)
+    mu = np.zeros(horizon)
+    lower, step_scale, stalled = 0.0, 2.0, 0
+    tiebreak = np.arange(n) / n
+
+    iteration = 0
+    for iteration in range(1, max_iterations + 1):
+        value, starts, g_lam, g_mu = relaxation.solve(lam, mu)
+        if integral:
+            value = np.ceil(value - 1e-6)
+        if value > lower + 1e-9:
+            lower, stalled = value, 0
+        else:
+            stalled += 1
+            if stalled >= 20:
+                step_scale, stalled = step_scale / 2, 0
+
+        # Lagrangian heuristic: the relaxed starts as priorities
+        if iteration % heuristic_every == 1:
+            candidate, cost = _best_schedule(
+                arrivals, starts + tiebreak, num_machines, horizon
+            )
+            if cost < upper:
+                best_starts, upper = candidate, cost
+
+        if (upper - lower <= 1e-9 or step_scale < 1e-4
+                or time.perf_counter() > deadline):
+            break
+
+        # Prices only move where the relaxed schedule breaks a limit
+        g_lam = np.where((lam > 0) | (g_lam > 0), g_lam, 0.0)
+        g_mu = np.where((mu > 0) | (g_mu > 0), g_mu, 0.0)
+        norm = g_lam @ g_lam + g_mu @ g_mu
+        if norm == 0:
+            break
+        step = step_scale * (upper - value) / norm
+        lam = np.maximum(lam + step * g_lam, 0.0)
+        mu = np.maximum(mu + step * g_mu, 0.0)
+
+    # Local search with the remaining budget
+    if upper - lower > 1e-9:
+        best_starts, upper = _improve(
+            arrivals, best_starts, upper, num_machines, horizon, deadline
+        )
+
+    lower = min(lower, upper)
+    return OracleResult(
+        lower_bound=float(lower),
+        upper_bound=float(upper),
+        start_times=best_starts,
+        optimal=upper - lower <= 1e-9,
+        iterations=iteration,
+        elapsed=time.perf_counter() - start_clock,
+    )
+
+
+# --------------------------------------------------
+# Per-episode bounds and regret
+# --------------------------------------------------
+
+def _oracle_unit(args):
+    env_config, env_seed, trace_path, episode, time_limit = args
+    env_config = as_env_config(env_config)
+    traces = TraceSet(trace_path) if trace_path is not None else None
+    arrivals = episode_arrivals(env_config, env_seed, traces, episode)
+    result = solve_hindsight(
+        arrivals, env_config.num_machines, env_config.episode_length,
+        time_limit=time_limit,
+    )
+    # Schedules are only needed when solving a single trace
+    return result._replace(start_times=None)
+
+
+def hindsight_bounds(env_configs, num_episodes, base_seed=0,
+                     trace_path=None, num_workers=None, time_limit=2.0):
+    """
+    OracleResult for every (config name, episode) of an evaluation
+    with the same arguments (see evaluation.parallel), so episode i
+    is bounded on exactly the arrivals every policy saw.
+    """
+    from evaluation.parallel import episode_seeds
+
+    seeds = episode_seeds(base_seed, num_episodes)
+    keys, units = [], []
+    for name, env_config in env_configs.items():
+        for episode, (env_seed, _) in enumerate(seeds):
+            keys.append((name, episode))
+            units.append(
+                (env_config, env_seed, trace_path, episode, time_limit)
+            )
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(units))
+    if num_workers <= 1:
+        results = [_oracle_unit(unit) for unit in units]
+    else:
+        with ProcessPoolExecutor(max_workers=num_workers) as pool:
+            results = list(pool.map(_oracle_unit, units))
+    return dict(zip(keys, results))
+
+
+def regret_summary(results, bounds):
+    """
+    Mean per-episode regret of every (config, policy) cell.
+
+    ``regret_vs_bound`` (cost minus lower bound) can only overstate
+    the true regret and ``regret_vs_best`` (cost minus the best
+    schedule found) can only understate it; ``gap`` is the mean
+    width of the oracle's bracket.
+    """
+    cells = {}
+    for r in results:
+        bound = bounds[(r.config_name, r.episode)]
+        cost = -r.reward + r.accrued
+        cells.setdefault((r.config_name, r.policy_name), []).append(
+            (cost - bound.lower_bound, cost - bound.upper_bound,
+             bound.upper_bound - bound.lower_bound)
+        )
+    return {
+        key: {
+            "regret_vs_bound": float(np.mean([row[0] for row in rows])),
+            "regret_vs_best": float(np.mean([row[1] for row in rows])),
+            "gap": float(np.mean([row[2] for row in rows])),
+        }
+        for key, rows in cells.items()
+    }
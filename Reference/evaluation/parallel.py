@@ -0,0 +1,244 @@
+"""
+Process-pool policy evaluation with deterministic per-episode seeds.
+
+Every (config, policy, episode) triple is an independent work unit.
+Episode seeds are derived from a single base seed with
+``np.random.SeedSequence``, so:
+
+- episode ``i`` uses the same environment seed for every policy
+  and config (paired comparisons on identical arrival streams)
+- each unit builds a fresh copy of its policy, so results do not
+  depend on which worker ran which episode
+- results are merged back in submission order
+
+Together this makes the numbers bit-identical for any worker count.
+
+With ``trace_path`` every unit replays episode ``i`` of a pre-generated
+trace set (env/traces.py) instead of sampling arrivals, so all
+policies see literally the same jobs.
+"""
+
+import copy
+import functools
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from env.lab_env import LabSchedulingEnv
+from env.traces import TraceSet
+from evaluation.metrics import SLAMetrics, merge_metrics
+from evaluation.results_store import CompletedJobRecorder
+
+
+WorkUnit = namedtuple(
+    "WorkUnit",
+    ["config_name", "env_config", "policy_name", "episode",
+     "env_seed", "policy_seed", "trace_path", "record_jobs"],
+    defaults=[None, False],
+)
+
+EpisodeResult = namedtuple(
+    "EpisodeResult",
+    ["config_name", "policy_name", "episode", "env_seed", "reward",
+     "metrics", "accrued", "jobs"],
+    defaults=[None, 0.0, None],
+)
+
+
+def episode_seeds(base_seed, num_episodes):
+    """
+    Derive independent (env_seed, policy_seed) pairs, one per episode.
+    """
+    children = np.random.SeedSequence(base_seed).spawn(num_episodes)
+    return [
+        tuple(int(s) for s in child.generate_state(2))
+        for child in children
+    ]
+
+
+class AgentPolicy:
+    """
+    Adapts a learned agent (``act_batch(observations)``) to the
+    ``select_action(env)`` interface of the baseline policies.
+    """
+
+    def __init__(self, agent):
+        self.agent = agent
+
+    def seed(self, seed: int):
+        import torch
+
+        torch.set_num_threads(1)
+        torch.manual_seed(seed)
+
+    def cache_key(self):
+        # Weights change during training; never reuse stored results
+        return None
+
+    def select_action(self, env):
+        actions, _, _ = self.agent.act_batch(
+            env._get_obs()[None], env.action_mask()[None]
+        )
+        return int(actions[0])
+
+
+# --------------------------------------------------
+# Work units
+# --------------------------------------------------
+
+def play_episode(env, policy, seed=None, options=None):
+    """
+    Run one episode of ``policy`` and return its total reward.
+    """
+    env.reset(seed=seed, options=options)
+    done = False
+    total_reward = 0.0
+
+    while not done:
+        action = policy.select_action(env)
+        _, reward, done, _, _ = env.step(action)
+        total_reward += reward
+
+    return total_reward
+
+
+def _run_unit(policies, unit):
+    policy = copy.deepcopy(policies[unit.policy_name])
+    if hasattr(policy, "seed"):
+        policy.seed(unit.policy_seed)
+
+    if unit.trace_path is None:
+        env = LabSchedulingEnv(unit.env_config)
+        options = None
+    else:
+        env = LabSchedulingEnv(
+            unit.env_config, traces=_open_traces(unit.trace_path)
+        )
+        options = {"episode": unit.episode}
+
+    metrics = SLAMetrics()
+    env.add_completion_sink(metrics)
+    recorder = None
+    if unit.record_jobs:
+        recorder = CompletedJobRecorder()
+        env.add_completion_sink(recorder)
+    reward = play_episode(env, policy, seed=unit.env_seed, options=options)
+
+    # Tardiness of jobs unfinished at the end, which the reward
+    # never sees (used for hindsight regret, see evaluation.oracle)
+    return EpisodeResult(
+        unit.config_name, unit.policy_name, unit.episode,
+        unit.env_seed, reward, metrics, env.accrued_tardiness(),
+        recorder.records() if recorder is not None else None,
+    )
+
+
+@functools.lru_cache(maxsize=8)
+def _open_traces(path):
+    return TraceSet(path)
+
+
+_worker_policies = None
+
+
+def _init_worker(policies):
+    global _worker_policies
+    _worker_policies = policies
+
+
+def _run_unit_in_worker(unit):
+    return _run_unit(_worker_policies, unit)
+
+
+def make_work_units(policy_names, env_configs, num_episodes, base_seed,
+                    trace_path=None):
+    """
+    Expand policies × configs × episodes into ordered work units.
+    """
+    seeds = episode_seeds(base_seed, num_episodes)
+    return [
+        WorkUnit(config_name, env_config, policy_name, episode,
+                 env_seed, policy_seed, trace_path)
+        for config_name, env_config in env_configs.items()
+        for policy_name in policy_names
+        for episode, (env_seed, policy_seed) in enumerate(seeds)
+    ]
+
+
+# --------------------------------------------------
+# Public API
+# --------------------------------------------------
+
+def run_work_units(policies, units, num_workers=None):
+    """
+    Execute work units, in a process pool when ``num_workers > 1``.
+
+    ``policies`` maps names to picklable policy instances; each unit
+    runs on its own deep copy. Results come back in unit order.
+    """
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = min(num_workers, len(units))
+
+    if num_workers <= 1:
+        return [_run_unit(policies, unit) for unit in units]
+
+    chunksize = max(1, len(units) // (4 * num_workers))
+    with ProcessPoolExecutor(
+        max_workers=num_workers,
+        initializer=_init_worker,
+        initargs=(policies,),
+    ) as pool:
+        return list(pool.map(_run_unit_in_worker, units, chunksize=chunksize))
+
+
+def evaluate_parallel(policies, env_configs, num_episodes, base_seed=0,
+                      num_workers=None, trace_path=None, store=None):
+    """
+    Evaluate every policy on every config for ``num_episodes``
+    seeded episodes.
+
+    Args:
+        policies: {name: policy instance}
+        env_configs: {name: EnvConfig or flat config dict}
+        num_episodes: episodes per (config, policy) cell
+        base_seed: root of the SeedSequence tree
+        num_workers: pool size (default: all cores, 1 = in-process)
+        trace_path: optional trace directory to replay arrivals from
+        store: optional ResultsStore; episodes it already holds are
+            read back instead of simulated, new ones are added
+
+    Returns:
+        list of EpisodeResult in (config, policy, episode) order
+    """
+    units = make_work_units(
+        list(policies), env_configs, num_episodes, base_seed, trace_path
+    )
+    if store is not None:
+        return store.run(policies, units, num_workers)
+    return run_work_units(policies, units, num_workers)
+
+
+def summarize(results):
+    """
+    Mean and standard deviation of reward per (config, policy) cell.
+    """
+    cells = {}
+    for r in results:
+        cells.setdefault((r.config_name, r.policy_name), []).append(r.reward)
+    return {
+        key: (float(np.mean(rewards)), float(np.std(rewards)))
+        for key, rewards in cells.items()
+    }
+
+
+def summarize_metrics(results):
+    """
+    Merged SLAMetrics per (config, policy) cell.
+    """
+    cells = {}
+    for r in results:
+        cells.setdefault((r.config_name, r.policy_name), []).append(r.metrics)
+    return {key: merge_metrics(metrics) for key, metrics in cells.items()}
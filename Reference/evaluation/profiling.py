@@ -0,0 +1,308 @@
+"""
+Opt-in hot-path instrumentation.
+
+A Profiler times the phases of the simulation and training loop
+(arrivals, machine processing, observation building, policy
+decisions, network forward passes, buffer writes, PPO updates) and
+keeps counters such as steps, events processed and queue length.
+
+Instrumentation works by replacing methods on individual instances
+with timing wrappers, so nothing in the env, policies or agent knows
+about it: an object that was never passed to ``instrument_*`` runs
+exactly the code it always did, with no flag checks in the step loop.
+``detach`` removes the wrappers again. Phases nest (``env_step``
+contains ``arrivals``, ``policy`` contains ``network_forward``), so
+their shares of wall time overlap.
+
+Every timed call can also be streamed to a trace file (one record
+per call) for offline analysis: raw binary TRACE_DTYPE records plus
+a ``.json`` sidecar with the phase names, or CSV if the path ends
+with ``.csv``.
+"""
+
+import csv
+import json
+import time
+
+import numpy as np
+
+
+TRACE_DTYPE = np.dtype([
+    ("phase", np.uint16),
+    ("start_ns", np.int64),
+    ("duration_ns", np.int64),
+])
+
+# Marks an attribute the instance did not hold before wrapping
+_ABSENT = object()
+
+
+class Profiler:
+    """
+    Per-phase timings and counters for instrumented objects.
+    """
+
+    def __init__(self, trace_path: str = None, buffer_size: int = 65536):
+        self.trace_path = trace_path
+        self.phases = []          # phase id -> name
+        self._phase_ids = {}
+        self._calls = []
+        self._total_ns = []
+        self._max_ns = []
+
+        self.counters = {}
+        self.gauges = {}          # name -> [count, sum, max]
+
+        self._wrapped = []
+        self._origin = time.perf_counter_ns()
+
+        self._file = None
+        self._csv = None
+        if trace_path is not None:
+            if trace_path.endswith(".csv"):
+                self._file = open(trace_path, "w", newline="")
+                self._csv = csv.writer(self._file)
+                self._csv.writerow(["phase", "start_ns", "duration_ns"])
+            else:
+                self._file = open(trace_path, "wb")
+            self._buffer = np.empty(buffer_size, dtype=TRACE_DTYPE)
+            self._size = 0
+
+    # --------------------------------------------------
+    # Recording
+    # --------------------------------------------------
+
+    def _phase_id(self, name):
+        phase_id = self._phase_ids.get(name)
+        if phase_id is None:
+            phase_id = len(self.phases)
+            self._phase_ids[name] = phase_id
+            self.phases.append(name)
+            self._calls.append(0)
+            self._total_ns.append(0)
+            self._max_ns.append(0)
+        return phase_id
+
+    def record(self, phase_id, start_ns, duration_ns):
+        self._calls[phase_id] += 1
+        self._total_ns[phase_id] += duration_ns
+        if duration_ns > self._max_ns[phase_id]:
+            self._max_ns[phase_id] = duration_ns
+
+        if self._file is not None:
+            self._buffer[self._size] = (
+                phase_id, start_ns - self._origin, duration_ns
+            )
+            self._size += 1
+            if self._size == len(self._buffer):
+                self.flush()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        gauge = self.gauges.get(name)
+        if gauge is None:
+            self.gauges[name] = [1, value, value]
+        else:
+            gauge[0] += 1
+            gauge[1] += value
+            if value > gauge[2]:
+                gauge[2] = value
+
+    # --------------------------------------------------
+    # Instrumentation
+    # --------------------------------------------------
+
+    def wrap(self, obj, method_name, phase, after=None):
+        """
+        Time every call of ``obj.method_name`` under ``phase``.
+        ``after(result)`` runs after each call, outside the timing.
+        """
+        original = getattr(obj, method_name)
+        phase_id = self._phase_id(phase)
+        clock = time.perf_counter_ns
+        record = self.record
+
+        def timed(*args, **kwargs):
+            start = clock()
+            result = original(*args, **kwargs)
+            record(phase_id, start, clock() - start)
+            if after is not None:
+                after(result)
+            return result
+
+        self._install(obj, method_name, timed)
+        return timed
+
+    def _install(self, obj, name, replacement):
+        # Remember what the instance itself held, so that detach
+        # restores it exactly, also when ``name`` is wrapped twice
+        previous = getattr(obj, "__dict__", {}).get(name, _ABSENT)
+        setattr(obj, name, replacement)
+        self._wrapped.append((obj, name, previous))
+
+    def _wrap_if_present(self, obj, method_name, phase, after=None):
+        if hasattr(obj, method_name):
+            self.wrap(obj, method_name, phase, after)
+
+    def instrument_env(self, env):
+        """
+        Time the step phases of a LabSchedulingEnv (either engine) or
+        VectorLabSchedulingEnv, and count steps and queue length.
+        """
+        def after_step(_):
+            self.count("steps")
+            if hasattr(env, "queue_size"):
+                self.observe("queue_length", float(env.queue_size.mean()))
+            else:
+                self.observe("queue_length", len(env.queue))
+
+        self.wrap(env, "step", "env_step", after_step)
+        self._wrap_if_present(env, "_generate_arrivals", "arrivals")
+        self._wrap_if_present(env, "_process_machines", "machines")
+        self._wrap_if_present(env, "_get_obs", "observation")
+        if hasattr(env, "_advance_events"):
+            self._wrap_events(env)
+        return env
+
+    def _wrap_events(self, env):
+        original = env._advance_events
+        phase_id = self._phase_id("events")
+        clock = time.perf_counter_ns
+
+        def advance(until):
+            # processed = queued before + pushed since - queued after
+            before = len(env._events) - env._event_seq
+            start = clock()
+            reward = original(until)
+            self.record(phase_id, start, clock() - start)
+            self.count("events", before - len(env._events) + env._event_seq)
+            return reward
+
+        self._install(env, "_advance_events", advance)
+
+    def instrument_policy(self, policy):
+        self._wrap_if_present(policy, "select_action", "policy")
+        return policy
+
+    def instrument_agent(self, agent):
+        self.wrap(agent.network, "forward", "network_forward")
+        self._wrap_if_present(agent, "select_action", "policy")
+        self._wrap_if_present(agent, "act_batch", "policy")
+        self._wrap_if_present(agent, "update", "ppo_update")
+        return agent
+
+    def instrument_buffer(self, buffer):
+        self.wrap(buffer, "add", "buffer_add")
+        # RolloutStorage as filled by rl.trainer.collect_rollout
+        self._wrap_if_present(buffer, "add_decisions", "buffer_add")
+        self._wrap_if_present(buffer, "add_rewards", "buffer_add")
+        return buffer
+
+    def detach(self):
+        """
+        Remove every wrapper, restoring the original methods.
+        """
+        for obj, name, previous in reversed(self._wrapped):
+            if previous is _ABSENT:
+                delattr(obj, name)
+            else:
+                setattr(obj, name, previous)
+        self._wrapped = []
+
+    # --------------------------------------------------
+    # Output
+    # --------------------------------------------------
+
+    def flush(self):
+        if self._file is None or self._size == 0:
+            return
+        records = self._buffer[:self._size]
+        if self._csv is not None:
+            self._csv.writerows(
+                (self.phases[phase], start, duration)
+                for phase, start, duration in records.tolist()
+            )
+        else:
+            records.tofile(self._file)
+        self._file.flush()
+        self._size = 0
+
+    def close(self):
+        if self._file is None or self._file.closed:
+            return
+        self.flush()
+        self._file.close()
+        if self._csv is None:
+            with open(self.trace_path + ".json", "w") as f:
+                json.dump({"phases": self.phases}, f)
+
+    def summary(self):
+        """
+        Totals per phase, counters, gauge means/maxima and rates.
+        """
+        wall_s = (time.perf_counter_ns() - self._origin) / 1e9
+        phases = {}
+        for phase_id, name in enumerate(self.phases):
+            calls = self._calls[phase_id]
+            total_s = self._total_ns[phase_id] / 1e9
+            phases[name] = {
+                "calls": calls,
+                "total_s": total_s,
+                "mean_us": total_s / calls * 1e6 if calls else 0.0,
+                "max_us": self._max_ns[phase_id] / 1e3,
+                "share": total_s / wall_s if wall_s else 0.0,
+            }
+
+        gauges = {
+            name: {"mean": total / n, "max": peak}
+            for name, (n, total, peak) in self.gauges.items()
+        }
+        return {
+            "wall_s": wall_s,
+            "phases": phases,
+            "counters": dict(self.counters),
+            "gauges": gauges,
+            "steps_per_s": self.counters.get("steps", 0) / wall_s
+            if wall_s else 0.0,
+        }
+
+    def print_summary(self):
+        summary = self.summary()
+        print(
+            f"\n{'phase':16s} | {'calls':>9s} | {'total s':>8s} | "
+            f"{'mean us':>8s} | {'max us':>9s} | {'share':>6s}"
+        )
+        for name, row in sorted(
+            summary["phases"].items(), key=lambda item: -item[1]["total_s"]
+        ):
+            print(
+                f"{name:16s} | {row['calls']:9d} | {row['total_s']:8.3f} | "
+                f"{row['mean_us']:8.1f} | {row['max_us']:9.1f} | "
+                f"{row['share']:6.1%}"
+            )
+        for name, value in summary["counters"].items():
+            print(f"{name}: {value}")
+        for name, gauge in summary["gauges"].items():
+            print(f"{name}: mean {gauge['mean']:.2f}, max {gauge['max']:.2f}")
+        print(
+            f"wall {summary['wall_s']:.2f}s, "
+            f"{summary['steps_per_s']:.0f} steps/s"
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.detach()
+        self.close()
+
+
+def read_trace(path: str):
+    """
+    Memory-map a binary trace; returns (records, phase names).
+    """
+    with open(path + ".json") as f:
+        phases = json.load(f)["phases"]
+    return np.memmap(path, dtype=TRACE_DTYPE, mode="r"), phases
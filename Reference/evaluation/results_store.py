@@ -0,0 +1,446 @@
+"""
+Content-addressed store of evaluation results.
+
+An episode's outcome depends only on the compiled environment config,
+the policy and the seeds it ran with, so it only ever needs to be
+simulated once. ResultsStore keeps every simulated episode on disk,
+keyed by:
+
+- the config's content hash (EnvConfig.content_hash, combined with
+  the trace set's metadata when arrivals are replayed)
+- the policy key: a hash of its class, ``version`` attribute and
+  constructor parameters (see ``policy_key``)
+- the (env_seed, policy_seed) pair of the episode
+
+``evaluate_parallel(..., store=store)`` looks every work unit up
+first and simulates only the missing (config, policy, seed) cells.
+
+Layout (Parquet, hive-partitioned so queries can skip whole cells):
+
+    root/episodes/config=<hash>/policy=<key>/part-*.parquet
+        one row per episode: env_seed, policy_seed, episode, reward,
+        accrued (tardiness of jobs unfinished at the end)
+    root/jobs/config=<hash>/policy=<key>/part-*.parquet
+        one row per completed job (COMPLETED_DTYPE columns) plus
+        env_seed and policy_seed
+    root/configs/<hash>.json, root/policies/<key>.json
+        what each hash stands for
+
+Cached episodes come back with their SLAMetrics rebuilt from the job
+records, so they are identical to freshly simulated ones. Bump a
+policy's ``version`` class attribute when its behaviour changes;
+policies whose ``cache_key()`` returns None (e.g. a learned agent
+that is still training) are always simulated and never stored.
+
+pyarrow is imported only when the store is used.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import uuid
+
+import numpy as np
+
+from env.config import as_env_config
+from env.job import COMPLETED_DTYPE, Job
+from evaluation.metrics import SLAMetrics
+
+
+# --------------------------------------------------
+# Keys
+# --------------------------------------------------
+
+def _hash(payload):
+    canonical = json.dumps(payload, sort_keys=True, default=repr)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+
+def policy_identity(policy):
+    """
+    Class, version and constructor parameters of ``policy``, or
+    None when it has no stable identity.
+
+    Parameters are read back from same-named instance attributes;
+    nested policies (e.g. a lookahead's base policy) are expanded
+    recursively. Seeds are left out because every episode reseeds
+    its policy.
+    """
+    custom = getattr(policy, "cache_key", None)
+    if custom is not None:
+        return custom()
+
+    params = {}
+    signature = inspect.signature(type(policy).__init__)
+    for name in list(signature.parameters)[1:]:
+        if name == "seed" or not hasattr(policy, name):
+            continue
+        value = getattr(policy, name)
+        if callable(value):
+            continue
+        if hasattr(value, "select_action"):
+            value = policy_identity(value)
+            if value is None:
+                return None
+        params[name] = value
+
+    cls = type(policy)
+    return {
+        "class": f"{cls.__module__}.{cls.__qualname__}",
+        "version": getattr(cls, "version", 1),
+        "params": params,
+    }
+
+
+def policy_key(policy):
+    identity = policy_identity(policy)
+    return None if identity is None else _hash(identity)
+
+
+def config_key(env_config, trace_path=None):
+    """
+    Content hash of a config, extended by the trace set it replays.
+    """
+    digest = as_env_config(env_config).content_hash()
+    if trace_path is None:
+        return digest
+    with open(os.path.join(trace_path, "meta.json")) as f:
+        return _hash([digest, json.load(f)])
+
+
+# --------------------------------------------------
+# Job records
+# --------------------------------------------------
+
+class CompletedJobRecorder:
+    """
+    Completion sink that keeps finished jobs as COMPLETED_DTYPE
+    records in memory (one episode's worth).
+    """
+
+    def __init__(self):
+        self._rows = []
+
+    def add(self, job):
+        self._rows.append((
+            job.job_id,
+            job.is_stat,
+            job.arrival_time,
+            job.start_time,
+            job.completion_time,
+            job.deadline,
+            job.priority_weight,
+        ))
+
+    def records(self):
+        return np.array(self._rows, dtype=COMPLETED_DTYPE)
+
+
+def metrics_from_records(records):
+    """
+    Rebuild the SLAMetrics of an episode from its job records, in
+    completion order.
+    """
+    metrics = SLAMetrics()
+    for (job_id, is_stat, arrival, start, completion, deadline,
+         weight) in records:
+        job = Job(job_id, arrival, completion - start, deadline,
+                  is_stat, weight)
+        job.start_time = start
+        job.completion_time = completion
+        metrics.add(job)
+    return metrics
+
+
+# --------------------------------------------------
+# Store
+# --------------------------------------------------
+
+class ResultsStore:
+    """
+    On-disk cache of episode rewards and job records.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        for sub in ("episodes", "jobs", "configs", "policies"):
+            os.makedirs(os.path.join(root, sub), exist_ok=True)
+
+    def _cell_dir(self, table, config, policy):
+        return os.path.join(
+            self.root, table, f"config={config}", f"policy={policy}"
+        )
+
+    def _write_json(self, sub, key, payload):
+        path = os.path.join(self.root, sub, f"{key}.json")
+        if not os.path.exists(path):
+            _atomic_write_text(path, json.dumps(
+                payload, indent=2, sort_keys=True, default=repr
+            ))
+
+    # --------------------------------------------------
+    # Reading
+    # --------------------------------------------------
+
+    def _read_cell(self, table, config, policy, columns=None):
+        import pyarrow.parquet as pq
+
+        directory = self._cell_dir(table, config, policy)
+        if not os.path.isdir(directory):
+            return None
+        files = sorted(
+            os.path.join(directory, name)
+            for name in os.listdir(directory)
+            if name.endswith(".parquet")
+        )
+        if not files:
+            return None
+        return pq.ParquetDataset(files).read(columns=columns)
+
+    def cached_seeds(self, config, policy):
+        """
+        {(env_seed, policy_seed): (reward, accrued)} of one stored cell.
+        """
+        table = self._read_cell(
+            "episodes", config, policy,
+            ["env_seed", "policy_seed", "reward", "accrued"],
+        )
+        if table is None:
+            return {}
+        columns = table.to_pydict()
+        return {
+            (env_seed, policy_seed): (reward, accrued)
+            for env_seed, policy_seed, reward, accrued in zip(
+                columns["env_seed"], columns["policy_seed"],
+                columns["reward"], columns["accrued"],
+            )
+        }
+
+    def cached_metrics(self, config, policy, seeds):
+        """
+        SLAMetrics per (env_seed, policy_seed) in ``seeds``.
+        """
+        table = self._read_cell("jobs", config, policy)
+        metrics = {seed: SLAMetrics() for seed in seeds}
+        if table is None:
+            return metrics
+
+        env_seeds = table.column("env_seed").to_numpy()
+        policy_seeds = table.column("policy_seed").to_numpy()
+        columns = {
+            name: table.column(name).to_numpy()
+            for name in COMPLETED_DTYPE.names
+        }
+        for env_seed, policy_seed in seeds:
+            rows = np.flatnonzero(
+                (env_seeds == env_seed) & (policy_seeds == policy_seed)
+            )
+            records = np.empty(rows.size, dtype=COMPLETED_DTYPE)
+            for name, values in columns.items():
+                records[name] = values[rows]
+            metrics[(env_seed, policy_seed)] = metrics_from_records(records)
+        return metrics
+
+    # --------------------------------------------------
+    # Writing
+    # --------------------------------------------------
+
+    def write_cell(self, config, policy, units, results):
+        """
+        Append the episodes of one (config, policy) cell.
+        """
+        import pyarrow as pa
+
+        env_seeds = [unit.env_seed for unit in units]
+        policy_seeds = [unit.policy_seed for unit in units]
+        episodes = pa.table({
+            "env_seed": pa.array(env_seeds, pa.uint64()),
+            "policy_seed": pa.array(policy_seeds, pa.uint64()),
+            "episode": pa.array([u.episode for u in units], pa.int64()),
+            "reward": pa.array([r.reward for r in results], pa.float64()),
+            "accrued": pa.array([r.accrued for r in results], pa.float64()),
+        })
+
+        records = [result.jobs for result in results]
+        counts = [len(jobs) for jobs in records]
+        records = np.concatenate(records) if records else \
+            np.empty(0, dtype=COMPLETED_DTYPE)
+        jobs = {
+            "env_seed": pa.array(np.repeat(env_seeds, counts), pa.uint64()),
+            "policy_seed": pa.array(
+                np.repeat(policy_seeds, counts), pa.uint64()
+            ),
+        }
+        for name in COMPLETED_DTYPE.names:
+            jobs[name] = records[name]
+
+        # Jobs first: a cell only counts as cached once its episodes
+        # file exists, so an interrupted write leaves no gap
+        part = f"part-{uuid.uuid4().hex}.parquet"
+        self._write_table(pa.table(jobs), "jobs", config, policy, part)
+        self._write_table(episodes, "episodes", config, policy, part)
+
+    def _write_table(self, table, name, config, policy, part):
+        import pyarrow.parquet as pq
+
+        directory = self._cell_dir(name, config, policy)
+        os.makedirs(directory, exist_ok=True)
+        # Dot-prefixed files are skipped by dataset scans
+        tmp = os.path.join(directory, f".{part}.tmp")
+        pq.write_table(table, tmp)
+        os.replace(tmp, os.path.join(directory, part))
+
+    # --------------------------------------------------
+    # Cached evaluation
+    # --------------------------------------------------
+
+    def run(self, policies, units, num_workers=None):
+        """
+        Results for ``units`` (see evaluation.parallel), simulating
+        only the ones not already stored. Results come back in unit
+        order.
+        """
+        from evaluation.parallel import EpisodeResult, run_work_units
+
+        policy_keys = {
+            name: policy_key(policy) for name, policy in policies.items()
+        }
+        cells = {}
+        for position, unit in enumerate(units):
+            key = (
+                config_key(unit.env_config, unit.trace_path),
+                policy_keys[unit.policy_name],
+            )
+            cells.setdefault(key, []).append(position)
+
+        results = [None] * len(units)
+        missing = []
+        for (config, policy), positions in cells.items():
+            if policy is None:
+                missing.extend(positions)
+                continue
+            stored = self.cached_seeds(config, policy)
+            hits = [
+                position for position in positions
+                if _seeds(units[position]) in stored
+            ]
+            metrics = self.cached_metrics(
+                config, policy, [_seeds(units[p]) for p in hits]
+            )
+            for position in hits:
+                unit = units[position]
+                reward, accrued = stored[_seeds(unit)]
+                results[position] = EpisodeResult(
+                    unit.config_name, unit.policy_name, unit.episode,
+                    unit.env_seed, reward, metrics[_seeds(unit)], accrued,
+                )
+            missing.extend(sorted(set(positions) - set(hits)))
+
+        missing.sort()
+        fresh = run_work_units(
+            policies,
+            [units[position]._replace(record_jobs=True)
+             for position in missing],
+            num_workers,
+        )
+        new_cells = {}
+        for position, result in zip(missing, fresh):
+            results[position] = result._replace(jobs=None)
+            unit = units[position]
+            config = config_key(unit.env_config, unit.trace_path)
+            policy = policy_keys[unit.policy_name]
+            if policy is not None:
+                cell = new_cells.setdefault((config, policy), ([], []))
+                cell[0].append(unit)
+                cell[1].append(result)
+
+        for (config, policy), (cell_units, cell_results) in new_cells.items():
+            unit = cell_units[0]
+            self._write_json(
+                "configs", config, as_env_config(unit.env_config).to_dict()
+            )
+            self._write_json(
+                "policies", policy,
+                policy_identity(policies[unit.policy_name]),
+            )
+            self.write_cell(config, policy, cell_units, cell_results)
+        return results
+
+    # --------------------------------------------------
+    # Queries
+    # --------------------------------------------------
+
+    def dataset(self, table="episodes"):
+        """
+        Lazy pyarrow dataset over ``episodes`` or ``jobs``, with
+        ``config`` and ``policy`` partition columns.
+        """
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        # Keys are hex strings; never let them be inferred as ints
+        partitioning = ds.partitioning(
+            pa.schema([("config", pa.string()), ("policy", pa.string())]),
+            flavor="hive",
+        )
+        return ds.dataset(
+            os.path.join(self.root, table),
+            format="parquet",
+            partitioning=partitioning,
+        )
+
+    def summary(self, filter=None):
+        """
+        Episode count, mean and standard deviation of reward per
+        (config, policy), computed batch by batch so the episodes
+        never have to fit in memory at once.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        totals = {}
+        scanner = self.dataset("episodes").scanner(
+            columns={
+                "config": pc.field("config"),
+                "policy": pc.field("policy"),
+                "reward": pc.field("reward"),
+                "square": pc.multiply(pc.field("reward"), pc.field("reward")),
+            },
+            filter=filter,
+        )
+        for batch in scanner.to_batches():
+            partial = pa.Table.from_batches([batch]).group_by(
+                ["config", "policy"]
+            ).aggregate([
+                ("reward", "count"), ("reward", "sum"), ("square", "sum"),
+            ]).to_pydict()
+            for config, policy, n, total, squares in zip(
+                partial["config"], partial["policy"], partial["reward_count"],
+                partial["reward_sum"], partial["square_sum"],
+            ):
+                cell = totals.setdefault((config, policy), [0, 0.0, 0.0])
+                cell[0] += n
+                cell[1] += total
+                cell[2] += squares
+
+        summary = {}
+        for key, (n, total, squares) in totals.items():
+            mean = total / n
+            summary[key] = {
+                "episodes": n,
+                "mean_reward": mean,
+                "std_reward": max(squares / n - mean * mean, 0.0) ** 0.5,
+            }
+        return summary
+
+
+def _seeds(unit):
+    return (unit.env_seed, unit.policy_seed)
+
+
+def _atomic_write_text(path, text):
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
@@ -0,0 +1,154 @@
+"""
+Sequential (racing) policy comparison.
+
+Instead of a fixed number of episodes per policy, policies are run in
+batches of paired episodes (episode ``i`` uses the same seed for all
+of them, see evaluation.parallel). After every batch, each unresolved
+pair of policies gets a confidence interval on its mean paired
+reward difference. A pair is settled once that interval excludes
+zero (one policy is better) or lies inside ``±indifference`` (they
+are practically equal). A policy stops being simulated once all its
+comparisons are settled.
+
+Intervals are normal-approximation intervals on the paired
+differences. The error budget ``alpha`` is split across pairs
+(Bonferroni) and across looks (alpha_k ∝ 1/k²), so the chance of
+any wrong call stays below ``alpha`` even though the data are
+checked after every batch.
+"""
+
+import itertools
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from evaluation.parallel import episode_seeds, WorkUnit, run_work_units
+
+
+class PairStatus:
+    UNRESOLVED = "unresolved"
+    FIRST_BETTER = "first_better"
+    SECOND_BETTER = "second_better"
+    EQUIVALENT = "equivalent"
+
+
+def _critical_value(alpha, look, num_pairs):
+    # sum_k 6 / (pi^2 k^2) = 1, so the looks share alpha / num_pairs
+    alpha_k = alpha / num_pairs * 6.0 / (math.pi ** 2 * look ** 2)
+    return NormalDist().inv_cdf(1.0 - alpha_k / 2.0)
+
+
+def paired_interval(differences, critical_value):
+    """
+    Mean of the paired differences and its confidence half-width.
+    """
+    n = len(differences)
+    mean = float(np.mean(differences))
+    if n < 2:
+        return mean, math.inf
+    std = float(np.std(differences, ddof=1))
+    return mean, critical_value * std / math.sqrt(n)
+
+
+def sequential_compare(policies, env_config, base_seed=0, batch_size=8,
+                       min_episodes=8, max_episodes=256, alpha=0.05,
+                       indifference=0.0, num_workers=None):
+    """
+    Race ``policies`` on one environment config.
+
+    Args:
+        policies: {name: policy instance}
+        env_config: environment config dict
+        base_seed: root of the shared episode seeds
+        batch_size: paired episodes added per look
+        min_episodes: episodes before the first decision
+        max_episodes: hard cap per policy
+        alpha: overall error probability for all decisions
+        indifference: pairs whose interval lies within ±this are
+            declared equivalent (0 disables)
+        num_workers: process-pool size per batch
+
+    Returns:
+        dict with per-policy rewards, per-pair decisions and the
+        total number of episodes simulated
+    """
+    names = list(policies)
+    pairs = list(itertools.combinations(names, 2))
+    seeds = episode_seeds(base_seed, max_episodes)
+
+    rewards = {name: [] for name in names}
+    status = {pair: PairStatus.UNRESOLVED for pair in pairs}
+    intervals = {}
+
+    look = 0
+    episodes = 0
+    while episodes < max_episodes:
+        active = [
+            name for name in names
+            if any(
+                status[pair] == PairStatus.UNRESOLVED and name in pair
+                for pair in pairs
+            )
+        ]
+        if not active:
+            break
+
+        target = max(min_episodes, episodes + batch_size)
+        target = min(target, max_episodes)
+        units = [
+            WorkUnit("sequential", env_config, name, episode,
+                     env_seed, policy_seed)
+            for name in active
+            for episode, (env_seed, policy_seed) in enumerate(
+                seeds[episodes:target], start=episodes
+            )
+        ]
+        for result in run_work_units(policies, units, num_workers):
+            rewards[result.policy_name].append(result.reward)
+        episodes = target
+
+        look += 1
+        z = _critical_value(alpha, look, len(pairs))
+        for a, b in pairs:
+            if status[(a, b)] != PairStatus.UNRESOLVED:
+                continue
+            diff = np.subtract(rewards[a], rewards[b])
+            mean, half_width = paired_interval(diff, z)
+            intervals[(a, b)] = (mean - half_width, mean + half_width)
+
+            if mean - half_width > 0:
+                status[(a, b)] = PairStatus.FIRST_BETTER
+            elif mean + half_width < 0:
+                status[(a, b)] = PairStatus.SECOND_BETTER
+            elif (
+                indifference > 0
+                and -indifference < mean - half_width
+                and mean + half_width < indifference
+            ):
+                status[(a, b)] = PairStatus.EQUIVALENT
+
+    return {
+        "rewards": rewards,
+        "decisions": status,
+        "intervals": intervals,
+        "episodes_run": sum(len(r) for r in rewards.values()),
+        "looks": look,
+    }
+
+
+def ranking(result):
+    """
+    Order policies by number of settled wins (ties by mean reward).
+    """
+    wins = {name: 0 for name in result["rewards"]}
+    for (a, b), decision in result["decisions"].items():
+        if decision == PairStatus.FIRST_BETTER:
+            wins[a] += 1
+        elif decision == PairStatus.SECOND_BETTER:
+            wins[b] += 1
+    return sorted(
+        wins,
+        key=lambda name: (wins[name], np.mean(result["rewards"][name])),
+        reverse=True,
+    )
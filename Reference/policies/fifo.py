@@ -1,3 +1,13 @@
+import numpy as np
+
+from env.station_actions import (
+    DISPATCH_FIFO,
+    DISPATCH_ROUTINE,
+    DISPATCH_STAT,
+    HOLD,
+)
+
+
 class FIFOPolicy:
     """
     First-In-First-Out (FIFO) scheduling policy.
@@ -17,8 +27,23 @@ class FIFOPolicy:
         if len(env.queue) == 0:
             return env.action_space.n - 1  # no-op
 
-        for i, machine in enumerate(env.machines):
-            if machine.is_idle():
-                return i
+        machine_id = env.idle_machines.first()
+        if machine_id is not None:
+            return machine_id
 
         return env.action_space.n - 1  # no-op
+
+    def select_station_actions(self, env):
+        """
+        MultiStationLabEnv counterpart: start the FIFO head wherever
+        an eligible machine is free. Where only machines reserved for
+        the other class are free, start the earliest job of that
+        class instead; hold elsewhere.
+        """
+        mask = env.action_mask()
+        return np.select(
+            [mask[:, DISPATCH_FIFO], mask[:, DISPATCH_STAT],
+             mask[:, DISPATCH_ROUTINE]],
+            [DISPATCH_FIFO, DISPATCH_STAT, DISPATCH_ROUTINE],
+            HOLD,
+        )
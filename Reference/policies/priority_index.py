@@ -0,0 +1,100 @@
+from env.job_queue import ATCIndex, PriorityIndex, WeightedSlackIndex
+
+
+class IndexPolicy:
+    """
+    Base class for index-based dispatch rules.
+
+    Each rule ranks queued jobs by a priority index that the
+    environment's JobQueue keeps up to date on every arrival. At a
+    decision point the best job is promoted to the front of the
+    queue and assigned to the lowest-numbered idle machine, so a
+    decision costs O(log n) however long the queue is.
+    """
+
+    index_name = None
+
+    def make_index(self, env):
+        raise NotImplementedError
+
+    def select_action(self, env):
+        if len(env.queue) == 0:
+            return env.action_space.n - 1  # no-op
+
+        machine_id = env.idle_machines.first()
+        if machine_id is None:
+            return env.action_space.n - 1  # no-op
+
+        index = env.queue.index(self.index_name)
+        if index is None:
+            index = env.queue.add_index(self.index_name, self.make_index(env))
+
+        env.queue.move_to_front(index.best(env.current_time))
+        return machine_id
+
+
+class EDDPolicy(IndexPolicy):
+    """
+    Earliest Due Date.
+
+    Rationale:
+    - Classical rule for minimizing maximum lateness
+    - Treats STAT jobs as urgent only through their tighter deadline
+    - Ignores priority weights and service times
+    """
+
+    index_name = "deadline"
+
+    def make_index(self, env):
+        return PriorityIndex(lambda job: job.deadline)
+
+
+class SPTPolicy(IndexPolicy):
+    """
+    Shortest Processing Time.
+
+    Rationale:
+    - Minimizes mean flow time on a single machine
+    - Clears the backlog quickly under congestion
+    - Can starve long jobs, including STAT samples
+    """
+
+    index_name = "service_time"
+
+    def make_index(self, env):
+        return PriorityIndex(lambda job: job.service_time)
+
+
+class WeightedSlackPolicy(IndexPolicy):
+    """
+    Weighted minimum slack.
+
+    Rationale:
+    - Dispatches the job closest to missing its deadline
+    - Scales slack by priority weight so STAT jobs win ties in urgency
+    - Reacts to time passing, unlike static rules
+    """
+
+    index_name = "weighted_slack"
+
+    def make_index(self, env):
+        return WeightedSlackIndex()
+
+
+class ATCPolicy(IndexPolicy):
+    """
+    Apparent Tardiness Cost (Vepsalainen & Morton).
+
+    Rationale:
+    - Standard heuristic for weighted tardiness objectives
+    - Blends WSPT (w/p) with an exponential slack-based urgency term
+    - ``k`` controls look-ahead: small k behaves like EDD-ish
+      urgency, large k approaches WSPT
+    """
+
+    def __init__(self, k: float = 2.0):
+        self.k = k
+        self.index_name = f"atc(k={k})"
+
+    def make_index(self, env):
+        return ATCIndex(self.k, env.cfg.service_time_mean)
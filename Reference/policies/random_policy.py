@@ -13,6 +13,12 @@ class RandomPolicy:
     def __init__(self, seed: int = 0):
         self.random = random.Random(seed)
 
+    def seed(self, seed: int):
+        """
+        Reseed the policy (used for per-episode seeding).
+        """
+        self.random.seed(seed)
+
     def select_action(self, env):
         """
         Randomly select an action from the valid action space.
@@ -1,3 +1,8 @@
+import numpy as np
+
+from env.station_actions import DISPATCH_ROUTINE, DISPATCH_STAT, HOLD
+
+
 class StatFirstPolicy:
     """
     STAT-first priority heuristic.
@@ -17,20 +22,27 @@ class StatFirstPolicy:
         if len(env.queue) == 0:
             return env.action_space.n - 1  # no-op
 
-        # Find earliest STAT job (by arrival time)
-        stat_index = None
-        for idx, job in enumerate(env.queue):
-            if job.is_stat:
-                stat_index = idx
-                break
+        # Earliest STAT job (by arrival time), kept by the queue index
+        stat_job = env.queue.peek_stat()
 
         # Promote STAT job to front if found
-        if stat_index is not None:
-            stat_job = env.queue.pop(stat_index)
-            env.queue.insert(0, stat_job)
+        if stat_job is not None:
+            env.queue.move_to_front(stat_job)
 
-        for i, machine in enumerate(env.machines):
-            if machine.is_idle():
-                return i
+        machine_id = env.idle_machines.first()
+        if machine_id is not None:
+            return machine_id
 
         return env.action_space.n - 1  # no-op
+
+    def select_station_actions(self, env):
+        """
+        MultiStationLabEnv counterpart: at every station, start the
+        earliest STAT job if possible, else the earliest routine job.
+        """
+        mask = env.action_mask()
+        return np.select(
+            [mask[:, DISPATCH_STAT], mask[:, DISPATCH_ROUTINE]],
+            [DISPATCH_STAT, DISPATCH_ROUTINE],
+            HOLD,
+        )
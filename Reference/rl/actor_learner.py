@@ -0,0 +1,249 @@
+"""
+Asynchronous actor-learner training.
+
+Actor processes simulate labs with a recent copy of the policy while
+the learner computes PPO updates, so simulation and gradient steps
+overlap instead of alternating.
+
+Data flow (all bulk data lives in shared memory):
+
+- every actor owns two RolloutStorage slots, moved to shared memory
+  once; it takes a free slot id from its own queue, fills the slot in
+  place with one rollout (rl.trainer.collect_rollout) and hands the
+  id back on its own queue with the final observations and
+  finished-episode rewards
+- the learner waits for one filled slot from every actor, gathers
+  them into a single batch, releases the slots straight away (actors
+  keep simulating during the update), runs the PPO epochs and
+  publishes the new weights
+- weights are broadcast through one shared flat parameter tensor and
+  a version counter; actors reload them before each rollout when the
+  version has changed
+
+With two slots per actor, a rollout was collected by a policy at
+most two updates old: a released slot may be refilled while the
+update that released it is still running. PPO's clipped ratio
+against the stored behaviour log-probabilities keeps that mild lag
+safe; the mean and maximum lag of every update are reported.
+
+The timestep budget counts environment steps: one update consumes
+``num_actors * num_envs * num_steps`` of them.
+
+Checkpoints (rl/checkpoint.py) hold the learner's weights, optimizer
+and history. Resuming restarts the actors from fresh environments, so
+unlike the synchronous loop the resumed run is not bit-identical.
+"""
+
+import copy
+
+import numpy as np
+import torch
+import torch.multiprocessing as mp
+from torch.nn.utils import parameters_to_vector, vector_to_parameters
+
+from env.config import as_env_config
+from env.vector_env import VectorLabSchedulingEnv
+
+from .checkpoint import restore_training, training_state
+from .ppo_agent import PPOAgent
+from .rollout_buffer import RolloutStorage
+from .trainer import collect_rollout
+
+
+# Fields written by actors; returns/advantages are the learner's job
+_ROLLOUT_FIELDS = (
+    "observations",
+    "actions",
+    "log_probs",
+    "rewards",
+    "values",
+    "dones",
+    "action_masks",
+)
+
+
+# --------------------------------------------------
+# Actor process
+# --------------------------------------------------
+
+def _actor(env_cfg, num_envs, network, obs_dim, action_dim, seed, slots,
+           weights, version, lock, free_slots, full_slots, stop):
+    torch.set_num_threads(1)
+    agent = PPOAgent(obs_dim, action_dim, seed=seed)
+    agent.network = network
+    local_version = -1
+
+    env = VectorLabSchedulingEnv(env_cfg, num_envs)
+    obs, _ = env.reset(seed=seed)
+
+    while True:
+        slot_id = free_slots.get()
+        if slot_id is None or stop.is_set():
+            return
+
+        with lock:
+            if version.value != local_version:
+                vector_to_parameters(weights, agent.network.parameters())
+                local_version = version.value
+
+        obs, episode_rewards = collect_rollout(
+            env, agent, slots[slot_id], obs
+        )
+        full_slots.put(
+            (slot_id, local_version, obs.copy(), episode_rewards)
+        )
+
+
+# --------------------------------------------------
+# Learner
+# --------------------------------------------------
+
+def _gather(batch, storages):
+    """
+    Concatenate filled slots along the environment axis into ``batch``.
+    """
+    for field in _ROLLOUT_FIELDS:
+        target = getattr(batch, field)
+        if target is not None:
+            torch.cat(
+                [getattr(storage, field) for storage in storages],
+                dim=1,
+                out=target,
+            )
+    torch.cat([storage.lengths for storage in storages], out=batch.lengths)
+    batch.step = batch.num_steps
+
+
+def train_actor_learner(agent: PPOAgent, env_cfg,
+                        total_timesteps: int, num_actors: int = 4,
+                        num_envs: int = 8, num_steps: int = None,
+                        num_epochs: int = 4, minibatch_size: int = 256,
+                        seed: int = 0, log=print, checkpointer=None,
+                        resume=False):
+    """
+    Train ``agent`` with ``num_actors`` simulation processes, each
+    stepping ``num_envs`` labs in lockstep for ``num_steps`` steps
+    per rollout (default: one episode). With a ``checkpointer`` the
+    learner state is saved periodically; ``resume`` continues from
+    the newest checkpoint.
+
+    Returns a list of per-update dicts (timesteps, mean episode
+    reward of the finished episodes, mean and maximum policy lag).
+    """
+    env_cfg = as_env_config(env_cfg)
+    num_steps = num_steps or env_cfg.episode_length
+    obs_dim, action_dim = agent.obs_dim, agent.action_dim
+
+    history = []
+    timesteps = episodes = 0
+    state = checkpointer.load() if resume and checkpointer else None
+    if state is not None:
+        restore_training(agent, state)
+        history, episodes = state["history"], state["episodes"]
+        timesteps = history[-1]["timesteps"] if history else 0
+        if log is not None:
+            log(f"Resumed after update {state['update']}")
+
+    ctx = mp.get_context("spawn")
+    slots = [
+        RolloutStorage(num_steps, num_envs, obs_dim, action_dim)
+        .share_memory_()
+        for _ in range(2 * num_actors)
+    ]
+    batch = RolloutStorage(
+        num_steps, num_envs * num_actors, obs_dim, action_dim
+    )
+
+    weights = parameters_to_vector(agent.network.parameters()).detach()
+    weights.share_memory_()
+    version = ctx.Value("l", 0)
+    lock = ctx.Lock()
+    stop = ctx.Event()
+    # One pair of queues per actor, so every update gets exactly one
+    # rollout from each actor and no actor can take another's slots
+    free_slots = [ctx.Queue() for _ in range(num_actors)]
+    full_slots = [ctx.Queue() for _ in range(num_actors)]
+    for slot_id in range(len(slots)):
+        free_slots[slot_id // 2].put(slot_id)
+
+    # A resumed run gets new actor streams rather than replaying the
+    # episodes of the first updates
+    entropy = [seed, len(history)] if history else seed
+    seeds = np.random.SeedSequence(entropy).spawn(num_actors)
+    actors = [
+        ctx.Process(
+            target=_actor,
+            args=(
+                env_cfg, num_envs, copy.deepcopy(agent.network),
+                obs_dim, action_dim,
+                int(seeds[worker_id].generate_state(1)[0]),
+                slots, weights, version, lock,
+                free_slots[worker_id], full_slots[worker_id], stop,
+            ),
+            daemon=True,
+        )
+        for worker_id in range(num_actors)
+    ]
+    for actor in actors:
+        actor.start()
+
+    steps_per_update = num_actors * num_envs * num_steps
+    try:
+        while timesteps < total_timesteps:
+            messages = [queue.get() for queue in full_slots]
+            _gather(batch, [slots[message[0]] for message in messages])
+            for queue, message in zip(free_slots, messages):
+                queue.put(message[0])
+
+            last_obs = np.concatenate([message[2] for message in messages])
+            agent.finish_rollout(batch, last_obs)
+            agent.update(batch, num_epochs, minibatch_size)
+
+            with lock:
+                weights.copy_(
+                    parameters_to_vector(agent.network.parameters())
+                )
+                version.value += 1
+
+            timesteps += steps_per_update
+            episode_rewards = [
+                reward for message in messages for reward in message[3]
+            ]
+            lags = [version.value - 1 - message[1] for message in messages]
+            record = {
+                "timesteps": timesteps,
+                "mean_episode_reward":
+                    float(np.mean(episode_rewards))
+                    if episode_rewards else float("nan"),
+                "policy_lag": float(np.mean(lags)),
+                "max_policy_lag": int(max(lags)),
+            }
+            history.append(record)
+            episodes += len(episode_rewards)
+            if checkpointer is not None and (
+                    checkpointer.due(len(history))
+                    or timesteps >= total_timesteps):
+                checkpointer.save(
+                    len(history),
+                    training_state(agent, len(history), history,
+                                   episodes=episodes),
+                )
+            if log is not None and episode_rewards:
+                log(
+                    f"PPO update {len(history):4d} | "
+                    f"timesteps {timesteps:8d} | "
+                    f"mean episode reward "
+                    f"{record['mean_episode_reward']:8.2f} | "
+                    f"policy lag {record['policy_lag']:.2f} "
+                    f"(max {record['max_policy_lag']})"
+                )
+    finally:
+        stop.set()
+        for queue in free_slots:
+            queue.put(None)
+        for actor in actors:
+            actor.join(timeout=10)
+            if actor.is_alive():
+                actor.terminate()
+
+    return history
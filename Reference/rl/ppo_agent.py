@@ -0,0 +1,260 @@
+"""
+Reference PPO implementation for priority-aware lab scheduling.
+
+IMPORTANT NOTE ON SCOPE AND DESIGN:
+
+This PPO agent is intentionally minimal and explicit.
+
+It reflects empirical observations from the full project:
+- Rewards are delayed (tardiness only observed on completion)
+- Learning is slow and unstable under low pressure
+- PPO only differentiates from heuristics under sustained congestion
+- Problem formulation matters more than model complexity
+
+Accordingly, this implementation:
+- Learns from plain PPO rollouts (no large batch magic)
+- Avoids entropy bonuses and aggressive tuning
+- Prioritizes transparency over performance
+
+``update`` consumes a preallocated RolloutStorage filled from many
+environments, with optional GAE (``gae_lambda < 1``) and several
+shuffled minibatch epochs per collection. With the default
+``gae_lambda=1.0`` the advantages are plain Monte-Carlo returns minus
+values.
+
+This is a reference implementation, not a production trainer.
+"""
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+from torch.distributions import Categorical
+
+from .networks import MLPPolicyValueNetwork
+from .rollout_buffer import RolloutStorage
+
+
+class PPOAgent:
+    def __init__(
+        self,
+        obs_dim: int,
+        action_dim: int,
+        learning_rate: float = 3e-4,
+        gamma: float = 0.99,
+        clip_eps: float = 0.2,
+        seed: int = 0,
+        gae_lambda: float = 1.0,
+        hidden_dims=(64, 64),
+    ):
+        torch.manual_seed(seed)
+
+        self.gamma = gamma
+        self.gae_lambda = gae_lambda
+        self.clip_eps = clip_eps
+        # Plain ints: gym spaces hand out NumPy scalars, which
+        # checkpoints loaded with weights_only=True cannot hold
+        self.obs_dim = int(obs_dim)
+        self.action_dim = int(action_dim)
+        self.hidden_dims = tuple(int(size) for size in hidden_dims)
+
+        self.network = MLPPolicyValueNetwork(self.obs_dim, self.hidden_dims)
+        self.optimizer = torch.optim.Adam(
+            self.network.parameters(), lr=learning_rate
+        )
+
+        # Reused input buffer for batched inference
+        self._obs_buffer = torch.empty((0, obs_dim), dtype=torch.float32)
+
+    # --------------------------------------------------
+    # Action selection
+    # --------------------------------------------------
+
+    def select_action(self, observation, action_mask=None):
+        """
+        Select an action given the current observation.
+
+        Actions outside ``action_mask`` (if given) get zero probability.
+
+        Returns:
+            action (int)
+            log_prob (Tensor)
+            value (Tensor)
+        """
+        obs_tensor = torch.tensor(
+            observation, dtype=torch.float32
+        ).unsqueeze(0)
+
+        policy_score, value = self.network(obs_tensor)
+
+        # Convert scalar score into categorical distribution
+        logits = policy_score.repeat(1, self.action_dim)
+        if action_mask is not None:
+            logits = self._mask_logits(
+                logits, torch.as_tensor(action_mask).unsqueeze(0)
+            )
+        probs = torch.softmax(logits, dim=1)
+
+        dist = Categorical(probs)
+        action = dist.sample()
+
+        return (
+            action.item(),
+            dist.log_prob(action),
+            value.squeeze(),
+        )
+
+    # --------------------------------------------------
+    # Batched inference
+    # --------------------------------------------------
+
+    @staticmethod
+    def _mask_logits(logits, action_masks):
+        return logits.masked_fill(~action_masks, float("-inf"))
+
+    def act_batch(self, observations, action_masks=None,
+                  deterministic=False):
+        """
+        Select actions for a batch of observations in one forward pass.
+
+        Observations are copied into a preallocated input buffer and
+        the network runs under ``torch.inference_mode``, so there is
+        no autograd bookkeeping and no per-step distribution object.
+
+        Args:
+            observations: array of shape (batch, obs_dim)
+            action_masks: optional bool array (batch, action_dim) of
+                valid actions; invalid ones are never sampled
+            deterministic: take the most likely action instead of sampling
+
+        Returns:
+            actions (np.int64[batch])
+            log_probs (np.float32[batch])
+            values (np.float32[batch])
+        """
+        observations = np.asarray(observations, dtype=np.float32)
+        batch = observations.shape[0]
+
+        if self._obs_buffer.shape[0] < batch:
+            self._obs_buffer = torch.empty(
+                (batch, self.obs_dim), dtype=torch.float32
+            )
+        obs_tensor = self._obs_buffer[:batch]
+        obs_tensor.copy_(torch.from_numpy(observations))
+
+        with torch.inference_mode():
+            policy_score, value = self.network(obs_tensor)
+            logits = policy_score.expand(-1, self.action_dim)
+            if action_masks is not None:
+                logits = self._mask_logits(
+                    logits, torch.as_tensor(action_masks)
+                )
+            log_probs = torch.log_softmax(logits, dim=1)
+
+            if deterministic:
+                actions = log_probs.argmax(dim=1)
+            else:
+                actions = torch.multinomial(log_probs.exp(), 1).squeeze(1)
+
+            chosen = log_probs.gather(1, actions.unsqueeze(1)).squeeze(1)
+
+        return actions.numpy(), chosen.numpy(), value.squeeze(1).numpy()
+
+    def export_torchscript(self, batch_size: int = 1):
+        """
+        Trace a greedy dispatcher for low-latency (shadow-mode) use.
+
+        The returned module maps a (batch, obs_dim) float tensor and a
+        (batch, action_dim) bool mask of valid actions to (actions,
+        values), never picking a masked action. It has no Python
+        dependency on this class.
+        """
+        dispatcher = _GreedyDispatcher(self.network, self.action_dim).eval()
+        example = (
+            torch.zeros((batch_size, self.obs_dim), dtype=torch.float32),
+            torch.ones((batch_size, self.action_dim), dtype=torch.bool),
+        )
+        with torch.no_grad():
+            traced = torch.jit.trace(dispatcher, example)
+        return torch.jit.freeze(traced)
+
+    # --------------------------------------------------
+    # PPO update (batched, multi-epoch)
+    # --------------------------------------------------
+
+    def finish_rollout(self, storage: RolloutStorage, last_observations):
+        """
+        Bootstrap from the observations after the last stored step and
+        fill in the storage's returns and advantages.
+        """
+        _, _, last_values = self.act_batch(last_observations)
+        storage.compute_returns_and_advantages(
+            last_values, self.gamma, self.gae_lambda
+        )
+
+    def update(self, storage: RolloutStorage, num_epochs: int = 4,
+               minibatch_size: int = 256, generator=None):
+        """
+        Run ``num_epochs`` passes of shuffled minibatch PPO updates
+        over a full RolloutStorage (after ``finish_rollout``).
+        """
+        for _ in range(num_epochs):
+            for batch in storage.minibatches(minibatch_size, generator):
+                (
+                    observations,
+                    actions,
+                    old_log_probs,
+                    returns,
+                    advantages,
+                    action_masks,
+                ) = batch
+                self._gradient_step(
+                    observations, actions, old_log_probs,
+                    returns, advantages, action_masks,
+                )
+
+    def _gradient_step(self, observations, actions, old_log_probs,
+                       returns, advantages, action_masks=None):
+        policy_scores, new_values = self.network(observations)
+        logits = policy_scores.repeat(1, self.action_dim)
+        if action_masks is not None:
+            logits = self._mask_logits(logits, action_masks)
+        probs = torch.softmax(logits, dim=1)
+
+        dist = Categorical(probs)
+        new_log_probs = dist.log_prob(actions)
+
+        ratio = torch.exp(new_log_probs - old_log_probs)
+
+        clipped_ratio = torch.clamp(
+            ratio, 1 - self.clip_eps, 1 + self.clip_eps
+        )
+
+        policy_loss = -torch.min(
+            ratio * advantages, clipped_ratio * advantages
+        ).mean()
+
+        value_loss = F.mse_loss(new_values.squeeze(-1), returns)
+
+        loss = policy_loss + 0.5 * value_loss
+
+        self.optimizer.zero_grad()
+        loss.backward()
+        self.optimizer.step()
+
+
+class _GreedyDispatcher(nn.Module):
+    """
+    Inference-only wrapper traced by ``PPOAgent.export_torchscript``.
+    """
+
+    def __init__(self, network: nn.Module, action_dim: int):
+        super().__init__()
+        self.network = network
+        self.action_dim = action_dim
+
+    def forward(self, x: torch.Tensor, action_mask: torch.Tensor):
+        policy_score, value = self.network(x)
+        logits = policy_score.expand(-1, self.action_dim)
+        logits = logits.masked_fill(~action_mask, float("-inf"))
+        return logits.argmax(dim=1), value.squeeze(1)
@@ -0,0 +1,204 @@
+import torch
+
+
+class RolloutStorage:
+    """
+    Fixed-capacity rollout storage for ``num_envs`` environments
+    stepped in lockstep for ``num_steps`` steps.
+
+    All fields are preallocated (num_steps, num_envs) tensors that are
+    filled in place, so a collection allocates nothing per step.
+    Returns and advantages are computed with one backwards sweep over
+    time that is vectorized across environments, and the flattened
+    batch is served as shuffled minibatches for multi-epoch PPO.
+
+    Columns may be filled unevenly. ``add`` stores one step of every
+    environment. ``add_decisions`` stores a step only for the
+    environments that had a real choice. ``add_rewards`` then credits
+    each tick's rewards to every environment's latest stored step.
+    A transition therefore spans all ticks up to the environment's next
+    decision, as with ``auto_advance`` in LabSchedulingEnv.
+    ``lengths`` counts the stored steps per environment.
+    Rewards earned before an environment's first decision in the
+    storage are dropped. Nothing completes before the first dispatch of
+    an episode, so collections that start at an episode start lose
+    nothing.
+    """
+
+    FIELDS = (
+        "observations",
+        "actions",
+        "log_probs",
+        "rewards",
+        "values",
+        "dones",
+        "returns",
+        "advantages",
+        "action_masks",
+        "lengths",
+    )
+
+    def __init__(self, num_steps: int, num_envs: int, obs_dim: int,
+                 action_dim=None):
+        self.num_steps = num_steps
+        self.num_envs = num_envs
+
+        shape = (num_steps, num_envs)
+        self.observations = torch.zeros(shape + (obs_dim,))
+        self.actions = torch.zeros(shape, dtype=torch.int64)
+        self.log_probs = torch.zeros(shape)
+        self.rewards = torch.zeros(shape)
+        self.values = torch.zeros(shape)
+        self.dones = torch.zeros(shape)
+        self.returns = torch.zeros(shape)
+        self.advantages = torch.zeros(shape)
+
+        # Valid-action masks, only kept when action_dim is given
+        self.action_masks = None
+        if action_dim is not None:
+            self.action_masks = torch.ones(
+                shape + (action_dim,), dtype=torch.bool
+            )
+
+        # Stored steps per environment, and ticks seen by the storage
+        self.lengths = torch.zeros(num_envs, dtype=torch.int64)
+        self.step = 0
+        self._columns = torch.arange(num_envs)
+
+    def add(self, obs, actions, rewards, log_probs, values, dones,
+            action_masks=None):
+        """
+        Store one step of every environment (NumPy arrays or tensors).
+        ``dones`` flags environments whose episode ended on this step.
+        """
+        t = self.step
+        self.observations[t].copy_(torch.as_tensor(obs))
+        self.actions[t].copy_(torch.as_tensor(actions))
+        self.rewards[t].copy_(torch.as_tensor(rewards))
+        self.log_probs[t].copy_(torch.as_tensor(log_probs))
+        self.values[t].copy_(torch.as_tensor(values))
+        self.dones[t].copy_(torch.as_tensor(dones))
+        if self.action_masks is not None and action_masks is not None:
+            self.action_masks[t].copy_(torch.as_tensor(action_masks))
+        self.step += 1
+        self.lengths.fill_(self.step)
+
+    def add_decisions(self, rows, obs, actions, log_probs, values,
+                      action_masks=None):
+        """
+        Store a new step for the environments ``rows`` only, with zero
+        reward so far; ``add_rewards`` accumulates into it.
+        """
+        rows = torch.as_tensor(rows, dtype=torch.int64)
+        t = self.lengths[rows]
+        fields = [
+            (self.observations, obs),
+            (self.actions, actions),
+            (self.log_probs, log_probs),
+            (self.values, values),
+        ]
+        if self.action_masks is not None and action_masks is not None:
+            fields.append((self.action_masks, action_masks))
+        for field, data in fields:
+            field[t, rows] = torch.as_tensor(data, dtype=field.dtype)
+        self.rewards[t, rows] = 0.0
+        self.dones[t, rows] = 0.0
+        self.lengths[rows] += 1
+
+    def add_rewards(self, rewards, dones):
+        """
+        Credit one tick of ``rewards`` (and episode ends) of every
+        environment to its latest stored step.
+        """
+        started = self.lengths > 0
+        t = self.lengths[started] - 1
+        columns = self._columns[started]
+        self.rewards[t, columns] += torch.as_tensor(
+            rewards, dtype=torch.float32
+        )[started]
+        ended = torch.as_tensor(dones, dtype=torch.bool)[started]
+        self.dones[t[ended], columns[ended]] = 1.0
+        self.step += 1
+
+    @property
+    def full(self):
+        return self.step == self.num_steps
+
+    def compute_returns_and_advantages(self, last_values, gamma: float,
+                                       gae_lambda: float = 1.0):
+        """
+        Generalized Advantage Estimation over the stored steps.
+
+        ``gae_lambda=1.0`` reduces to discounted Monte-Carlo returns
+        (bootstrapped from ``last_values`` for unfinished episodes).
+        """
+        next_values = torch.as_tensor(last_values, dtype=torch.float32)
+        gae = torch.zeros(self.num_envs)
+        lengths = self.lengths
+        uneven = bool((lengths != lengths[0]).any())
+
+        for t in range(int(lengths.max()) - 1, -1, -1):
+            not_done = 1.0 - self.dones[t]
+            delta = (
+                self.rewards[t]
+                + gamma * next_values * not_done
+                - self.values[t]
+            )
+            step_gae = delta + gamma * gae_lambda * not_done * gae
+            if uneven:
+                # Columns shorter than t + 1 carry their tail values
+                stored = t < lengths
+                step_gae = torch.where(stored, step_gae, gae)
+                next_values = torch.where(
+                    stored, self.values[t], next_values
+                )
+            else:
+                next_values = self.values[t]
+            gae = step_gae
+            self.advantages[t] = gae
+
+        torch.add(self.advantages, self.values, out=self.returns)
+
+    def minibatches(self, minibatch_size: int, generator=None):
+        """
+        Yield shuffled minibatches over all stored (step, env) pairs:
+        (observations, actions, log_probs, returns, advantages,
+        action_masks or None).
+        """
+        stored = (
+            torch.arange(self.num_steps).unsqueeze(1) < self.lengths
+        )
+        n = int(self.lengths.sum())
+        fields = (
+            self.observations[stored],
+            self.actions[stored],
+            self.log_probs[stored],
+            self.returns[stored],
+            self.advantages[stored],
+        )
+
+        masks = None
+        if self.action_masks is not None:
+            masks = self.action_masks[stored]
+
+        order = torch.randperm(n, generator=generator)
+        for start in range(0, n, minibatch_size):
+            idx = order[start:start + minibatch_size]
+            yield tuple(field[idx] for field in fields) + (
+                masks[idx] if masks is not None else None,
+            )
+
+    def clear(self):
+        self.step = 0
+        self.lengths.zero_()
+
+    def share_memory_(self):
+        """
+        Move every buffer to shared memory, so a RolloutStorage can be
+        filled by another process (see rl.actor_learner).
+        """
+        for field in self.FIELDS:
+            tensor = getattr(self, field)
+            if tensor is not None:
+                tensor.share_memory_()
+        return self
@@ -0,0 +1,152 @@
+"""
+Synchronous PPO training loop.
+
+Every update collects one episode in each of ``num_envs`` lockstep
+labs (VectorLabSchedulingEnv) into a preallocated RolloutStorage,
+then runs several shuffled minibatch epochs over it. See
+actor_learner.py for the asynchronous variant.
+"""
+
+import numpy as np
+
+from env.vector_env import VectorLabSchedulingEnv
+from evaluation.profiling import Profiler
+
+from .checkpoint import restore_training, training_state
+from .rollout_buffer import RolloutStorage
+
+
+# --------------------------------------------------
+# Rollouts
+# --------------------------------------------------
+
+def collect_rollout(vec_env, agent, storage, obs):
+    """
+    Fill ``storage`` with ``storage.num_steps`` lockstep ticks of every
+    lab in ``vec_env``, resetting the batch whenever its episodes end.
+
+    Only labs with a real choice (an idle machine and a queued job)
+    go through the network and get a new stored step. The others take
+    the no-op inside the same batched ``vec_env.step``, and their
+    rewards accrue to their last decision, as with ``auto_advance``
+    in LabSchedulingEnv. Ticks where no lab can act cost one
+    environment step and no forward pass.
+
+    Returns the observations to continue from and the total rewards
+    of the episodes that finished during the collection.
+    """
+    storage.clear()
+    episode_rewards = []
+    running = np.zeros(vec_env.num_envs)
+    masks = vec_env.action_mask()
+    actions = np.empty(vec_env.num_envs, dtype=np.int64)
+
+    while not storage.full:
+        actions.fill(vec_env.noop_action)
+        rows = np.flatnonzero(masks[:, :-1].any(axis=1))
+        if rows.size:
+            row_obs, row_masks = obs[rows], masks[rows]
+            row_actions, log_probs, values = agent.act_batch(
+                row_obs, row_masks
+            )
+            actions[rows] = row_actions
+            storage.add_decisions(
+                rows, row_obs, row_actions, log_probs, values, row_masks
+            )
+
+        next_obs, rewards, terminated, _, info = vec_env.step(actions)
+        storage.add_rewards(rewards, terminated)
+
+        running += rewards
+        if terminated.all():
+            episode_rewards.extend(running.tolist())
+            running[:] = 0.0
+            next_obs, info = vec_env.reset()
+
+        obs, masks = next_obs, info["action_mask"]
+
+    return obs, episode_rewards
+
+
+# --------------------------------------------------
+# Training loop
+# --------------------------------------------------
+
+def train_synchronous(agent, env_cfg, exp_cfg, rl_cfg, log=print,
+                      checkpointer=None, resume=False):
+    """
+    Collect one episode per lab, then run several shuffled minibatch
+    epochs over the whole batch; repeat until ``total_timesteps``
+    environment steps have been simulated.
+
+    With a ``checkpointer`` (rl.checkpoint) the full training state is
+    saved every ``checkpointer.every`` updates; ``resume`` continues
+    from its newest checkpoint, reproducing the uninterrupted run
+    exactly.
+
+    Returns a list of per-update dicts (timesteps, mean episode
+    reward), like ``train_actor_learner``.
+    """
+    num_envs = rl_cfg.num_envs
+    vec_env = VectorLabSchedulingEnv(env_cfg, num_envs)
+    storage = RolloutStorage(
+        vec_env.max_time, num_envs, agent.obs_dim, agent.action_dim
+    )
+    num_updates = max(
+        1, rl_cfg.total_timesteps // (vec_env.max_time * num_envs)
+    )
+
+    # Optional phase timings for the training loop
+    profiler = None
+    if exp_cfg.profile:
+        profiler = Profiler(exp_cfg.profile_trace)
+        profiler.instrument_env(vec_env)
+        profiler.instrument_agent(agent)
+        profiler.instrument_buffer(storage)
+
+    history = []
+    episodes, start = 0, 0
+    obs, _ = vec_env.reset(seed=exp_cfg.seed)
+    state = checkpointer.load() if resume and checkpointer else None
+    if state is not None:
+        obs = restore_training(agent, state, vec_env)
+        history, episodes, start = \
+            state["history"], state["episodes"], state["update"]
+        if log is not None:
+            log(f"Resumed after update {start}")
+
+    for update in range(start + 1, num_updates + 1):
+        obs, ep_rewards = collect_rollout(vec_env, agent, storage, obs)
+        agent.finish_rollout(storage, obs)
+        agent.update(
+            storage,
+            num_epochs=rl_cfg.num_epochs,
+            minibatch_size=rl_cfg.minibatch_size,
+        )
+
+        episodes += len(ep_rewards)
+        history.append({
+            "timesteps": update * vec_env.max_time * num_envs,
+            "mean_episode_reward":
+                float(np.mean(ep_rewards)) if ep_rewards else float("nan"),
+        })
+        if checkpointer is not None and (
+                checkpointer.due(update) or update == num_updates):
+            checkpointer.save(
+                update,
+                training_state(agent, update, history, vec_env, obs,
+                               episodes),
+            )
+
+        # Lightweight progress logging
+        if log is not None and ep_rewards:
+            log(
+                f"PPO update {update:4d} | "
+                f"mean episode reward {np.mean(ep_rewards):8.2f}"
+            )
+
+    if profiler is not None:
+        profiler.print_summary()
+        profiler.detach()
+        profiler.close()
+    return history
@@ -0,0 +1,355 @@
+"""
+Hyperparameter search with asynchronous successive halving (ASHA).
+
+PPO on this problem is very sensitive to its configuration (see
+failures.md), so a grid over learning rate, discount, clip range and
+network size is worth covering, but training every point to the full
+budget is not. ASHA trains trials in rungs of geometrically growing
+timestep budgets:
+
+    rung k budget = min_timesteps * eta**k   (last rung: total_timesteps)
+
+rounded down to whole PPO updates of ``episode_length * num_envs``
+timesteps.
+
+After each rung a trial is scored by its mean evaluation reward on a
+fixed set of validation episodes, the same for every trial. Whenever a
+worker is free it promotes the best not-yet-promoted trial that is in
+the top 1/eta of its rung, and otherwise starts the next grid point.
+Weak trials are never promoted, so they stop after a fraction of the
+budget, and no worker waits for a rung to fill up. Once the grid is
+exhausted the leaders of sparse rungs are promoted as well, so the
+best trial always reaches the full budget.
+
+Trials run in a local process pool. A promoted trial continues from
+its saved network and optimizer state, so rung budgets add up rather
+than restart. Everything lands under ``out_dir``:
+
+    trials/<trial>.json   parameters, rung scores and learning curve
+    state/<trial>.pt      network and optimizer state after the last rung
+
+Validation episodes use seeds derived from ``experiment.seed`` but
+distinct from the evaluation episodes of run.py, so the final
+comparison is not made on the episodes used for selection.
+"""
+
+import dataclasses
+import itertools
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+
+# RLConfig fields a search space may vary
+SEARCH_KEYS = (
+    "learning_rate",
+    "gamma",
+    "clip_range",
+    "gae_lambda",
+    "hidden_layers",
+    "num_epochs",
+    "minibatch_size",
+)
+
+# Second SeedSequence word of the validation episodes
+_VALIDATION_STREAM = 1
+
+
+# --------------------------------------------------
+# Search space
+# --------------------------------------------------
+
+def expand_search(rl_cfg, space: dict):
+    """
+    Every combination of the ``space`` values applied to ``rl_cfg``,
+    as a list of (trial name, parameters, RLConfig) in grid order.
+    """
+    unknown = sorted(set(space) - set(SEARCH_KEYS))
+    if unknown:
+        raise ValueError(
+            f"unknown search keys: {', '.join(unknown)} "
+            f"(expected one of {', '.join(SEARCH_KEYS)})"
+        )
+
+    keys = list(space)
+    trials = []
+    for index, values in enumerate(
+        itertools.product(*(space[key] for key in keys))
+    ):
+        params = dict(zip(keys, values))
+        if "hidden_layers" in params:
+            params["hidden_layers"] = tuple(params["hidden_layers"])
+        trials.append(
+            (f"trial_{index:03d}", params,
+             dataclasses.replace(rl_cfg, **params))
+        )
+    return trials
+
+
+def rung_budgets(min_timesteps, max_timesteps, eta=3, step=1):
+    """
+    Cumulative timestep budget of each rung, in whole multiples of
+    ``step`` (the timesteps of one PPO update; the trainer cannot
+    stop in between). Rungs that round to the same budget collapse
+    into one.
+    """
+    def whole(budget):
+        return max(1, int(budget) // step) * step
+
+    last = whole(max_timesteps)
+    budgets = []
+    budget = min_timesteps
+    while budget < max_timesteps:
+        rounded = whole(budget)
+        if rounded >= last:
+            break
+        if not budgets or rounded > budgets[-1]:
+            budgets.append(rounded)
+        budget *= eta
+    budgets.append(last)
+    return budgets
+
+
+# --------------------------------------------------
+# Promotion rule
+# --------------------------------------------------
+
+class ASHAScheduler:
+    """
+    Bookkeeping of rung results and promotions (Li et al., 2020).
+    """
+
+    def __init__(self, num_rungs: int, eta: int = 3):
+        self.eta = eta
+        self.scores = [{} for _ in range(num_rungs)]
+        self.promoted = [set() for _ in range(num_rungs)]
+
+    def record(self, trial, rung, score):
+        # Diverged trials rank last
+        self.scores[rung][trial] = score if np.isfinite(score) else -np.inf
+
+    def next_promotion(self, drain=False):
+        """
+        (trial, next rung) for the best promotable trial of the
+        highest rung that has one, or None.
+
+        With ``drain`` (grid exhausted, no trial running) the leader
+        of a rung is promotable even if the rung holds fewer than
+        eta trials, so the search always ends on the last rung.
+        """
+        for rung in range(len(self.scores) - 2, -1, -1):
+            scores = self.scores[rung]
+            ranked = sorted(scores, key=scores.get, reverse=True)
+            quota = len(ranked) // self.eta
+            if drain and ranked:
+                quota = max(quota, 1)
+            for trial in ranked[:quota]:
+                if trial not in self.promoted[rung]:
+                    self.promoted[rung].add(trial)
+                    return trial, rung + 1
+        return None
+
+    def leaderboard(self):
+        """
+        (trial, highest rung, score there), best first.
+        """
+        best = {}
+        for rung, scores in enumerate(self.scores):
+            for trial, score in scores.items():
+                best[trial] = (rung, score)
+        return sorted(
+            ((trial, rung, score) for trial, (rung, score) in best.items()),
+            key=lambda row: (row[1], row[2]),
+            reverse=True,
+        )
+
+
+# --------------------------------------------------
+# Trial worker
+# --------------------------------------------------
+
+def _write_atomic(path, write):
+    tmp = os.path.join(
+        os.path.dirname(path), f".{os.path.basename(path)}.{os.getpid()}"
+    )
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _run_rung(job):
+    """
+    Train one trial from its previous rung budget up to ``target``
+    timesteps, save its state and score it on the validation
+    episodes.
+    """
+    import torch
+
+    from env.lab_env import LabSchedulingEnv
+    from evaluation.parallel import AgentPolicy, evaluate_parallel
+
+    from .ppo_agent import PPOAgent
+    from .trainer import train_synchronous
+
+    (name, cfg, rl_cfg, rung, start, target, out_dir,
+     eval_episodes) = job
+    torch.set_num_threads(1)
+    seed = cfg.experiment.seed
+    env = LabSchedulingEnv(cfg.environment)
+
+    # Every trial starts from the same initial seed, so trials differ
+    # only in their hyperparameters
+    agent = PPOAgent(
+        obs_dim=env.observation_space.shape[0],
+        action_dim=env.action_space.n,
+        learning_rate=rl_cfg.learning_rate,
+        gamma=rl_cfg.gamma,
+        clip_eps=rl_cfg.clip_range,
+        seed=seed,
+        gae_lambda=rl_cfg.gae_lambda,
+        hidden_dims=rl_cfg.hidden_layers,
+    )
+    state_path = os.path.join(out_dir, "state", f"{name}.pt")
+    if rung > 0:
+        state = torch.load(state_path)
+        agent.network.load_state_dict(state["network"])
+        agent.optimizer.load_state_dict(state["optimizer"])
+
+    # Fresh environment seeds for each rung of a trial
+    segment_seed = int(
+        np.random.SeedSequence([seed, rung]).generate_state(1)[0]
+    )
+    history = train_synchronous(
+        agent,
+        cfg.environment,
+        dataclasses.replace(cfg.experiment, seed=segment_seed, profile=False),
+        dataclasses.replace(rl_cfg, total_timesteps=target - start),
+        log=None,
+    )
+    for record in history:
+        record["timesteps"] += start
+
+    _write_atomic(
+        state_path,
+        lambda path: torch.save(
+            {"network": agent.network.state_dict(),
+             "optimizer": agent.optimizer.state_dict()},
+            path,
+        ),
+    )
+
+    results = evaluate_parallel(
+        {"PPO": AgentPolicy(agent)},
+        {"validation": cfg.environment},
+        eval_episodes,
+        base_seed=[seed, _VALIDATION_STREAM],
+        num_workers=1,
+    )
+    score = float(np.mean([r.reward for r in results]))
+    return name, rung, score, history
+
+
+# --------------------------------------------------
+# Driver
+# --------------------------------------------------
+
+def run_asha(cfg, space: dict, out_dir, min_timesteps=None, eta=3,
+             eval_episodes=8, num_workers=None, log=print):
+    """
+    Search ``space`` (see ``expand_search``) around ``cfg.rl`` with
+    ASHA, up to ``cfg.rl.total_timesteps`` per trial.
+
+    Returns the leaderboard: a list of dicts (trial, params, rung,
+    timesteps, eval_reward), best first.
+    """
+    trials = expand_search(cfg.rl, space)
+    max_timesteps = cfg.rl.total_timesteps
+    if min_timesteps is None:
+        # Rounded up, so rung 3 is the full budget rather than a
+        # few timesteps short of it
+        min_timesteps = max(1, -(-max_timesteps // eta ** 3))
+    budgets = rung_budgets(
+        min_timesteps, max_timesteps, eta,
+        step=cfg.environment.episode_length * cfg.rl.num_envs,
+    )
+    scheduler = ASHAScheduler(len(budgets), eta)
+
+    os.makedirs(os.path.join(out_dir, "trials"), exist_ok=True)
+    os.makedirs(os.path.join(out_dir, "state"), exist_ok=True)
+    by_name = {name: (params, rl_cfg) for name, params, rl_cfg in trials}
+    curves = {
+        name: {"trial": name, "params": params, "rungs": [], "history": []}
+        for name, params, _ in trials
+    }
+    pending = [name for name, _, _ in trials]
+    pending.reverse()
+    # Timesteps each trial has actually trained for
+    trained = {}
+
+    def next_job(idle):
+        promotion = scheduler.next_promotion(drain=idle and not pending)
+        if promotion is not None:
+            name, rung = promotion
+        elif pending:
+            name, rung = pending.pop(), 0
+        else:
+            return None
+        start = budgets[rung - 1] if rung > 0 else 0
+        return (name, cfg, by_name[name][1], rung, start, budgets[rung],
+                out_dir, eval_episodes)
+
+    if num_workers is None:
+        num_workers = os.cpu_count() or 1
+    num_workers = max(1, min(num_workers, len(trials)))
+
+    with ProcessPoolExecutor(max_workers=num_workers) as pool:
+        running = set()
+        while True:
+            while len(running) < num_workers:
+                job = next_job(idle=not running)
+                if job is None:
+                    break
+                running.add(pool.submit(_run_rung, job))
+            if not running:
+                break
+
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, rung, score, history = future.result()
+                scheduler.record(name, rung, score)
+                trained[name] = history[-1]["timesteps"]
+
+                curve = curves[name]
+                curve["rungs"].append({
+                    "rung": rung,
+                    "timesteps": trained[name],
+                    "eval_reward": score,
+                })
+                curve["history"].extend(history)
+                _write_atomic(
+                    os.path.join(out_dir, "trials", f"{name}.json"),
+                    lambda path: _dump_json(curve, path),
+                )
+                if log is not None:
+                    log(
+                        f"{name} | rung {rung} | "
+                        f"timesteps {trained[name]:8d} | "
+                        f"eval reward {score:10.2f}"
+                    )
+
+    return [
+        {
+            "trial": name,
+            "params": by_name[name][0],
+            "rung": rung,
+            "timesteps": trained[name],
+            "eval_reward": score,
+        }
+        for name, rung, score in scheduler.leaderboard()
+    ]
+
+
+def _dump_json(data, path):
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
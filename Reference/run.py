@@ -2,148 +2,255 @@
 Entry point for the reference experiment.
 
 This script runs:
-1. Heuristic baselines (FIFO, STAT-first)
+1. Heuristic baselines (FIFO, STAT-first, EDD, SPT, slack, ATC,
+   rollout lookahead)
 2. PPO agent training and evaluation
 
 The goal is not peak performance, but to reproduce
 the qualitative behavior discussed in the project:
 - Baselines perform similarly under pressure
 - PPO differentiates only under sustained congestion
-"""
 
-import yaml
-import numpy as np
+The building blocks are also used by cli.py. PyTorch is imported
+only by the functions that train or run the agent.
+"""
 
+from config import load_config
 from env.lab_env import LabSchedulingEnv
+from evaluation.parallel import (
+    AgentPolicy,
+    evaluate_parallel,
+    summarize,
+    summarize_metrics,
+)
+from evaluation.results_store import ResultsStore
+from evaluation.sequential import ranking, sequential_compare
 from policies.fifo import FIFOPolicy
+from policies.priority_index import (
+    ATCPolicy,
+    EDDPolicy,
+    SPTPolicy,
+    WeightedSlackPolicy,
+)
+from policies.lookahead import LookaheadPolicy
 from policies.stat_first import StatFirstPolicy
 from policies.random_policy import RandomPolicy
-from rl.ppo_agent import PPOAgent
-from rl.rollout_buffer import RolloutBuffer
 
 
 # --------------------------------------------------
-# Utility: run one episode
+# Reporting
 # --------------------------------------------------
 
-def run_episode(env, policy, train=False, agent=None):
-    obs, _ = env.reset()
-    done = False
-    total_reward = 0.0
-
-    buffer = RolloutBuffer() if train else None
+def print_sla_table(results):
+    """
+    Per-class SLA compliance and tail turnaround/tardiness.
+    """
+    print(
+        f"\n{'scenario':12s} | {'policy':12s} | {'class':7s} | "
+        f"{'SLA':>6s} | {'TAT p95':>8s} | {'TAT p99':>8s} | {'tard p99':>8s}"
+    )
+    for (scenario, name), metrics in summarize_metrics(results).items():
+        for cls, row in metrics.summary().items():
+            print(
+                f"{scenario:12s} | {name:12s} | {cls:7s} | "
+                f"{row['sla_compliance']:6.1%} | "
+                f"{row['turnaround_p95']:8.1f} | "
+                f"{row['turnaround_p99']:8.1f} | "
+                f"{row['tardiness_p99']:8.1f}"
+            )
 
-    while not done:
-        if agent is not None:
-            action, log_prob, value = agent.select_action(obs)
-        else:
-            action = policy.select_action(env)
-            log_prob, value = None, None
 
-        next_obs, reward, done, _, _ = env.step(action)
-        total_reward += reward
+# --------------------------------------------------
+# Experiment steps
+# --------------------------------------------------
 
-        if train:
-            buffer.add(obs, action, reward, log_prob, value)
+def make_baselines(seed):
+    return {
+        "FIFO": FIFOPolicy(),
+        "STAT-first": StatFirstPolicy(),
+        "Random": RandomPolicy(seed=seed),
+        "EDD": EDDPolicy(),
+        "SPT": SPTPolicy(),
+        "W-slack": WeightedSlackPolicy(),
+        "ATC": ATCPolicy(),
+        "Lookahead": LookaheadPolicy(seed=seed),
+    }
 
-        obs = next_obs
 
-    return total_reward, buffer
+def make_store(cfg):
+    """
+    Results store of the experiment, or None when caching is off.
+    Episodes already simulated for a (config, policy, seed) are read
+    back instead of re-run.
+    """
+    if cfg.experiment.results_dir is None:
+        return None
+    return ResultsStore(cfg.experiment.results_dir)
 
 
-# --------------------------------------------------
-# Evaluation loop
-# --------------------------------------------------
+def print_rewards(results):
+    for (scenario, name), (mean_r, std_r) in summarize(results).items():
+        print(
+            f"{scenario:12s} | {name:12s} | "
+            f"mean reward: {mean_r:8.2f} ± {std_r:6.2f}"
+        )
 
-def evaluate_policy(env, policy, num_episodes):
-    rewards = []
-    for _ in range(num_episodes):
-        ep_reward, _ = run_episode(env, policy)
-        rewards.append(ep_reward)
-    return np.mean(rewards), np.std(rewards)
 
+def print_regret(cfg, scenarios, results, num_episodes=None,
+                 num_workers=None):
+    """
+    Per-episode regret against the hindsight oracle, in weighted
+    tardiness accrued by the end of the episode.
+    """
+    from evaluation.oracle import hindsight_bounds, regret_summary
 
-# --------------------------------------------------
-# Main
-# --------------------------------------------------
+    bounds = hindsight_bounds(
+        scenarios,
+        num_episodes or cfg.experiment.num_episodes_eval,
+        base_seed=cfg.experiment.seed,
+        num_workers=num_workers,
+    )
+    print(
+        f"\n{'scenario':12s} | {'policy':12s} | {'regret':>9s} | "
+        f"{'vs best':>9s} | {'oracle gap':>10s}"
+    )
+    for (scenario, name), row in regret_summary(results, bounds).items():
+        print(
+            f"{scenario:12s} | {name:12s} | {row['regret_vs_bound']:9.1f} | "
+            f"{row['regret_vs_best']:9.1f} | {row['gap']:10.1f}"
+        )
 
-def main():
-    # Load configuration
-    with open("configs/base.yaml", "r") as f:
-        cfg = yaml.safe_load(f)
-
-    env_cfg = cfg["environment"]
-    exp_cfg = cfg["experiment"]
-    rl_cfg = cfg["rl_agent"]
-    eval_cfg = cfg["evaluation"]
-
-    # --------------------------------------------------
-    # Environment
-    # --------------------------------------------------
-    env = LabSchedulingEnv(env_cfg)
 
-    print("\n=== Reference Experiment ===")
-    print(f"Machines: {env_cfg['num_machines']}")
-    print("High-load, tight-deadline regime\n")
+def evaluate_baselines(cfg, scenarios, policies, store=None,
+                       num_episodes=None, num_workers=None):
+    exp_cfg = cfg.experiment
+    results = evaluate_parallel(
+        policies,
+        scenarios,
+        num_episodes or exp_cfg.num_episodes_eval,
+        base_seed=exp_cfg.seed,
+        num_workers=num_workers,
+        store=store,
+    )
+    print_rewards(results)
+    print_sla_table(results)
+
+    if cfg.evaluation.sequential:
+        race = sequential_compare(
+            policies,
+            cfg.environment,
+            base_seed=exp_cfg.seed,
+            max_episodes=cfg.evaluation.max_episodes,
+            alpha=cfg.evaluation.alpha,
+        )
+        print(
+            f"\nSequential ranking: {' > '.join(ranking(race))} "
+            f"({race['episodes_run']} episodes)"
+        )
+    return results
 
-    # --------------------------------------------------
-    # Baseline policies
-    # --------------------------------------------------
-    baselines = {
-        "FIFO": FIFOPolicy(),
-        "STAT-first": StatFirstPolicy(),
-        "Random": RandomPolicy(seed=exp_cfg["seed"]),
-    }
 
-    print("Evaluating baselines...")
-    for name, policy in baselines.items():
-        mean_r, std_r = evaluate_policy(
-            env, policy, exp_cfg["num_episodes_eval"]
-        )
-        print(f"{name:12s} | mean reward: {mean_r:8.2f} ± {std_r:6.2f}")
+def train_agent(cfg, resume=False):
+    """
+    Build a PPOAgent from the config and train it, with actor
+    processes when ``rl_agent.training.num_actors > 0``.
 
-    # --------------------------------------------------
-    # PPO Agent
-    # --------------------------------------------------
-    print("\nTraining PPO agent...")
-    obs_dim = env.observation_space.shape[0]
-    action_dim = env.action_space.n
+    Checkpoints go to ``rl_agent.training.checkpoint_dir`` when set;
+    ``resume`` continues from the newest one there.
+    """
+    from rl.actor_learner import train_actor_learner
+    from rl.checkpoint import Checkpointer
+    from rl.ppo_agent import PPOAgent
+    from rl.trainer import train_synchronous
 
+    env_cfg, exp_cfg, rl_cfg = cfg.environment, cfg.experiment, cfg.rl
+    env = LabSchedulingEnv(env_cfg)
     agent = PPOAgent(
-        obs_dim=obs_dim,
-        action_dim=action_dim,
-        learning_rate=rl_cfg["training"]["learning_rate"],
-        gamma=rl_cfg["training"]["gamma"],
-        clip_eps=rl_cfg["training"]["clip_range"],
-        seed=exp_cfg["seed"],
+        obs_dim=env.observation_space.shape[0],
+        action_dim=env.action_space.n,
+        learning_rate=rl_cfg.learning_rate,
+        gamma=rl_cfg.gamma,
+        clip_eps=rl_cfg.clip_range,
+        seed=exp_cfg.seed,
+        gae_lambda=rl_cfg.gae_lambda,
+        hidden_dims=rl_cfg.hidden_layers,
     )
 
-    # Training loop (episode-based)
-    for episode in range(1, rl_cfg["training"]["total_timesteps"] + 1):
-        ep_reward, buffer = run_episode(
-            env, policy=None, train=True, agent=agent
+    checkpointer = None
+    if rl_cfg.checkpoint_dir is not None:
+        checkpointer = Checkpointer(
+            rl_cfg.checkpoint_dir, every=rl_cfg.checkpoint_every
         )
-        agent.update_from_episode(buffer)
+    elif resume:
+        raise ValueError("resume needs rl_agent.training.checkpoint_dir")
+
+    try:
+        if rl_cfg.num_actors > 0:
+            # Actor processes simulate while this process learns
+            train_actor_learner(
+                agent,
+                env_cfg,
+                rl_cfg.total_timesteps,
+                num_actors=rl_cfg.num_actors,
+                num_envs=rl_cfg.num_envs,
+                num_epochs=rl_cfg.num_epochs,
+                minibatch_size=rl_cfg.minibatch_size,
+                seed=exp_cfg.seed,
+                checkpointer=checkpointer,
+                resume=resume,
+            )
+        else:
+            train_synchronous(
+                agent, env_cfg, exp_cfg, rl_cfg,
+                checkpointer=checkpointer, resume=resume,
+            )
+    finally:
+        if checkpointer is not None:
+            checkpointer.close()
+    return agent
+
+
+def evaluate_agent(cfg, agent, scenarios, num_workers=None):
+    results = evaluate_parallel(
+        {"PPO": AgentPolicy(agent)},
+        scenarios,
+        cfg.experiment.num_episodes_eval,
+        base_seed=cfg.experiment.seed,
+        num_workers=num_workers,
+    )
+    print_rewards(results)
+    print_sla_table(results)
+    return results
 
-        # Lightweight progress logging
-        if episode % 50 == 0:
-            print(f"PPO episode {episode:4d} | reward {ep_reward:8.2f}")
 
-    # --------------------------------------------------
-    # PPO Evaluation
-    # --------------------------------------------------
-    print("\nEvaluating PPO agent...")
-    ppo_rewards = []
+# --------------------------------------------------
+# Main
+# --------------------------------------------------
 
-    for _ in range(exp_cfg["num_episodes_eval"]):
-        ep_reward, _ = run_episode(env, policy=None, agent=agent)
-        ppo_rewards.append(ep_reward)
+def main():
+    # Load and compile configuration
+    cfg = load_config("configs/base.yaml")
+    env_cfg = cfg.environment
+    scenarios = cfg.scenarios()
 
-    print(
-        f"PPO         | mean reward: {np.mean(ppo_rewards):8.2f} "
-        f"± {np.std(ppo_rewards):6.2f}"
+    print("\n=== Reference Experiment ===")
+    print(f"Machines: {env_cfg.num_machines}")
+    print(f"Offered load: {env_cfg.load:.2f}")
+    if len(scenarios) > 1:
+        print(f"Grid scenarios: {len(scenarios) - 1}")
+    print("High-load, tight-deadline regime\n")
+
+    print("Evaluating baselines...")
+    evaluate_baselines(
+        cfg, scenarios, make_baselines(cfg.experiment.seed), make_store(cfg)
     )
 
+    print("\nTraining PPO agent...")
+    agent = train_agent(cfg)
+
+    print("\nEvaluating PPO agent...")
+    evaluate_agent(cfg, agent, scenarios)
+
     print("\nExperiment complete.")
 
 
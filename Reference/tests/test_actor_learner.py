@@ -0,0 +1,22 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from rl.actor_learner import train_actor_learner
+from test_checkpoint import _agent, setup  # noqa: F401
+
+
+def test_every_update_takes_one_rollout_per_actor(setup):
+    _, env_cfg, _ = setup
+    num_actors, num_envs = 2, 2
+    steps = num_actors * num_envs * env_cfg.episode_length
+    history = train_actor_learner(
+        _agent(env_cfg), env_cfg, 4 * steps, num_actors=num_actors,
+        num_envs=num_envs, num_epochs=1, minibatch_size=32, log=None,
+    )
+    assert [record["timesteps"] for record in history] == [
+        steps * update for update in range(1, 5)
+    ]
+    assert history[0]["max_policy_lag"] == 0
+    # Two slots per actor bound the lag
+    assert all(record["max_policy_lag"] <= 2 for record in history)
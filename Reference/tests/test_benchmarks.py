@@ -0,0 +1,57 @@
+from benchmarks.suite import (
+    CALIBRATION,
+    _metric,
+    compare,
+    shorter_than_baseline,
+)
+
+
+def _run(rates, calibration=(1.0,) * 5, latencies=None):
+    metrics = {
+        "env.steps_per_s": _metric(rates, "steps/s"),
+        CALIBRATION: _metric(calibration, "ops/s"),
+    }
+    if latencies is not None:
+        metrics["agent.latency_us"] = _metric(
+            latencies, "us", higher_is_better=False
+        )
+    return metrics
+
+
+BASELINE = {
+    "settings": {"min_time": 1.0, "rounds": 5},
+    "metrics": _run([100, 104, 98, 101, 99],
+                    latencies=[10, 11, 10, 9, 10]),
+}
+
+
+def test_a_consistently_slower_run_regresses():
+    regressions = compare(
+        _run([60, 62, 59, 61, 60], latencies=[20, 21, 19, 20, 20]),
+        BASELINE, {},
+    )
+    assert [name for name, *_ in regressions] == [
+        "agent.latency_us", "env.steps_per_s",
+    ]
+    assert all(change < -0.25 for *_, change in regressions)
+
+
+def test_slow_rounds_are_noise():
+    # Two slow rounds do not move the median
+    assert compare(_run([40, 41, 100, 99, 102]), BASELINE, {}) == []
+    # Median slower, but the rounds overlap the baseline's
+    noisy = _run([30, 70, 72, 140, 150])
+    assert compare(noisy, BASELINE, {}) == []
+
+
+def test_machine_wide_slowdowns_cancel_out():
+    slow_machine = _run([60, 62, 59, 61, 60], calibration=[0.6] * 5)
+    assert compare(slow_machine, BASELINE, {}) == []
+
+
+def test_shorter_runs_are_refused():
+    assert shorter_than_baseline(BASELINE, 1.0, 5) is None
+    assert shorter_than_baseline(BASELINE, 2.0, 8) is None
+    assert "--min-time 1.0" in shorter_than_baseline(BASELINE, 0.2, 5)
+    assert shorter_than_baseline(BASELINE, 1.0, 3) is not None
+    assert shorter_than_baseline({"metrics": {}}, 0.2, 5) is None
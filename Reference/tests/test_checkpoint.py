@@ -0,0 +1,115 @@
+import dataclasses
+
+import numpy as np
+import pytest
+
+torch = pytest.importorskip("torch")
+
+from config import load_config
+from env.lab_env import LabSchedulingEnv
+from rl.checkpoint import Checkpointer, load_policy
+from rl.ppo_agent import PPOAgent
+from rl.trainer import train_synchronous
+
+
+EPISODE_LENGTH = 40
+NUM_ENVS = 3
+
+
+@pytest.fixture
+def setup():
+    cfg = load_config(
+        __file__.rsplit("/tests/", 1)[0] + "/configs/base.yaml"
+    )
+    env_cfg = cfg.environment.replace(episode_length=EPISODE_LENGTH)
+    rl_cfg = dataclasses.replace(
+        cfg.rl, num_envs=NUM_ENVS, minibatch_size=32, num_epochs=2
+    )
+    return cfg.experiment, env_cfg, rl_cfg
+
+
+def _agent(env_cfg, seed=1):
+    # Dimensions straight from the gym spaces, as train_agent does
+    env = LabSchedulingEnv(env_cfg)
+    return PPOAgent(
+        obs_dim=env.observation_space.shape[0],
+        action_dim=env.action_space.n,
+        seed=seed,
+        hidden_dims=(8,),
+    )
+
+
+def _train(agent, exp_cfg, env_cfg, rl_cfg, updates, **kwargs):
+    rl_cfg = dataclasses.replace(
+        rl_cfg, total_timesteps=updates * EPISODE_LENGTH * NUM_ENVS
+    )
+    return train_synchronous(agent, env_cfg, exp_cfg, rl_cfg, log=None,
+                             **kwargs)
+
+
+def test_resume_is_bit_identical(tmp_path, setup):
+    exp_cfg, env_cfg, rl_cfg = setup
+
+    full = _agent(env_cfg)
+    full_history = _train(full, exp_cfg, env_cfg, rl_cfg, 6)
+
+    with Checkpointer(tmp_path, every=3) as checkpointer:
+        _train(_agent(env_cfg), exp_cfg, env_cfg, rl_cfg, 3,
+               checkpointer=checkpointer)
+
+    # A differently seeded agent and a disturbed RNG must not matter
+    torch.manual_seed(1234)
+    resumed = _agent(env_cfg, seed=99)
+    with Checkpointer(tmp_path, every=3) as checkpointer:
+        resumed_history = _train(resumed, exp_cfg, env_cfg, rl_cfg, 6,
+                                 checkpointer=checkpointer, resume=True)
+
+    assert resumed_history == full_history
+    for name, value in full.network.state_dict().items():
+        assert torch.equal(value, resumed.network.state_dict()[name])
+
+
+def test_checkpoint_and_policy_load(tmp_path, setup):
+    exp_cfg, env_cfg, rl_cfg = setup
+    agent = _agent(env_cfg)
+    with Checkpointer(tmp_path, every=1, keep=2) as checkpointer:
+        _train(agent, exp_cfg, env_cfg, rl_cfg, 3,
+               checkpointer=checkpointer)
+
+    assert [path.rsplit("_", 1)[1] for path in checkpointer.paths()] == \
+        ["0000002.pt", "0000003.pt"]
+    state = checkpointer.load()
+    assert state["update"] == 3
+    assert type(state["agent"]["action_dim"]) is int
+
+    policy = load_policy(str(tmp_path))
+    assert policy.hidden_dims == (8,)
+    for name, value in agent.network.state_dict().items():
+        assert torch.equal(value, policy.network.state_dict()[name])
+
+
+def test_load_without_checkpoints(tmp_path):
+    with Checkpointer(tmp_path) as checkpointer:
+        assert checkpointer.load() is None
+
+
+def test_torchscript_dispatcher_respects_the_action_mask(setup):
+    _, env_cfg, _ = setup
+    agent = _agent(env_cfg)
+    dispatcher = agent.export_torchscript(batch_size=4)
+
+    rng = np.random.default_rng(0)
+    obs = rng.normal(size=(4, agent.obs_dim)).astype(np.float32)
+    masks = rng.random((4, agent.action_dim)) < 0.5
+    masks[:, -1] = True  # no-op is always valid
+    masks[0, :-1] = False
+
+    actions, values = dispatcher(torch.from_numpy(obs),
+                                 torch.from_numpy(masks))
+    assert masks[np.arange(4), actions.numpy()].all()
+    assert actions[0] == agent.action_dim - 1
+    expected, _, expected_values = agent.act_batch(
+        obs, masks, deterministic=True
+    )
+    assert np.array_equal(actions.numpy(), expected)
+    assert np.allclose(values.numpy(), expected_values)
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+import config
+from env.config import ConfigError, EnvConfig, StationConfig
+
+
+def _config(**changes):
+    return EnvConfig(
+        num_machines=2,
+        arrival_rate=0.2,
+        stat_fraction=0.2,
+        stat_deadline=15,
+        routine_deadline=40,
+        stat_priority_weight=5.0,
+        routine_priority_weight=1.0,
+        service_time_mean=10,
+        episode_length=500,
+    ).replace(**changes)
+
+
+def test_demand_takes_part_in_equality_and_hashing():
+    day = {"base_rate": 0.3, "period": 300}
+    night = {"base_rate": 0.1, "period": 300}
+    assert _config(demand=day) == _config(demand=dict(day))
+    assert hash(_config(demand=day)) == hash(_config(demand=dict(day)))
+    assert _config(demand=day) != _config(demand=night)
+    assert _config(demand=day) != _config()
+    assert len({_config(demand=day), _config(demand=night)}) == 2
+
+
+@pytest.mark.parametrize("changes", [
+    {"num_machines": 2.5},
+    {"num_machines": "2"},
+    {"num_machines": True},
+    {"episode_length": None},
+    {"arrival_rate": "0.2"},
+    {"event_driven": "no"},
+    {"auto_advance": 1},
+    {"demand": 0.3},
+])
+def test_values_of_the_wrong_type_are_rejected(changes):
+    with pytest.raises(ConfigError, match="invalid environment config"):
+        _config(**changes)
+
+
+def test_lossless_conversions_are_accepted():
+    cfg = _config(num_machines=np.int64(3), episode_length=400.0,
+                  arrival_rate=np.float32(0.25), event_driven=np.bool_(1))
+    assert type(cfg.num_machines) is int and cfg.num_machines == 3
+    assert type(cfg.episode_length) is int
+    assert type(cfg.arrival_rate) is float
+    assert cfg.event_driven is True
+
+
+def test_station_fields_are_checked_too():
+    with pytest.raises(ConfigError, match="num_machines"):
+        StationConfig(name="a", num_machines=1.5, service_time_mean=1)
+    with pytest.raises(ConfigError, match="eligible machine"):
+        StationConfig(name="a", num_machines=2, service_time_mean=1,
+                      eligible={"stat": [0.5]})
+
+
+def test_config_module_reexports_the_error():
+    assert config.ConfigError is ConfigError
@@ -0,0 +1,75 @@
+import random
+
+from env.job import Job
+from env.job_queue import ATCIndex, JobQueue, PriorityIndex
+
+
+def _job(job_id, rng):
+    return Job(job_id, job_id, rng.randint(1, 20), job_id + rng.randint(5, 60),
+               rng.random() < 0.3, rng.choice((1.0, 5.0)))
+
+
+def _entries(queue):
+    return (len(queue._fifo) + len(queue._stat) + len(queue._routine)
+            + sum(len(index._heap) for index in queue._indexes.values()))
+
+
+def test_deadline_index_is_registered_on_first_use():
+    queue = JobQueue()
+    assert queue.index("deadline") is None
+    rng = random.Random(0)
+    jobs = [_job(i, rng) for i in range(10)]
+    for job in jobs:
+        queue.append(job)
+    assert queue.peek_deadline() is min(
+        jobs, key=lambda job: (job.deadline, job.job_id)
+    )
+    assert queue.index("deadline") is not None
+
+
+def test_stale_entries_stay_bounded():
+    # FIFO-style use never reads the STAT deque or the deadline heap
+    queue = JobQueue()
+    queue.add_index("deadline", PriorityIndex(lambda job: job.deadline))
+    rng = random.Random(1)
+    for job_id in range(20000):
+        queue.append(_job(job_id, rng))
+        if len(queue) > 5:
+            queue.popleft()
+        assert _entries(queue) <= 3 * max(len(queue), 64) + 3
+    assert len(queue) == 5
+
+
+def test_orderings_survive_compaction():
+    queue = JobQueue()
+    queue.add_index("service_time", PriorityIndex(lambda j: j.service_time))
+    atc = queue.add_index("atc", ATCIndex(k=2.0, p_bar=10.0))
+    rng = random.Random(2)
+    live = {}
+    for job_id in range(2000):
+        job = _job(job_id, rng)
+        queue.append(job)
+        live[job_id] = job
+        if len(live) > 50:
+            victim = rng.choice(list(live.values()))
+            if rng.random() < 0.5:
+                queue.remove(victim)
+                del live[victim.job_id]
+            else:
+                queue.move_to_front(victim)
+                assert queue.peek() is victim
+
+        jobs = list(live.values())
+        assert {j.job_id for j in queue} == set(live)
+        assert queue.index("service_time").best() is min(
+            jobs, key=lambda j: (j.service_time, j.job_id)
+        )
+        stats = [j for j in jobs if j.is_stat]
+        assert queue.peek_stat() is (
+            min(stats, key=lambda j: j.job_id) if stats else None
+        )
+        routine = [j for j in jobs if not j.is_stat]
+        assert queue.peek_routine() is (
+            min(routine, key=lambda j: j.job_id) if routine else None
+        )
+        assert atc.best(job_id) in live.values()
@@ -0,0 +1,147 @@
+import numpy as np
+import pytest
+
+from env.config import MultiStationConfig, StationConfig
+from env.event import EventType
+from env.multi_station import MultiStationLabEnv, RoutedJob, Station
+from env.station_actions import DISPATCH_ROUTINE, HOLD
+from policies.fifo import FIFOPolicy
+from policies.stat_first import StatFirstPolicy
+
+
+def _config(**changes):
+    config = {
+        "arrival_rate": 0.6,
+        "stat_fraction": 0.3,
+        "stat_deadline": 30,
+        "routine_deadline": 120,
+        "stat_priority_weight": 5.0,
+        "routine_priority_weight": 1.0,
+        "episode_length": 400,
+        "transfer_time": 2,
+        "stations": [
+            {"name": "chemistry", "num_machines": 4, "service_time_mean": 4,
+             "eligible": {"stat": [0], "routine": [1, 2, 3]}},
+            {"name": "immunoassay", "num_machines": 2,
+             "service_time_mean": 6},
+        ],
+        "routes": [
+            {"stations": ["chemistry"], "fraction": 0.7},
+            {"stations": ["chemistry", "immunoassay"], "fraction": 0.3},
+        ],
+    }
+    config.update(changes)
+    return config
+
+
+def _run(env, policy, seed):
+    completed = []
+
+    class Sink:
+        def add(self, job):
+            completed.append(job.job_id)
+
+    _, info = env.reset(seed=seed)
+    env.add_completion_sink(Sink())
+    steps, total_reward, done = [], 0.0, False
+    while not done:
+        mask = info["action_mask"]
+        steps.append((env.current_time, mask.copy()))
+        _, reward, done, _, info = env.step(policy.select_station_actions(env))
+        total_reward += reward
+    return total_reward, steps, completed
+
+
+def test_routine_head_starts_behind_a_blocked_stat_head():
+    station = Station(0, StationConfig(
+        name="chemistry", num_machines=2, service_time_mean=5,
+        eligible={"stat": [0], "routine": [1]},
+    ))
+    station.acquire(0)
+    station.queue.append(RoutedJob(0, 0, 5, 30, True))
+    station.queue.append(RoutedJob(1, 0, 5, 120, False))
+
+    assert station.action_mask() == (False, False, True, True)
+    assert station.has_decision()
+    assert station.head(DISPATCH_ROUTINE).job_id == 1
+
+
+@pytest.mark.parametrize("policy", [FIFOPolicy(), StatFirstPolicy()])
+def test_control_returns_only_at_dispatch_decisions(policy):
+    env = MultiStationLabEnv(_config())
+    _, steps, _ = _run(env, policy, seed=0)
+    for time, mask in steps:
+        if time < env.max_time:
+            assert mask[:, :HOLD].any()
+    for station in env.stations:
+        assert station.has_decision() == any(station.action_mask()[:HOLD])
+
+
+def test_reserved_machines_do_not_idle_behind_the_other_class():
+    # Mostly STAT work on a single STAT machine: routine jobs queue
+    # behind STAT heads while routine-only machines are free
+    idle_with_work = []
+
+    class Env(MultiStationLabEnv):
+        def _run_until_decision(self, target):
+            # The clock is about to move: nothing may still be startable
+            if self.np_random is not None and self.current_time > 0:
+                idle_with_work.extend(
+                    station.index for station in self.stations
+                    if station.can_start(station.queue.peek_routine())
+                    or station.can_start(station.queue.peek_stat())
+                )
+            return super()._run_until_decision(target)
+
+    env = Env(_config(stat_fraction=0.8, arrival_rate=0.9))
+    _, steps, completed = _run(env, FIFOPolicy(), seed=1)
+    assert completed
+    assert idle_with_work == []
+
+
+def test_jobs_are_conserved_and_runs_are_deterministic():
+    env = MultiStationLabEnv(_config())
+    first = _run(env, StatFirstPolicy(), seed=4)
+    queued = sum(len(station.queue) for station in env.stations)
+    running = sum(
+        machine.current_job is not None
+        for station in env.stations for machine in station.machines
+    )
+    in_transit = sum(
+        event.payload is not None
+        for _, _, event in env._events
+        if event.type is EventType.ARRIVAL
+    )
+    assert first[2]
+    assert len(first[2]) + queued + running + in_transit == env.job_counter
+
+    second = _run(MultiStationLabEnv(_config()), StatFirstPolicy(), seed=4)
+    assert first[0] == second[0] and first[2] == second[2]
+
+
+def test_config_is_compiled_and_validated():
+    config = MultiStationConfig(**_config())
+    assert isinstance(config.stations[0], StationConfig)
+    assert config.stations[0].machines_for("stat") == (0,)
+    assert config.stations[1].machines_for("routine") == (0, 1)
+
+    a = _run(MultiStationLabEnv(_config()), FIFOPolicy(), seed=2)
+    b = _run(MultiStationLabEnv(config), FIFOPolicy(), seed=2)
+    assert a[0] == b[0] and a[2] == b[2]
+
+    with pytest.raises(ValueError, match="unknown station"):
+        MultiStationConfig(**_config(
+            routes=[{"stations": ["hematology"], "fraction": 1.0}]
+        ))
+    with pytest.raises(ValueError, match="out of range"):
+        StationConfig(name="a", num_machines=2, service_time_mean=1,
+                      eligible={"stat": [2]})
+
+
+def test_observation_and_action_spaces():
+    env = MultiStationLabEnv(_config())
+    obs, info = env.reset(seed=0)
+    assert obs.shape == env.observation_space.shape == (2, 3)
+    assert info["action_mask"].shape == (2, 4)
+    assert np.all(env.action_space.nvec == 4)
+    assert info["action_mask"][:, HOLD].all()
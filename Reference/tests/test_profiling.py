@@ -0,0 +1,36 @@
+from evaluation.profiling import Profiler
+from policies.fifo import FIFOPolicy
+
+
+class _Agent:
+    def __init__(self):
+        # Instance attribute that must survive a wrap/detach cycle
+        self.select_action = self._choose
+
+    def _choose(self, obs):
+        return 1
+
+    def act_batch(self, observations):
+        return [self.select_action(obs) for obs in observations]
+
+
+def test_detach_restores_exactly_what_was_wrapped():
+    agent = _Agent()
+    original = agent.select_action
+    policy = FIFOPolicy()
+
+    profiler = Profiler()
+    for _ in range(2):
+        profiler.wrap(agent, "select_action", "policy")
+        profiler.wrap(agent, "act_batch", "policy")
+        profiler.instrument_policy(policy)
+
+    assert agent.act_batch([0, 0]) == [1, 1]
+    # Two act_batch wrappers, then two select_action wrappers for
+    # each observation
+    assert profiler.summary()["phases"]["policy"]["calls"] == 2 + 2 * 2
+
+    profiler.detach()
+    assert agent.select_action == original
+    assert "act_batch" not in vars(agent)
+    assert "select_action" not in vars(policy)
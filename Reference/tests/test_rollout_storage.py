@@ -0,0 +1,89 @@
+import numpy as np
+import torch
+
+from env.config import EnvConfig
+from env.vector_env import VectorLabSchedulingEnv
+from rl.ppo_agent import PPOAgent
+from rl.rollout_buffer import RolloutStorage
+from rl.trainer import collect_rollout
+
+
+def _gae(rewards, values, dones, last_value, gamma, lam):
+    advantages, gae, next_value = [], 0.0, last_value
+    for reward, value, done in zip(rewards[::-1], values[::-1], dones[::-1]):
+        not_done = 1.0 - done
+        delta = reward + gamma * next_value * not_done - value
+        gae = delta + gamma * lam * not_done * gae
+        advantages.append(gae)
+        next_value = value
+    return advantages[::-1]
+
+
+def test_uneven_columns_match_per_environment_gae():
+    rng = np.random.default_rng(0)
+    storage = RolloutStorage(num_steps=12, num_envs=3, obs_dim=2)
+    columns = [[] for _ in range(3)]
+    for tick in range(12):
+        rows = np.flatnonzero(rng.random(3) < 0.5)
+        values = rng.normal(size=rows.size).astype(np.float32)
+        storage.add_decisions(
+            rows, np.zeros((rows.size, 2)), np.zeros(rows.size),
+            np.zeros(rows.size), values,
+        )
+        for row, value in zip(rows, values):
+            columns[row].append([0.0, float(value), 0.0])
+        rewards = rng.normal(size=3).astype(np.float32)
+        dones = np.full(3, tick == 7)
+        storage.add_rewards(rewards, dones)
+        for row in range(3):
+            if columns[row]:
+                columns[row][-1][0] += float(rewards[row])
+                columns[row][-1][2] = max(
+                    columns[row][-1][2], float(dones[row])
+                )
+
+    assert storage.full
+    assert storage.lengths.tolist() == [len(column) for column in columns]
+    last_values = torch.tensor([0.5, -1.0, 2.0])
+    storage.compute_returns_and_advantages(last_values, 0.9, 0.8)
+
+    for row, column in enumerate(columns):
+        rewards, values, dones = (np.array(field) for field in zip(*column))
+        expected = _gae(rewards, values, dones, float(last_values[row]),
+                        0.9, 0.8)
+        np.testing.assert_allclose(
+            storage.advantages[:len(column), row].numpy(), expected,
+            rtol=1e-5, atol=1e-5,
+        )
+
+    batches = list(storage.minibatches(4))
+    assert sum(batch[0].shape[0] for batch in batches) == sum(
+        map(len, columns)
+    )
+
+
+def test_collect_rollout_stores_only_decisions():
+    cfg = EnvConfig(
+        num_machines=2, arrival_rate=0.1, stat_fraction=0.2,
+        stat_deadline=30, routine_deadline=120, stat_priority_weight=5.0,
+        routine_priority_weight=1.0, service_time_mean=8.0,
+        episode_length=200,
+    )
+    vec_env = VectorLabSchedulingEnv(cfg, num_envs=4)
+    agent = PPOAgent(obs_dim=3, action_dim=3, seed=0)
+    storage = RolloutStorage(cfg.episode_length, 4, 3, 3)
+
+    obs, _ = vec_env.reset(seed=0)
+    obs, episode_rewards = collect_rollout(vec_env, agent, storage, obs)
+
+    lengths = storage.lengths
+    assert 0 < lengths.max() < cfg.episode_length
+    for row in range(4):
+        stored = slice(0, int(lengths[row]))
+        # Every stored step had a dispatch option
+        assert storage.action_masks[stored, row, :-1].any(dim=1).all()
+        # Rewards of the whole episode end up on the stored steps
+        assert np.isclose(
+            float(storage.rewards[stored, row].sum()), episode_rewards[row]
+        )
+        assert storage.dones[int(lengths[row]) - 1, row] == 1.0
@@ -0,0 +1,106 @@
+import numpy as np
+import pytest
+
+from env.lab_env import LabSchedulingEnv
+from run import make_baselines
+from test_engines import ENGINES, _config
+
+
+def _trajectory(env, policy, steps):
+    """
+    (action, observation, reward, time) of up to ``steps`` steps.
+    """
+    out = []
+    for _ in range(steps):
+        action = policy.select_action(env)
+        obs, reward, done, _, _ = env.step(action)
+        out.append((action, obs.tolist(), reward, env.current_time))
+        if done:
+            break
+    return out
+
+
+def _state(env):
+    return (
+        env.current_time,
+        env.job_counter,
+        [(job.job_id, job.remaining_time, job.start_time)
+         for job in env.queue],
+        [None if machine.current_job is None
+         else (machine.current_job.job_id, machine.current_job.remaining_time)
+         for machine in env.machines],
+        env.idle_machines.as_mask().tolist(),
+    )
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_restore_replays_the_same_trajectory(engine):
+    env = LabSchedulingEnv(_config(**engine))
+    env.reset(seed=7)
+    policy = make_baselines(7)["ATC"]
+    _trajectory(env, policy, 40)
+
+    snapshot = env.snapshot()
+    before = _state(env)
+    first = _trajectory(env, policy, 60)
+    for _ in range(2):
+        env.restore(snapshot)
+        assert _state(env) == before
+        assert _trajectory(env, policy, 60) == first
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_snapshots_nest(engine):
+    env = LabSchedulingEnv(_config(**engine))
+    env.reset(seed=11)
+    policy = make_baselines(11)["FIFO"]
+    _trajectory(env, policy, 20)
+
+    outer = env.snapshot()
+    outer_state = _state(env)
+    _trajectory(env, policy, 15)
+    inner = env.snapshot()
+    inner_state = _state(env)
+    branch = _trajectory(env, policy, 30)
+
+    env.restore(outer)
+    assert _state(env) == outer_state
+    _trajectory(env, policy, 50)
+    env.restore(inner)
+    assert _state(env) == inner_state
+    assert _trajectory(env, policy, 30) == branch
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_forked_arrivals_are_undone_by_restore(engine):
+    env = LabSchedulingEnv(_config(**engine))
+    env.reset(seed=5)
+    policy = make_baselines(5)["SPT"]
+    _trajectory(env, policy, 30)
+
+    snapshot = env.snapshot()
+    rng = env.np_random
+    real = _trajectory(env, policy, 80)
+
+    env.restore(snapshot)
+    fork = np.random.default_rng(123)
+    env.fork_arrivals(fork, 80)
+    forked = _trajectory(env, policy, 80)
+    assert forked != real
+
+    # restore reinstates the real generator without caller help
+    fork_state = fork.bit_generator.state
+    env.restore(snapshot)
+    assert env.np_random is rng
+    assert _trajectory(env, policy, 80) == real
+    assert fork.bit_generator.state == fork_state
+
+
+def test_lookahead_is_deterministic_per_seed():
+    rewards = []
+    for _ in range(2):
+        env = LabSchedulingEnv(_config(event_driven=True, episode_length=120))
+        env.reset(seed=2)
+        policy = make_baselines(2)["Lookahead"]
+        rewards.append([step[2] for step in _trajectory(env, policy, 200)])
+    assert rewards[0] == rewards[1]